@@ -1,960 +1,2321 @@
-import os
-import argparse
-
-
-class IMEM(object):
-    def __init__(self, iodir):
-        self.size = pow(2, 16)  # Can hold a maximum of 2^16 instructions.
-        self.filepath = os.path.abspath(os.path.join(iodir, "Code.asm"))
-        self.instructions = []
-
-        try:
-            with open(self.filepath, 'r') as insf:
-                self.instructions = [instruction.split('#')[0].strip() for instruction in insf.readlines() if
-                                     not (instruction.startswith('#') or instruction.strip() == '')]
-            print("IMEM - Instructions loaded from file:", self.filepath)
-        except:
-            print("IMEM - ERROR: Couldn't open file in path:", self.filepath)
-
-    def Read(self, idx):  # Use this to read from IMEM.
-        if idx < self.size:
-            return self.instructions[idx]
-        else:
-            print("IMEM - ERROR: Invalid memory access at index: ", idx, " with memory size: ", self.size)
-
-
-class DMEM(object):
-    # Word addressible - each address contains 32 bits.
-    def __init__(self, name, iodir, addressLen):
-        self.name = name
-        self.size = pow(2, addressLen)
-        self.min_value = -pow(2, 31)
-        self.max_value = pow(2, 31) - 1
-        self.ipfilepath = os.path.abspath(os.path.join(iodir, name + ".txt"))
-        self.opfilepath = os.path.abspath(os.path.join(iodir, name + "OP.txt"))
-        self.data = []
-
-        try:
-            with open(self.ipfilepath, 'r') as ipf:
-                self.data = [int(line.strip()) for line in ipf.readlines()]
-            print(self.name, "- Data loaded from file:", self.ipfilepath)
-            # print(self.name, "- Data:", self.data)
-            self.data.extend([0x0 for _ in range(self.size - len(self.data))])  # Initialize the remaining as zeroes
-        except:
-            print(self.name, "- ERROR: Couldn't open input file in path:", self.ipfilepath)
-
-    def Read(self, idx):  # Use this to read from DMEM.
-        if idx < self.size:
-            return self.data[idx]
-        else:
-            print("Error : Out of bounds exception")
-
-    def Write(self, idx, val):  # Use this to write into DMEM.
-        if idx < self.size:
-            self.data[idx] = val
-        else:
-            print("Error : Out of bounds exception")
-
-    def dump(self):
-        try:
-            with open(self.opfilepath, 'w') as opf:
-                lines = [str(data) + '\n' for data in self.data]
-                opf.writelines(lines)
-            print(self.name, "- Dumped data into output file in path:", self.opfilepath)
-        except:
-            print(self.name, "- ERROR: Couldn't open output file in path:", self.opfilepath)
-
-
-class RegisterFile(object):
-    def __init__(self, name, count, length=1, size=32):
-        self.name = name
-        self.reg_count = count
-        self.vec_length = length  # Number of 32 bit words in a register.
-        self.reg_bits = size
-        self.min_value = -pow(2, self.reg_bits - 1)
-        self.max_value = pow(2, self.reg_bits - 1) - 1
-        self.registers = [[0x0 for _ in range(self.vec_length)] for r in
-                          range(self.reg_count)]  # list of lists of integers
-
-    def Read(self, idx=0):
-        if idx < self.reg_count:
-            val = self.registers[idx]
-            if len(val) != 1:
-                return self.registers[idx]
-            else:
-                return self.registers[idx][0]
-        else:
-            print("Error : Out of bounds exception")
-
-    def Write(self, idx, val):
-        if idx < self.reg_count:
-            if type(val) == int:
-                self.registers[idx] = [val]
-            else:
-                self.registers[idx] = val
-        else:
-            print("Error : Out of bounds exception")
-
-    def dump(self, iodir):
-        opfilepath = os.path.abspath(os.path.join(iodir, self.name + ".txt"))
-        try:
-            with open(opfilepath, 'w') as opf:
-                row_format = "{:<13}" * self.vec_length
-                lines = [row_format.format(*[str(i) for i in range(self.vec_length)]) + "\n",
-                         '-' * (self.vec_length * 13) + "\n"]
-                lines += [row_format.format(*[str(val) for val in data]) + "\n" for data in self.registers]
-                opf.writelines(lines)
-            print(self.name, "- Dumped data into output file in path:", opfilepath)
-        except:
-            print(self.name, "- ERROR: Couldn't open output file in path:", opfilepath)
-
-
-class Core:
-    def __init__(self, imem, sdmem, vdmem):
-        self.imem = imem
-        self.sdmem = sdmem
-        self.vdmem = vdmem
-        self.ins = Instructionref(self)
-        self.RFs = {"SRF": RegisterFile("SRF", 8),
-                    "VRF": RegisterFile("VRF", 8, 64),
-                    "VMR": RegisterFile("VMR", 1, 64, 1),
-                    "VLG": RegisterFile("VLG", 1, 1)}
-        self.pc = 0
-        self.mvl = 64
-        self.RFs.get("VLG").Write(0, self.mvl)
-        self.RFs.get("VMR").Write(0, [1] * 64)
-        self.resolvedCode = []
-        print("Core Initialized")
-
-    def run(self):
-        print("Simulation started")
-        while True:
-            try:
-                temp = self.imem.Read(self.pc)
-                ret, resolvedCode = self.ins.execute(temp)
-            except IndexError:
-                return 0
-
-            if ret == 1:
-                self.resolvedCode.append(resolvedCode)
-                print("Instruction being executed...")
-            elif ret == 0:
-                break
-
-    def dumpRegs(self, iodir):
-        for rf in self.RFs.values():
-            rf.dump(iodir)
-
-    def dumpResolvedCode(self, iodir, name="resolvedCode"):
-        path = os.path.abspath(os.path.join(iodir, name + ".txt"))
-        try:
-            with open(path, 'w') as opf:
-                lines = [str(data) + '\n' for data in self.resolvedCode]
-                opf.writelines(lines)
-            print(name, "- Resolved Code dumped into ", path)
-        except:
-            print(name, "- ERROR: Couldn't open output file ", path)
-
-
-class Instructionref:
-    def __init__(self, core):
-        self.core = core
-        self.ins = {
-            "ADDVV": self.ADDVV,
-            "SUBVV": self.SUBVV,
-            "MULVV": self.MULVV,
-            "DIVVV": self.DIVVV,
-            "SEQVV": self.SEQVV,
-            "SNEVV": self.SNEVV,
-            "SGTVV": self.SGTVV,
-            "SLTVV": self.SLTVV,
-            "SGEVV": self.SGEVV,
-            "SLEVV": self.SLEVV,
-            "ADDVS": self.ADDVS,
-            "SUBVS": self.SUBVS,
-            "MULVS": self.MULVS,
-            "DIVVS": self.DIVVS,
-            "SEQVS": self.SEQVS,
-            "SNEVS": self.SNEVS,
-            "SGTVS": self.SGTVS,
-            "SLTVS": self.SLTVS,
-            "SGEVS": self.SGEVS,
-            "SLEVS": self.SLEVS,
-            "POP": self.POP,
-            "MTCL": self.MTCL,
-            "MFCL": self.MFCL,
-            "LV": self.LV,
-            "SV": self.SV,
-            "LS": self.LS,
-            "SS": self.SS,
-            "LVWS": self.LVWS,
-            "SVWS": self.SVWS,
-            "LVI": self.LVI,
-            "SVI": self.SVI,
-            "ADD": self.ADD,
-            "SUB": self.SUB,
-            "SRA": self.SRA,
-            "SRL": self.SRL,
-            "SLL": self.SLL,
-            "AND": self.AND,
-            "OR": self.OR,
-            "XOR": self.XOR,
-            "BEQ": self.BEQ,
-            "BNE": self.BNE,
-            "BGT": self.BGT,
-            "BLT": self.BLT,
-            "BGE": self.BGE,
-            "BLE": self.BLE,
-            "CVM": self.CVM,
-            "HALT": self.HALT,
-        }
-        self.operands = []
-
-    def execute(self, instruction):
-        self.operands = instruction.split()
-        instr = self.ins.get(self.operands[0], self.Default)()
-        return instr
-
-    # region Memory Access Instructions
-
-    def LV(self):
-        ins, op1, op2 = (self.operands[0], int(self.operands[1][2:]), int(self.operands[2][2:]))
-        op2_val = self.core.RFs.get("SRF").Read(op2)
-        veclen = self.core.RFs.get("VLG").Read()
-        op1_val_final = [self.core.vdmem.Read(op2_val + i) for i in range(veclen)]
-        self.core.RFs.get("VRF").Write(op1, self.mask(op1, op1_val_final, veclen))
-        self.core.pc += 1
-        resolvedCode = ""
-        for i in self.operands:
-            resolvedCode += i + " "
-
-        resolvedCode += "("
-        for i in range(veclen):
-            resolvedCode += str(op2_val + i) + ","
-
-        resolvedCode = resolvedCode[:-1] + ")"
-        return 1, resolvedCode.strip()
-
-    def SV(self):
-        ins, op1, op2 = (self.operands[0], int(self.operands[1][2:]), int(self.operands[2][2:]))
-        op2_val = self.core.RFs.get("SRF").Read(op2)
-        op1_val = self.core.RFs.get("VRF").Read(op1)
-        veclen = self.core.RFs.get("VLG").Read()
-        mask_reg = self.core.RFs.get("VMR").Read()
-        for i in range(op2_val, op2_val + veclen):
-            if mask_reg[i - op2_val]:
-                self.core.vdmem.Write(i, op1_val[i - op2_val])
-        self.core.pc += 1
-        resolvedCode = ""
-        for i in self.operands:
-            resolvedCode += i + " "
-        resolvedCode += "("
-        for i in range(veclen):
-            resolvedCode += str(op2_val + i) + ","
-        resolvedCode = resolvedCode[:-1] + ")"
-        return 1, resolvedCode.strip()
-
-    def LS(self):
-        ins, op1, op2, imm = (
-        self.operands[0], int(self.operands[1][2:]), int(self.operands[2][2:]), int(self.operands[3]))
-        op2_val = self.core.RFs.get("SRF").Read(op2)
-        op1_val = self.core.sdmem.Read(op2_val + imm)
-        self.core.RFs.get("SRF").Write(op1, op1_val)
-        self.core.pc += 1
-        resolvedCode = ""
-        for i in self.operands:
-            resolvedCode += i + " "
-        return 1, resolvedCode.strip()
-
-    def SS(self):
-        ins, op1, op2, imm = (
-        self.operands[0], int(self.operands[1][2:]), int(self.operands[2][2:]), int(self.operands[3]))
-        op1_val = self.core.RFs.get("SRF").Read(op1)
-        self.core.sdmem.Write(op2 + imm, op1_val)
-        self.core.pc += 1
-        resolvedCode = ""
-        for i in self.operands:
-            resolvedCode += i + " "
-        return 1, resolvedCode.strip()
-
-    def LVWS(self):
-        ins, op1, op2, op1 = (
-        self.operands[0], int(self.operands[1][2:]), int(self.operands[2][2:]), int(self.operands[3][2:]))
-        op2_val = self.core.RFs.get("SRF").Read(op2)
-        op1_val = self.core.RFs.get("SRF").Read(op1)
-        veclen = self.core.RFs.get("VLG").Read()
-        op1_val_final = [self.core.vdmem.Read(op2_val + i * op1_val) for i in range(veclen)]
-        self.core.RFs.get("VRF").Write(op1, self.mask(op1, op1_val_final, veclen))
-        self.core.pc += 1
-        resolvedCode = ""
-        for i in self.operands:
-            resolvedCode += i + " "
-        resolvedCode += "("
-        for i in range(veclen):
-            resolvedCode += str(op2_val + i * op1_val) + ","
-        resolvedCode = resolvedCode[:-1] + ")"
-        return 1, resolvedCode.strip()
-
-    def SVWS(self):
-        ins, op1, op2, op1 = (
-        self.operands[0], int(self.operands[1][2:]), int(self.operands[2][2:]), int(self.operands[3][2:]))
-        op2_val = self.core.RFs.get("SRF").Read(op2)
-        op1_val = self.core.RFs.get("SRF").Read(op1)
-        op1_val = self.core.RFs.get("VRF").Read(op1)
-        veclen = self.core.RFs.get("VLG").Read()
-        mask_reg = self.core.RFs.get("VMR").Read()
-        for i in range(veclen):
-            if mask_reg[i]:
-                self.core.vdmem.Write(op2_val + i * op1_val, op1_val[i])
-        self.core.pc += 1
-        resolvedCode = ""
-        for i in self.operands:
-            resolvedCode += i + " "
-        resolvedCode += "("
-        for i in range(veclen):
-            resolvedCode += str(op2_val + i * op1_val) + ","
-        resolvedCode = resolvedCode[:-1] + ")"
-        return 1, resolvedCode.strip()
-
-    def LVI(self):
-        ins, op1, op2, op3 = (
-        self.operands[0], int(self.operands[1][2:]), int(self.operands[2][2:]), int(self.operands[3][2:]))
-        op2_val = self.core.RFs.get("SRF").Read(op2)
-        op3_val = self.core.RFs.get("VRF").Read(op3)
-        veclen = self.core.RFs.get("VLG").Read()
-        op1_val_final = [self.core.vdmem.Read(op2_val + i) for i in op3_val[0:veclen]]
-        self.core.vdmem.Write(op1, self.mask(op1, op1_val_final, veclen))
-        self.core.pc += 1
-        resolvedCode = ""
-        for i in self.operands:
-            resolvedCode += i + " "
-        resolvedCode += "("
-        for i in op3_val[0:veclen]:
-            resolvedCode += str(op2_val + i) + ","
-        resolvedCode = resolvedCode[:-1] + ")"
-        return 1, resolvedCode.strip()
-
-    def SVI(self):
-        ins, op1, op2, op3 = (
-        self.operands[0], int(self.operands[1][2:]), int(self.operands[2][2:]), int(self.operands[3][2:]))
-        op2_val = self.core.RFs.get("SRF").Read(op2)
-        op3_val = self.core.RFs.get("VRF").Read(op3)
-        op1_val = self.core.RFs.get("VRF").Read(op1)
-        veclen = self.core.RFs.get("VLG").Read()
-        mask_reg = self.core.RFs.get("VMR").Read()
-        for i in range(veclen):
-            if mask_reg[i]:
-                self.core.vdmem.Write(op2_val + op3_val[i], op1_val[i])
-        self.core.pc += 1
-        resolvedCode = ""
-        for i in self.operands:
-            resolvedCode += i + " "
-        resolvedCode += "("
-        for i in op3_val[0:veclen]:
-            resolvedCode += str(op2_val + i) + ","
-        resolvedCode = resolvedCode[:-1] + ")"
-        return 1, resolvedCode.strip()
-
-    # endregion
-
-    # region Vector Instructions
-    def ADDVV(self):
-        ins, op3, op1, op2 = (
-        self.operands[0], int(self.operands[1][2:]), int(self.operands[2][2:]), int(self.operands[3][2:]))
-        op1_val = self.core.RFs.get("VRF").Read(op1)
-        op2_val = self.core.RFs.get("VRF").Read(op2)
-        veclen = self.core.RFs.get("VLG").Read()
-        op3_val_final = [op1_val[i] + op2_val[i] for i in range(0, veclen)]
-        self.core.RFs.get("VRF").Write(op3, self.mask(op3, op3_val_final, veclen))
-        self.core.pc += 1
-        resolvedCode = ""
-        for i in self.operands:
-            resolvedCode += i + " "
-
-        return 1, resolvedCode.strip()
-
-    def SUBVV(self):
-        ins, op3, op1, op2 = (
-        self.operands[0], int(self.operands[1][2:]), int(self.operands[2][2:]), int(self.operands[3][2:]))
-        op1_val = self.core.RFs.get("VRF").Read(op1)
-        op2_val = self.core.RFs.get("VRF").Read(op2)
-        veclen = self.core.RFs.get("VLG").Read()
-        op3_val_final = [op1_val[i] - op2_val[i] for i in range(0, veclen)]
-        self.core.RFs.get("VRF").Write(op3, self.mask(op3, op3_val_final, veclen))
-        self.core.pc += 1
-        resolvedCode = ""
-        for i in self.operands:
-            resolvedCode += i + " "
-
-        return 1, resolvedCode.strip()
-
-    def MULVV(self):
-        ins, op3, op1, op2 = (
-        self.operands[0], int(self.operands[1][2:]), int(self.operands[2][2:]), int(self.operands[3][2:]))
-        op1_val = self.core.RFs.get("VRF").Read(op1)
-        op2_val = self.core.RFs.get("VRF").Read(op2)
-        veclen = self.core.RFs.get("VLG").Read()
-        op3_val_final = [op1_val[i] * op2_val[i] for i in range(0, veclen)]
-        self.core.RFs.get("VRF").Write(op3, self.mask(op3, op3_val_final, veclen))
-        self.core.pc += 1
-        resolvedCode = ""
-        for i in self.operands:
-            resolvedCode += i + " "
-
-        return 1, resolvedCode.strip()
-
-    def DIVVV(self):
-        ins, op3, op1, op2 = (
-        self.operands[0], int(self.operands[1][2:]), int(self.operands[2][2:]), int(self.operands[3][2:]))
-        op1_val = self.core.RFs.get("VRF").Read(op1)
-        op2_val = self.core.RFs.get("VRF").Read(op2)
-        vl = self.core.RFs.get("VLG").Read()
-        op3_val_final = [op1_val[i] / op2_val[i] for i in range(0, vl)]
-        self.core.RFs.get("VRF").Write(op3, self.mask(op3, op3_val_final))
-        self.core.pc += 1
-        resolvedCode = ""
-        for i in self.operands:
-            resolvedCode += i + " "
-
-        return 1, resolvedCode.strip()
-
-    def ADDVS(self):
-        ins, op3, op1, op2 = (
-        self.operands[0], int(self.operands[1][2:]), int(self.operands[2][2:]), int(self.operands[3][2:]))
-        op1_val = self.core.RFs.get("VRF").Read(op1)
-        op2_val = self.core.RFs.get("SRF").Read(op2)
-        vl = self.core.RFs.get("VLG").Read()
-        op3_val_final = [op1_val[i] + op2_val for i in range(0, vl)]
-        self.core.RFs.get("VRF").Write(op3, self.mask(op3, op3_val_final))
-        self.core.pc += 1
-        resolvedCode = ""
-        for i in self.operands:
-            resolvedCode += i + " "
-        return 1, resolvedCode.strip()
-
-    def SUBVS(self):
-        ins, op3, op1, op2 = (
-        self.operands[0], int(self.operands[1][2:]), int(self.operands[2][2:]), int(self.operands[3][2:]))
-        op1_val = self.core.RFs.get("VRF").Read(op1)
-        op2_val = self.core.RFs.get("SRF").Read(op2)
-        vl = self.core.RFs.get("VLG").Read()
-        op3_val_final = [op1_val[i] - op2_val for i in range(0, vl)]
-        self.core.RFs.get("VRF").Write(op3, self.mask(op3, op3_val_final))
-        self.core.pc += 1
-        resolvedCode = ""
-        for i in self.operands:
-            resolvedCode += i + " "
-        return 1, resolvedCode.strip()
-
-    def MULVS(self):
-        ins, op3, op1, op2 = (
-        self.operands[0], int(self.operands[1][2:]), int(self.operands[2][2:]), int(self.operands[3][2:]))
-        op1_val = self.core.RFs.get("VRF").Read(op1)
-        op2_val = self.core.RFs.get("SRF").Read(op2)
-        vl = self.core.RFs.get("VLG").Read()
-        op3_val_final = [op1_val[i] * op2_val for i in range(0, vl)]
-        self.core.RFs.get("VRF").Write(op3, self.mask(op3, op3_val_final))
-        self.core.pc += 1
-        resolvedCode = ""
-        for i in self.operands:
-            resolvedCode += i + " "
-        return 1, resolvedCode.strip()
-
-    def DIVVS(self):
-        ins, op3, op1, op2 = (
-        self.operands[0], int(self.operands[1][2:]), int(self.operands[2][2:]), int(self.operands[3][2:]))
-        op1_val = self.core.RFs.get("VRF").Read(op1)
-        op2_val = self.core.RFs.get("SRF").Read(op2)
-        vl = self.core.RFs.get("VLG").Read()
-        op3_val_final = [op1_val[i] / op2_val for i in range(0, vl)]
-        self.core.RFs.get("VRF").Write(op3, self.mask(op3, op3_val_final))
-        self.core.pc += 1
-        resolvedCode = ""
-        for i in self.operands:
-            resolvedCode += i + " "
-        return 1, resolvedCode.strip()
-
-    # endregion
-
-    # region Mask Instructions
-    # vector
-    def SEQVV(self):
-        ins, op1, op2 = (self.operands[0], int(self.operands[1][2:]), int(self.operands[2][2:]))
-        op1_val = self.core.RFs.get("VRF").Read(op1)
-        op2_val = self.core.RFs.get("VRF").Read(op2)
-        vl = self.core.RFs.get("VLG").Read()
-        masked_reg = [int(op1_val[i] == op2_val[i]) for i in range(0, vl)]
-        masked_reg.extend([0 for _ in range(self.core.MVL - vl)])
-        self.core.RFs.get("VMR").Write(0, masked_reg)
-        self.core.pc += 1
-        resolvedCode = ""
-        for i in self.operands:
-            resolvedCode += i + " "
-        return 1, resolvedCode.strip()
-
-    def SNEVV(self):
-        ins, op1, op2 = (self.operands[0], int(self.operands[1][2:]), int(self.operands[2][2:]))
-        op1_val = self.core.RFs.get("VRF").Read(op1)
-        op2_val = self.core.RFs.get("VRF").Read(op2)
-        vl = self.core.RFs.get("VLG").Read()
-        masked_reg = [int(op1_val[i] != op2_val[i]) for i in range(0, vl)]
-        masked_reg.extend([0 for _ in range(self.core.MVL - vl)])
-        self.core.RFs.get("VMR").Write(0, masked_reg)
-        self.core.pc += 1
-        resolvedCode = ""
-        for i in self.operands:
-            resolvedCode += i + " "
-        return 1, resolvedCode.strip()
-
-    def SGTVV(self):
-        ins, op1, op2 = (self.operands[0], int(self.operands[1][2:]), int(self.operands[2][2:]))
-        op1_val = self.core.RFs.get("VRF").Read(op1)
-        op2_val = self.core.RFs.get("VRF").Read(op2)
-        vl = self.core.RFs.get("VLG").Read()
-        masked_reg = [int(op1_val[i] > op2_val[i]) for i in range(0, vl)]
-        masked_reg.extend([0 for _ in range(self.core.MVL - vl)])
-        self.core.RFs.get("VMR").Write(0, masked_reg)
-        self.core.pc += 1
-        resolvedCode = ""
-        for i in self.operands:
-            resolvedCode += i + " "
-        return 1, resolvedCode.strip()
-
-    def SLTVV(self):
-        ins, op1, op2 = (self.operands[0], int(self.operands[1][2:]), int(self.operands[2][2:]))
-        op1_val = self.core.RFs.get("VRF").Read(op1)
-        op2_val = self.core.RFs.get("VRF").Read(op2)
-        vl = self.core.RFs.get("VLG").Read()
-        masked_reg = [int(op1_val[i] < op2_val[i]) for i in range(0, vl)]
-        masked_reg.extend([0 for _ in range(self.core.MVL - vl)])
-        self.core.RFs.get("VMR").Write(0, masked_reg)
-        self.core.pc += 1
-        resolvedCode = ""
-        for i in self.operands:
-            resolvedCode += i + " "
-        return 1, resolvedCode.strip()
-
-    def SGEVV(self):
-        ins, op1, op2 = (self.operands[0], int(self.operands[1][2:]), int(self.operands[2][2:]))
-        op1_val = self.core.RFs.get("VRF").Read(op1)
-        op2_val = self.core.RFs.get("VRF").Read(op2)
-        vl = self.core.RFs.get("VLG").Read()
-        masked_reg = [int(op1_val[i] >= op2_val[i]) for i in range(0, vl)]
-        masked_reg.extend([0 for _ in range(self.core.MVL - vl)])
-        self.core.RFs.get("VMR").Write(0, masked_reg)
-        self.core.pc += 1
-        resolvedCode = ""
-        for i in self.operands:
-            resolvedCode += i + " "
-        return 1, resolvedCode.strip()
-
-    def SLEVV(self):
-        ins, op1, op2 = (self.operands[0], int(self.operands[1][2:]), int(self.operands[2][2:]))
-        op1_val = self.core.RFs.get("VRF").Read(op1)
-        op2_val = self.core.RFs.get("VRF").Read(op2)
-        vl = self.core.RFs.get("VLG").Read()
-        masked_reg = [int(op1_val[i] <= op2_val[i]) for i in range(0, vl)]
-        masked_reg.extend([0 for _ in range(self.core.MVL - vl)])
-        self.core.RFs.get("VMR").Write(0, masked_reg)
-        self.core.pc += 1
-        resolvedCode = ""
-        for i in self.operands:
-            resolvedCode += i + " "
-        return 1, resolvedCode.strip()
-
-    # scalar
-    def SEQVS(self):
-        ins, op1, op2 = (self.operands[0], int(self.operands[1][2:]), int(self.operands[2][2:]))
-        op1_val = self.core.RFs.get("VRF").Read(op1)
-        op2_val = self.core.RFs.get("SRF").Read(op2)
-        vl = self.core.RFs.get("VLG").Read()
-        masked_reg = [int(op1_val[i] == op2_val) for i in range(0, vl)]
-        masked_reg.extend([0 for _ in range(self.core.MVL - vl)])
-        self.core.RFs.get("VMR").Write(0, masked_reg)
-        self.core.pc += 1
-        resolvedCode = ""
-        for i in self.operands:
-            resolvedCode += i + " "
-        return 1, resolvedCode.strip()
-
-    def SNEVS(self):
-        ins, op1, op2 = (self.operands[0], int(self.operands[1][2:]), int(self.operands[2][2:]))
-        op1_val = self.core.RFs.get("VRF").Read(op1)
-        op2_val = self.core.RFs.get("SRF").Read(op2)
-        vl = self.core.RFs.get("VLG").Read()
-        masked_reg = [int(op1_val[i] != op2_val) for i in range(0, vl)]
-        masked_reg.extend([0 for _ in range(self.core.MVL - vl)])
-        self.core.RFs.get("VMR").Write(0, masked_reg)
-        self.core.pc += 1
-        resolvedCode = ""
-        for i in self.operands:
-            resolvedCode += i + " "
-        return 1, resolvedCode.strip()
-
-    def SGTVS(self):
-        ins, op1, op2 = (self.operands[0], int(self.operands[1][2:]), int(self.operands[2][2:]))
-        op1_val = self.core.RFs.get("VRF").Read(op1)
-        op2_val = self.core.RFs.get("SRF").Read(op2)
-        vl = self.core.RFs.get("VLG").Read()
-        masked_reg = [int(op1_val[i] > op2_val) for i in range(0, vl)]
-        masked_reg.extend([0 for _ in range(self.core.MVL - vl)])
-        self.core.RFs.get("VMR").Write(0, masked_reg)
-        self.core.pc += 1
-        resolvedCode = ""
-        for i in self.operands:
-            resolvedCode += i + " "
-        return 1, resolvedCode.strip()
-
-    def SLTVS(self):
-        ins, op1, op2 = (self.operands[0], int(self.operands[1][2:]), int(self.operands[2][2:]))
-        op1_val = self.core.RFs.get("VRF").Read(op1)
-        op2_val = self.core.RFs.get("SRF").Read(op2)
-        vl = self.core.RFs.get("VLG").Read()
-        masked_reg = [int(op1_val[i] < op2_val) for i in range(0, vl)]
-        masked_reg.extend([0 for _ in range(self.core.MVL - vl)])
-        self.core.RFs.get("VMR").Write(0, masked_reg)
-        self.core.pc += 1
-        resolvedCode = ""
-        for i in self.operands:
-            resolvedCode += i + " "
-        return 1, resolvedCode.strip()
-
-    def SGEVS(self):
-        ins, op1, op2 = (self.operands[0], int(self.operands[1][2:]), int(self.operands[2][2:]))
-        op1_val = self.core.RFs.get("VRF").Read(op1)
-        op2_val = self.core.RFs.get("SRF").Read(op2)
-        vl = self.core.RFs.get("VLG").Read()
-        masked_reg = [int(op1_val[i] >= op2_val) for i in range(0, vl)]
-        masked_reg.extend([0 for _ in range(self.core.MVL - vl)])
-        self.core.RFs.get("VMR").Write(0, masked_reg)
-        self.core.pc += 1
-        resolvedCode = ""
-        for i in self.operands:
-            resolvedCode += i + " "
-        return 1, resolvedCode.strip()
-
-    def SLEVS(self):
-        ins, op1, op2 = (self.operands[0], int(self.operands[1][2:]), int(self.operands[2][2:]))
-        op1_val = self.core.RFs.get("VRF").Read(op1)
-        op2_val = self.core.RFs.get("SRF").Read(op2)
-        vl = self.core.RFs.get("VLG").Read()
-        masked_reg = [int(op1_val[i] <= op2_val) for i in range(0, vl)]
-        masked_reg.extend([0 for _ in range(self.core.MVL - vl)])
-        self.core.RFs.get("VMR").Write(0, masked_reg)
-        self.core.pc += 1
-        resolvedCode = ""
-        for i in self.operands:
-            resolvedCode += i + " "
-        return 1, resolvedCode.strip()
-
-    # other
-    def POP(self):
-        ins, op2 = (self.operands[0], int(self.operands[1][2:]))
-        masked_reg = self.core.RFs.get("VMR").Read(0)
-        op2_val = 0
-        for i in masked_reg:
-            op2_val += i
-        self.core.RFs.get("SRF").Write(op2, op2_val)
-        self.core.pc += 1
-        resolvedCode = ""
-        for i in self.operands:
-            resolvedCode += i + " "
-        return 1, resolvedCode.strip()
-
-    def CVM(self):
-        self.core.RFs.get("VMR").Write(0, [1] * 64)
-        self.core.pc += 1
-        resolvedCode = ""
-        for i in self.operands:
-            resolvedCode += i + " "
-        return 1, resolvedCode.strip()
-
-    # endregion
-
-    # region VLG Instructions
-    def MTCL(self):
-        ins, op2 = (self.operands[0], int(self.operands[1][2:]))
-        op2_val = self.core.RFs.get("SRF").Read(op2)
-        self.core.RFs.get("VLG").Write(0, op2_val)
-        self.core.pc += 1
-        resolvedCode = ""
-        for i in self.operands:
-            resolvedCode += i + " "
-        resolvedCode += str(op2_val)
-        return 1, resolvedCode.strip()
-
-    def MFCL(self):
-        ins, op2 = (self.operands[0], int(self.operands[1][2:]))
-        veclen = self.core.RFs.get("VLG").Read()
-        self.core.RFs.get("SRF").Write(op2, veclen)
-        self.core.pc += 1
-        resolvedCode = ""
-        for i in self.operands:
-            resolvedCode += i + " "
-        return 1, resolvedCode.strip()
-
-    # endregion
-
-    # region Scalar Instructions
-    def ADD(self):
-        ins, op3, op1, op2 = (
-        self.operands[0], int(self.operands[1][2:]), int(self.operands[2][2:]), int(self.operands[3][2:]))
-        op2_val = self.core.RFs.get("SRF").Read(op2)
-        op1_val = self.core.RFs.get("SRF").Read(op1)
-        self.core.RFs.get("SRF").Write(op3, op1_val + op2_val)
-        self.core.pc += 1
-        resolvedCode = ""
-        for i in self.operands:
-            resolvedCode += i + " "
-        return 1, resolvedCode.strip()
-
-    def SUB(self):
-        ins, op3, op1, op2 = (
-        self.operands[0], int(self.operands[1][2:]), int(self.operands[2][2:]), int(self.operands[3][2:]))
-        op2_val = self.core.RFs.get("SRF").Read(op2)
-        op1_val = self.core.RFs.get("SRF").Read(op1)
-        self.core.RFs.get("SRF").Write(op3, op1_val - op2_val)
-        self.core.pc += 1
-        resolvedCode = ""
-        for i in self.operands:
-            resolvedCode += i + " "
-        return 1, resolvedCode.strip()
-
-    def SRA(self):
-        ins, op3, op1, op2 = (
-        self.operands[0], int(self.operands[1][2:]), int(self.operands[2][2:]), int(self.operands[3][2:]))
-        op2_val = self.core.RFs.get("SRF").Read(op2)
-        op1_val = self.core.RFs.get("SRF").Read(op1)
-        self.core.RFs.get("SRF").Write(op3, self.arithrightshift(op1_val, op2_val))
-        self.core.pc += 1
-        resolvedCode = ""
-        for i in self.operands:
-            resolvedCode += i + " "
-        return 1, resolvedCode.strip()
-
-    def SRL(self):
-        ins, op3, op1, op2 = (
-        self.operands[0], int(self.operands[1][2:]), int(self.operands[2][2:]), int(self.operands[3][2:]))
-        op2_val = self.core.RFs.get("SRF").Read(op2)
-        op1_val = self.core.RFs.get("SRF").Read(op1)
-        self.core.RFs.get("SRF").Write(op3, self.logicalrightshift(op1_val, op2_val))
-        self.core.pc += 1
-        resolvedCode = ""
-        for i in self.operands:
-            resolvedCode += i + " "
-        return 1, resolvedCode.strip()
-
-    def SLL(self):
-        ins, op3, op1, op2 = (
-        self.operands[0], int(self.operands[1][2:]), int(self.operands[2][2:]), int(self.operands[3][2:]))
-        op2_val = self.core.RFs.get("SRF").Read(op2)
-        op1_val = self.core.RFs.get("SRF").Read(op1)
-        self.core.RFs.get("SRF").Write(op3, self.logicalleftshift(op1_val, op2_val))
-        self.core.pc += 1
-        resolvedCode = ""
-        for i in self.operands:
-            resolvedCode += i + " "
-        return 1, resolvedCode.strip()
-
-    def AND(self):
-        ins, op3, op1, op2 = (
-        self.operands[0], int(self.operands[1][2:]), int(self.operands[2][2:]), int(self.operands[3][2:]))
-        op2_val = self.core.RFs.get("SRF").Read(op2)
-        op1_val = self.core.RFs.get("SRF").Read(op1)
-        self.core.RFs.get("SRF").Write(op3, op1_val & op2_val)
-        self.core.pc += 1
-        resolvedCode = ""
-        for i in self.operands:
-            resolvedCode += i + " "
-        return 1, resolvedCode.strip()
-
-    def OR(self):
-        ins, op3, op1, op2 = (
-        self.operands[0], int(self.operands[1][2:]), int(self.operands[2][2:]), int(self.operands[3][2:]))
-        op2_val = self.core.RFs.get("SRF").Read(op2)
-        op1_val = self.core.RFs.get("SRF").Read(op1)
-        self.core.RFs.get("SRF").Write(op3, op1_val | op2_val)
-        self.core.pc += 1
-        resolvedCode = ""
-        for i in self.operands:
-            resolvedCode += i + " "
-        return 1, resolvedCode.strip()
-
-    def XOR(self):
-        ins, op3, op1, op2 = (
-        self.operands[0], int(self.operands[1][2:]), int(self.operands[2][2:]), int(self.operands[3][2:]))
-        op2_val = self.core.RFs.get("SRF").Read(op2)
-        op1_val = self.core.RFs.get("SRF").Read(op1)
-        self.core.RFs.get("SRF").Write(op3, op1_val ^ op2_val)
-        self.core.pc += 1
-        resolvedCode = ""
-        for i in self.operands:
-            resolvedCode += i + " "
-        return 1, resolvedCode.strip()
-
-    def logicalleftshift(self, n, shift):
-        return (n << shift) & 0xffffffff
-
-    def logicalrightshift(self, n, shift):
-        n_unsigned = n & 0xffffffff
-        result_unsigned = n_unsigned >> shift
-
-        if n < 0:
-            if result_unsigned & 0x80000000:
-                result_signed = -((~result_unsigned + 1) & 0xffffffff)
-            else:
-                result_signed = result_unsigned
-        else:
-            result_signed = result_unsigned
-        return result_signed
-
-    def arithrightshift(self, n, shift):
-        if n < 0:
-            n = (n >> 1) & ~(1 << 31)
-            for i in range(shift - 1):
-                n = (n >> 1) | (1 << 31)
-        else:
-            n = n >> shift
-        return n
-
-    # endregion
-
-    # region Control Instructions
-    def BEQ(self):
-        ins, op1, op2, imm = (
-        self.operands[0], int(self.operands[1][2:]), int(self.operands[2][2:]), int(self.operands[3]))
-        op2_val = self.core.RFs.get("SRF").Read(op2)
-        op1_val = self.core.RFs.get("SRF").Read(op1)
-        if op2_val == op1_val:
-            self.core.pc += imm
-        else:
-            self.core.pc += 1
-        resolvedCode = ""
-        for i in self.operands:
-            resolvedCode += i + " "
-        return 1, resolvedCode.strip()
-
-    def BNE(self):
-        ins, op1, op2, imm = (
-        self.operands[0], int(self.operands[1][2:]), int(self.operands[2][2:]), int(self.operands[3]))
-        op2_val = self.core.RFs.get("SRF").Read(op2)
-        op1_val = self.core.RFs.get("SRF").Read(op1)
-        if op2_val != op1_val:
-            self.core.pc += imm
-        else:
-            self.core.pc += 1
-        resolvedCode = ""
-        for i in self.operands:
-            resolvedCode += i + " "
-        return 1, resolvedCode.strip()
-
-    def BGT(self):
-        ins, op1, op2, imm = (
-        self.operands[0], int(self.operands[1][2:]), int(self.operands[2][2:]), int(self.operands[3]))
-        op2_val = self.core.RFs.get("SRF").Read(op2)
-        op1_val = self.core.RFs.get("SRF").Read(op1)
-        if op2_val < op1_val:
-            self.core.pc += imm
-        else:
-            self.core.pc += 1
-        resolvedCode = ""
-        for i in self.operands:
-            resolvedCode += i + " "
-        return 1, resolvedCode.strip()
-
-    def BLT(self):
-        ins, op1, op2, imm = (
-        self.operands[0], int(self.operands[1][2:]), int(self.operands[2][2:]), int(self.operands[3]))
-        op2_val = self.core.RFs.get("SRF").Read(op2)
-        op1_val = self.core.RFs.get("SRF").Read(op1)
-        if op2_val > op1_val:
-            self.core.pc += imm
-        else:
-            self.core.pc += 1
-        resolvedCode = ""
-        for i in self.operands:
-            resolvedCode += i + " "
-        return 1, resolvedCode.strip()
-
-    def BGE(self):
-        ins, op1, op2, imm = (
-        self.operands[0], int(self.operands[1][2:]), int(self.operands[2][2:]), int(self.operands[3]))
-        op2_val = self.core.RFs.get("SRF").Read(op2)
-        op1_val = self.core.RFs.get("SRF").Read(op1)
-        if op2_val <= op1_val:
-            self.core.pc += imm
-        else:
-            self.core.pc += 1
-        resolvedCode = ""
-        for i in self.operands:
-            resolvedCode += i + " "
-        return 1, resolvedCode.strip()
-
-    def BLE(self):
-        ins, op1, op2, imm = (
-        self.operands[0], int(self.operands[1][2:]), int(self.operands[2][2:]), int(self.operands[3]))
-        op2_val = self.core.RFs.get("SRF").Read(op2)
-        op1_val = self.core.RFs.get("SRF").Read(op1)
-        if op2_val >= op1_val:
-            self.core.pc += imm
-        else:
-            self.core.pc += 1
-        resolvedCode = ""
-        for i in self.operands:
-            resolvedCode += i + " "
-        return 1, resolvedCode.strip()
-
-    # endregion
-
-    # region Other
-    def HALT(self):
-        resolvedCode = ""
-        for i in self.operands:
-            resolvedCode += i + " "
-        return 0, resolvedCode.strip()
-
-    def mask(self, index, value, vector_length=-1):
-        present_val = self.core.RFs.get("VRF").Read(index)
-        mask_reg = self.core.RFs.get("VMR").Read()
-        if vector_length == -1:
-            vector_length = self.core.RFs.get("VLG").Read()
-        for i in range(vector_length):
-            if mask_reg[i]:
-                present_val[i] = value[i]
-        return present_val
-
-    # endregion
-
-    # region Default
-    def Default(self):
-        print("Wrong Instruction")
-        return 0
-    # endregion
-
-
-if __name__ == "__main__":
-    # parse arguments for input file location
-    parser = argparse.ArgumentParser(
-        description='Vector Core Performance Model')
-    parser.add_argument('--iodir', default="", type=str,
-                        help='Path to the folder containing the input files - instructions and data.')
-    args = parser.parse_args()
-
-    iodir = os.path.abspath(args.iodir)
-    print("IO Directory:", iodir)
-    # Parse IMEM
-    imem = IMEM(iodir)
-    # Parse SMEM
-    sdmem = DMEM("SDMEM", iodir, 13)  # 32 KB is 2^15 bytes = 2^13 K 32-bit words.
-    # Parse VMEM
-    vdmem = DMEM("VDMEM", iodir, 17)  # 512 KB is 2^19 bytes = 2^17 K 32-bit words.
-
-    # Create Vector Core
-    vcore = Core(imem, sdmem, vdmem)
-    result = vcore.run()
-    if result == 0:
-        print("Simulation Completed!")
-    vcore.dumpRegs(iodir)
-    vcore.dumpResolvedCode(iodir)
-    sdmem.dump()
-    vdmem.dump()
+import os
+import re
+import json
+import time
+import copy
+import pickle
+import zipfile
+import hashlib
+import argparse
+import itertools
+import operator
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+
+
+def int32(value):  # Wrap a Python int to a signed 32-bit word.
+    return ((value + 0x80000000) & 0xffffffff) - 0x80000000
+
+
+def truncdiv(a, b):  # Integer division rounding toward zero, as the hardware divider does.
+    quotient = abs(a) // abs(b)  # Exact on ints of any size, unlike int(a / b) through a float.
+    return -quotient if (a < 0) != (b < 0) else quotient
+
+
+class Assembler(object):
+    # Front end for Code.asm. Strips comments, turns "label:" definitions used as branch targets into
+    # relative offsets, and checks every instruction against the opcode and operand tables of Instructionref.
+    # The program comes out as (opcode, text, operands) records, text being the instruction as traced.
+    VERSION = 1  # Part of the cache key, bump whenever the records change.
+    LABEL = re.compile(r"([A-Za-z_][\w.]*):")
+    REGISTER = re.compile(r"[SV]R\d+$")
+    BRANCHES = ("BEQ", "BNE", "BGT", "BLT", "BGE", "BLE")
+
+    def __init__(self, name="Code.asm"):
+        self.name = name
+        self.opcodes = Instructionref(None).ins
+        self.errors = []
+
+    def error(self, number, message):
+        self.errors.append((number, message))
+        print("IMEM - ERROR: %s line %d: %s" % (self.name, number, message))
+
+    def assemble(self, lines):
+        statements, labels = [], {}
+        for number, line in enumerate(lines, 1):
+            line = line.split('#')[0].strip()
+            match = self.LABEL.match(line)
+            while match:
+                if match.group(1) in labels:
+                    self.error(number, "label %s is already defined" % match.group(1))
+                labels[match.group(1)] = len(statements)
+                line = line[match.end():].strip()
+                match = self.LABEL.match(line)
+            if line:
+                statements.append((number, line.split()))
+        return [self.assembleOne(pc, number, tokens, labels) for pc, (number, tokens) in enumerate(statements)]
+
+    def assembleOne(self, pc, number, tokens, labels):
+        # Instructions that fail a check keep their text but no opcode, so they run as Default.
+        opcode, errors = tokens[0], len(self.errors)
+        kinds = Instructionref.formats.get(opcode, "")
+        if opcode not in self.opcodes:
+            self.error(number, "unknown opcode %s" % opcode)
+        elif len(tokens) - 1 != len(kinds):
+            self.error(number, "%s takes %d operands, got %d" % (opcode, len(kinds), len(tokens) - 1))
+        tokens, operands = tokens[:], []
+        for position, (kind, token) in enumerate(zip(kinds, tokens[1:]), 1):
+            if kind == "R" and self.REGISTER.match(token):
+                operands.append(int(token[2:]))
+            elif kind == "I" and opcode in self.BRANCHES and token in labels:
+                operands.append(labels[token] - pc)
+                tokens[position] = str(operands[-1])
+            elif kind == "I" and re.match(r"[-+]?\d+$", token):
+                operands.append(int(token))
+            else:
+                self.error(number, "bad operand %s for %s" % (token, opcode))
+        if len(self.errors) > errors:
+            return None, " ".join(tokens), ()
+        return opcode, " ".join(tokens), tuple(operands)
+
+
+class IMEM(object):
+    def __init__(self, iodir, cache=True):
+        self.size = pow(2, 16)  # Can hold a maximum of 2^16 instructions.
+        self.filepath = os.path.abspath(os.path.join(iodir, "Code.asm"))
+        self.cachedir = os.path.join(os.path.dirname(self.filepath), "__asmcache__") if cache else None
+        self.instructions = []
+
+        try:
+            with open(self.filepath, 'r') as insf:
+                source = insf.read()
+            self.program = self.load(source)
+            self._instructions = [text for opcode, text, operands in self.program]
+            print("IMEM - Instructions loaded from file:", self.filepath)
+        except IOError:
+            print("IMEM - ERROR: Couldn't open file in path:", self.filepath)
+
+    def load(self, source):
+        # Assembled records of source, from the on-disk cache when the same source was assembled before.
+        # Programs with errors are not cached, so their errors are reported on every run.
+        key = hashlib.sha1(("%d\n" % Assembler.VERSION + source).encode()).hexdigest()
+        path = None if self.cachedir is None else os.path.join(self.cachedir, key + ".pkl")
+        if path is not None and os.path.exists(path):
+            try:
+                with open(path, 'rb') as cachef:
+                    return pickle.load(cachef)
+            except (IOError, pickle.UnpicklingError, EOFError):
+                pass
+        assembler = Assembler(os.path.basename(self.filepath))
+        program = assembler.assemble(source.splitlines())
+        if path is not None and not assembler.errors:
+            try:
+                os.makedirs(self.cachedir, exist_ok=True)
+                with open(path, 'wb') as cachef:
+                    pickle.dump(program, cachef, pickle.HIGHEST_PROTOCOL)
+            except (IOError, OSError):  # A read-only iodir just runs uncached.
+                pass
+        return program
+
+    def digest(self):  # Identifies the program, so a checkpoint is only restored over the same Code.asm.
+        return hashlib.sha1("\n".join(self.instructions).encode()).hexdigest()
+
+    def Read(self, idx):  # Use this to read from IMEM.
+        if idx < self.size:
+            return self.instructions[idx]
+        else:
+            print("IMEM - ERROR: Invalid memory access at index: ", idx, " with memory size: ", self.size)
+
+    @property
+    def instructions(self):
+        return self._instructions
+
+    @instructions.setter
+    def instructions(self, instructions):  # Replacing the program drops the stale assembled and decoded tables.
+        self._instructions = instructions
+        self.program = None
+        self.decoded = None  # Per-PC table of (handler, args), built once by decode().
+
+    def decode(self, insref, fuse=False, addressOnly=False):
+        # Decode the whole program once per variant, bound to the handlers of insref.
+        if self.decoded is None or self.decoded[0] is not insref:
+            self.decoded = (insref, {})
+        variants = self.decoded[1]
+        if (fuse, addressOnly) not in variants:
+            if fuse:
+                program = insref.fuse(self.decode(insref, addressOnly=addressOnly))
+            elif addressOnly:
+                program = insref.addressOnly(self.decode(insref))
+            else:
+                if self.program is None:  # Elements set by hand may hold several lines, e.g. "ADDVV ...\nHALT".
+                    lines = [line for instruction in self._instructions for line in instruction.splitlines()]
+                    self.program = Assembler().assemble(lines)
+                    self._instructions = [text for opcode, text, operands in self.program]
+                program = [(insref.ins.get(opcode, insref.Default), (text,) + operands)
+                           for opcode, text, operands in self.program]
+            variants[(fuse, addressOnly)] = program
+        return variants[(fuse, addressOnly)]
+
+
+class SharedImage(object):
+    # A DMEM input image published once in shared memory, so many runs (e.g. the batchrun.py workers) can
+    # start from it without each parsing and holding a copy. The handle pickles by name. Every DMEM built
+    # from it maps the segment copy-on-write: pages stay shared until a run writes to them.
+    def __init__(self, image):
+        image = np.ascontiguousarray(image, dtype=np.int32)
+        self.shm = shared_memory.SharedMemory(create=True, size=max(image.nbytes, 1))
+        np.ndarray(image.shape, dtype=np.int32, buffer=self.shm.buf)[:] = image
+        self.name, self.length = self.shm.name, len(image)
+
+    def __getstate__(self):
+        return {"name": self.name, "length": self.length}
+
+    def map(self):
+        path = os.path.join("/dev/shm", self.name)
+        if os.path.exists(path):  # POSIX shared memory is a file that can be mapped privately.
+            return np.memmap(path, dtype=np.int32, mode='c', shape=(self.length,))
+        shm = shared_memory.SharedMemory(self.name)  # Elsewhere, fall back to a private copy.
+        try:
+            return np.array(np.ndarray((self.length,), dtype=np.int32, buffer=shm.buf))
+        finally:
+            shm.close()
+            if os.name == "posix":  # Only the publisher may unlink the segment.
+                resource_tracker.unregister(shm._name, "shared_memory")
+
+    def close(self):  # Publisher only, once every run is done.
+        self.shm.close()
+        self.shm.unlink()
+
+
+class DMEM(object):
+    DUMP_FORMATS = ("txt", "npy", "delta")
+    PAGE_BITS = 10  # Dirty tracking granularity: pages of 2^10 words.
+
+    # Word addressible - each address contains 32 bits.
+    def __init__(self, name, iodir, addressLen, image=None):
+        self.name = name
+        self.addressLen = addressLen
+        self.size = pow(2, addressLen)
+        self.pageBits = min(self.PAGE_BITS, addressLen)
+        self.min_value = -pow(2, 31)
+        self.max_value = pow(2, 31) - 1
+        self.ipfilepath = os.path.abspath(os.path.join(iodir, name + ".txt"))
+        self.opfilepath = os.path.abspath(os.path.join(iodir, name + "OP.txt"))
+        self.setImage(np.zeros(0, dtype=np.int32))  # Untouched words read as zero.
+        if image is not None:  # Caller supplied the initial contents, nothing is read from iodir.
+            self.setImage(image.map() if isinstance(image, SharedImage) else np.asarray(image))
+            return
+
+        # Binary images are preferred over the text file: NAME.npy, then NAME.bin (raw little-endian int32).
+        for loader, ext in ((self.loadNpy, ".npy"), (self.loadRaw, ".bin"), (self.loadText, ".txt")):
+            path = os.path.abspath(os.path.join(iodir, name + ext))
+            if os.path.exists(path):
+                self.ipfilepath = path
+                break
+        else:
+            loader = self.loadText
+
+        try:
+            loader(self.ipfilepath)
+            print(self.name, "- Data loaded from file:", self.ipfilepath)
+        except:
+            print(self.name, "- ERROR: Couldn't open input file in path:", self.ipfilepath)
+
+    def loadNpy(self, path):
+        self.setImage(np.load(path, mmap_mode='c'))
+
+    def loadRaw(self, path):
+        self.setImage(np.memmap(path, dtype='<i4', mode='c'))
+
+    def loadText(self, path):
+        with open(path, 'r') as ipf:
+            self.setImage(np.array(ipf.read().split(), dtype=np.int64))
+
+    def setImage(self, image):
+        # Contiguous int32 words. A full-size int32 image is used in place: a copy-on-write mapping stays
+        # backed by the file and only the pages that get written are copied. Shorter images are copied in
+        # and zero padded.
+        if image.ndim == 1 and len(image) == self.size and image.dtype == np.int32:
+            self.data = image
+        else:
+            self.data = np.zeros(max(self.size, len(image)), dtype=np.int32)
+            self.data[:len(image)] = image
+        self.dirty = np.zeros(-(-len(self.data) >> self.pageBits), dtype=bool)  # Pages written since then.
+
+    def Read(self, idx):  # Use this to read from DMEM.
+        if idx < self.size:
+            return int(self.data[idx])
+        else:
+            print("Error : Out of bounds exception")
+
+    def Write(self, idx, val):  # Use this to write into DMEM.
+        if idx < self.size:
+            self.data[idx] = int32(val)
+            self.dirty[idx >> self.pageBits] = True
+        else:
+            print("Error : Out of bounds exception")
+
+    def ReadVector(self, addresses):  # Gather words at a sequence of addresses into an int32 array.
+        addresses = np.asarray(addresses, dtype=np.int64)
+        if len(addresses) and addresses.max() >= self.size:
+            print("Error : Out of bounds exception")
+            addresses = np.where(addresses < self.size, addresses, 0)
+        return self.data[addresses]
+
+    def WriteVector(self, addresses, values):  # Scatter values to a sequence of addresses.
+        addresses = np.asarray(addresses, dtype=np.int64)
+        if len(addresses) and addresses.max() >= self.size:
+            print("Error : Out of bounds exception")
+            inbounds = addresses < self.size
+            addresses, values = addresses[inbounds], np.asarray(values)[inbounds]
+        self.data[addresses] = values
+        self.dirty[addresses >> self.pageBits] = True
+
+    def snapshot(self):  # Detached copy that can be dumped while this DMEM keeps changing.
+        snapshot = copy.copy(self)
+        snapshot.data, snapshot.dirty = np.array(self.data), self.dirty.copy()
+        return snapshot
+
+    def dump(self, fmt="txt"):
+        # "npy" writes NAMEOP.npy, the raw int32 image, which can also be fed back in as NAME.npy.
+        # "delta" writes NAMEOP.delta.npz holding only the pages written since the input image was loaded.
+        opfilepath = os.path.splitext(self.opfilepath)[0] + (".delta.npz" if fmt == "delta" else "." + fmt)
+        try:
+            if fmt == "delta":
+                self.dumpDelta(opfilepath)
+            elif fmt == "npy":
+                self.dumpNpy(opfilepath)
+            else:
+                self.dumpText(opfilepath)
+            print(self.name, "- Dumped data into output file in path:", opfilepath)
+        except:
+            print(self.name, "- ERROR: Couldn't open output file in path:", opfilepath)
+
+    def dumpNpy(self, path):
+        np.save(path, self.data)
+
+    def dumpText(self, path):
+        with open(path, 'w') as opf:
+            lines = [str(data) + '\n' for data in self.data.tolist()]
+            opf.writelines(lines)
+
+    def dirtyPages(self):  # Indices and contents of the pages written since the image was loaded.
+        pages = np.flatnonzero(self.dirty)
+        pageSize = 1 << self.pageBits
+        padded = np.zeros(len(self.dirty) * pageSize, dtype=np.int32)  # Covers a ragged last page.
+        padded[:len(self.data)] = self.data
+        return pages, padded.reshape(-1, pageSize)[pages]
+
+    def applyPages(self, pages, data, pageBits):  # Overlay pages of 2^pageBits words, marking them dirty.
+        pageSize = 1 << pageBits
+        for page, words in zip(pages.tolist(), data):
+            end = min((page + 1) * pageSize, len(self.data))
+            self.data[page * pageSize:end] = words[:end - page * pageSize]
+            self.dirty[(page * pageSize) >> self.pageBits:((end - 1) >> self.pageBits) + 1] = True
+
+    def dumpDelta(self, path):
+        pages, data = self.dirtyPages()
+        np.savez(path, name=self.name, addressLen=self.addressLen, pageBits=self.pageBits, pages=pages,
+                 data=data, image=os.path.basename(self.ipfilepath))
+
+    def applyDelta(self, path):  # Overlay the pages of a delta dump onto the current contents.
+        with np.load(path) as delta:
+            self.applyPages(delta["pages"], delta["data"], int(delta["pageBits"]))
+        print(self.name, "- Delta applied from file:", path)
+
+
+class SparseDMEM(DMEM):
+    # DMEM for wide address lengths. Holds the input image as given (possibly a copy-on-write mapping) and a
+    # dict of the pages of 2^pageBits words written since. A page is copied from the image, or zeroed, on its
+    # first write, and words outside both read as zero, so memory scales with what a run touches. The
+    # written pages are exactly the dirty pages, and dumps look the same as for DMEM.
+    def setImage(self, image):
+        self.image = image if image.dtype == np.int32 else image.astype(np.int32)
+        self.pages = {}
+        self.pageMask = (1 << self.pageBits) - 1
+
+    @property
+    def data(self):  # Dense copy of the words up to the last one the image or a written page covers.
+        pageSize = 1 << self.pageBits
+        end = max([len(self.image)] + [(page + 1) * pageSize for page in self.pages])
+        data = np.zeros(min(end, max(self.size, len(self.image))), dtype=np.int32)
+        data[:len(self.image)] = self.image
+        for page, words in self.pages.items():
+            data[page * pageSize:(page + 1) * pageSize] = words[:len(data) - page * pageSize]
+        return data
+
+    def page(self, page):  # The writable copy of a page, allocated on first use.
+        words = self.pages.get(page)
+        if words is None:
+            start = page << self.pageBits
+            words = np.zeros(1 << self.pageBits, dtype=np.int32)
+            image = self.image[start:start + len(words)]
+            words[:len(image)] = image
+            self.pages[page] = words
+        return words
+
+    def Read(self, idx):
+        if idx < self.size:
+            words = self.pages.get(idx >> self.pageBits)
+            if words is not None:
+                return int(words[idx & self.pageMask])
+            return int(self.image[idx]) if idx < len(self.image) else 0
+        else:
+            print("Error : Out of bounds exception")
+
+    def Write(self, idx, val):
+        if idx < self.size:
+            self.page(idx >> self.pageBits)[idx & self.pageMask] = int32(val)
+        else:
+            print("Error : Out of bounds exception")
+
+    def ReadVector(self, addresses):
+        addresses = np.asarray(addresses, dtype=np.int64)
+        if len(addresses) and addresses.max() >= self.size:
+            print("Error : Out of bounds exception")
+            addresses = np.where(addresses < self.size, addresses, 0)
+        values = np.zeros(len(addresses), dtype=np.int32)
+        inimage = addresses < len(self.image)
+        values[inimage] = self.image[addresses[inimage]]
+        if self.pages:
+            pages = addresses >> self.pageBits
+            for page in np.unique(pages).tolist():
+                if page in self.pages:
+                    selected = pages == page
+                    values[selected] = self.pages[page][addresses[selected] & self.pageMask]
+        return values
+
+    def WriteVector(self, addresses, values):
+        addresses, values = np.asarray(addresses, dtype=np.int64), np.asarray(values)
+        if len(addresses) and addresses.max() >= self.size:
+            print("Error : Out of bounds exception")
+            inbounds = addresses < self.size
+            addresses, values = addresses[inbounds], values[inbounds]
+        pages = addresses >> self.pageBits
+        for page in np.unique(pages).tolist():
+            selected = pages == page
+            self.page(page)[addresses[selected] & self.pageMask] = values[selected]
+
+    def snapshot(self):
+        snapshot = copy.copy(self)
+        snapshot.pages = {page: words.copy() for page, words in self.pages.items()}
+        return snapshot
+
+    def dirtyPages(self):
+        pages = np.array(sorted(self.pages), dtype=np.int64)
+        data = np.array([self.pages[page] for page in pages.tolist()], dtype=np.int32)
+        return pages, data.reshape(len(pages), 1 << self.pageBits)
+
+    def applyPages(self, pages, data, pageBits):
+        pageSize = 1 << pageBits
+        for page, words in zip(pages.tolist(), data):
+            end = min((page + 1) * pageSize, max(self.size, len(self.image)))
+            self.WriteVector(np.arange(page * pageSize, end), words[:end - page * pageSize])
+
+    def words(self):  # (start, words) over the whole address space, one page at a time.
+        pageSize, end = 1 << self.pageBits, max(self.size, len(self.image))
+        zeros = np.zeros(pageSize, dtype=np.int32)
+        for start in range(0, end, pageSize):
+            words = self.pages.get(start >> self.pageBits)
+            if words is None and start < len(self.image):
+                words = np.zeros(pageSize, dtype=np.int32)
+                image = self.image[start:start + pageSize]
+                words[:len(image)] = image
+            yield start, (zeros if words is None else words)[:end - start]
+
+    def dumpNpy(self, path):  # Streamed page by page; all-zero pages are left as holes in the file.
+        data = np.lib.format.open_memmap(path, mode='w+', dtype=np.int32, shape=(max(self.size, len(self.image)),))
+        for start, words in self.words():
+            if words.any():
+                data[start:start + len(words)] = words
+        data.flush()
+        del data
+
+    def dumpText(self, path):
+        with open(path, 'w') as opf:
+            for start, words in self.words():
+                opf.writelines([str(data) + '\n' for data in words.tolist()])
+
+
+class RegisterFile(object):
+    BACKENDS = ("list", "numpy")
+
+    def __init__(self, name, count, length=1, size=32, backend="list"):
+        self.name = name
+        self.reg_count = count
+        self.vec_length = length  # Number of 32 bit words in a register.
+        self.reg_bits = size
+        self.min_value = -pow(2, self.reg_bits - 1)
+        self.max_value = pow(2, self.reg_bits - 1) - 1
+        self.backend = backend
+        if backend == "numpy":
+            # One contiguous int32 row per register; arithmetic on it wraps like the hardware does.
+            self.registers = np.zeros((self.reg_count, self.vec_length), dtype=np.int32)
+        else:
+            self.registers = [[0x0 for _ in range(self.vec_length)] for r in
+                              range(self.reg_count)]  # list of lists of integers
+
+    def Read(self, idx=0):
+        if idx < self.reg_count:
+            if self.backend == "numpy":
+                return self.registers[idx] if self.vec_length != 1 else int(self.registers[idx][0])
+            val = self.registers[idx]
+            if len(val) != 1:
+                return self.registers[idx]
+            else:
+                return self.registers[idx][0]
+        else:
+            print("Error : Out of bounds exception")
+
+    def Write(self, idx, val):
+        if idx < self.reg_count:
+            if self.backend == "numpy":
+                self.registers[idx] = val
+            elif type(val) == int:
+                self.registers[idx] = [val]
+            else:
+                self.registers[idx] = val
+        else:
+            print("Error : Out of bounds exception")
+
+    def snapshot(self):  # Detached copy that can be dumped while this register file keeps changing.
+        snapshot = copy.copy(self)
+        snapshot.registers = self.registers.copy() if self.backend == "numpy" else [list(register) for register
+                                                                                   in self.registers]
+        return snapshot
+
+    def dump(self, iodir, fmt="txt"):
+        if fmt != "txt":  # Register files are small, both binary formats write the whole file.
+            return self.dumpNpz(iodir)
+        opfilepath = os.path.abspath(os.path.join(iodir, self.name + ".txt"))
+        try:
+            with open(opfilepath, 'w') as opf:
+                row_format = "{:<13}" * self.vec_length
+                lines = [row_format.format(*[str(i) for i in range(self.vec_length)]) + "\n",
+                         '-' * (self.vec_length * 13) + "\n"]
+                lines += [row_format.format(*[str(val) for val in data]) + "\n" for data in
+                          (self.registers.tolist() if self.backend == "numpy" else self.registers)]
+                opf.writelines(lines)
+            print(self.name, "- Dumped data into output file in path:", opfilepath)
+        except:
+            print(self.name, "- ERROR: Couldn't open output file in path:", opfilepath)
+
+    def dumpNpz(self, iodir):  # Binary dump: NAME.npz holding the registers and the shape of the file.
+        opfilepath = os.path.abspath(os.path.join(iodir, self.name + ".npz"))
+        try:
+            np.savez(opfilepath, registers=np.asarray(self.registers), name=self.name, count=self.reg_count,
+                     length=self.vec_length, size=self.reg_bits)
+            print(self.name, "- Dumped data into output file in path:", opfilepath)
+        except:
+            print(self.name, "- ERROR: Couldn't open output file in path:", opfilepath)
+
+
+class MaskRegister(RegisterFile):
+    # The VMR as a single integer bitmask, bit i enabling element i. POP is a popcount, and masked writes
+    # under a full or empty mask become a plain copy or nothing. Read/Write and the dumps still see the
+    # one-register file of 0/1 elements of RegisterFile.
+    def __init__(self, name, length, backend="list"):
+        self.bits = 0
+        self.full = (1 << length) - 1
+        self.elements = None  # Bool array of the current bits, built on demand for the numpy backend.
+        RegisterFile.__init__(self, name, 1, length, 1, backend)
+
+    @property
+    def registers(self):
+        register = [self.bits >> i & 1 for i in range(self.vec_length)]
+        return np.array([register], dtype=np.int32) if self.backend == "numpy" else [register]
+
+    @registers.setter
+    def registers(self, registers):
+        self.Write(0, registers[0])
+
+    def Read(self, idx=0):
+        if idx < self.reg_count:
+            return self.registers[0]
+        else:
+            print("Error : Out of bounds exception")
+
+    def Write(self, idx, val):
+        if idx < self.reg_count:
+            self.WriteElements(np.asarray(val)[:self.vec_length] != 0)
+        else:
+            print("Error : Out of bounds exception")
+
+    def ReadBits(self):
+        return self.bits
+
+    def WriteBits(self, bits):
+        self.bits = bits & self.full
+        self.elements = None
+
+    def WriteElements(self, enabled):  # Bits from a bool sequence; elements past its end are cleared.
+        self.WriteBits(int.from_bytes(np.packbits(enabled, bitorder='little').tobytes(), 'little'))
+
+    def Elements(self, count):  # Bool array of the first count elements.
+        if self.elements is None:
+            self.elements = np.unpackbits(np.frombuffer(self.bits.to_bytes(-(-self.vec_length // 8), 'little'),
+                                                        dtype=np.uint8), bitorder='little').astype(bool)
+        return self.elements[:count]
+
+    def Count(self, count=None):  # Number of enabled elements, for POP, or of the first count elements.
+        return bin(self.bits if count is None else self.bits & (1 << count) - 1).count("1")
+
+    def isFull(self, count):  # Are the first count elements all enabled?
+        low = (1 << count) - 1
+        return self.bits & low == low
+
+    def isEmpty(self, count):
+        return self.bits & ((1 << count) - 1) == 0
+
+
+class TraceWriter(object):
+    # Buffered sink for the resolved trace. Lines go to disk as instructions retire, so memory use does not
+    # grow with the length of the run.
+    def __init__(self, path, buffering=1 << 20):
+        self.path = path
+        self.file = open(path, 'w', buffering=buffering)
+
+    def write(self, line):
+        self.file.write(line + "\n")
+
+    def writeLines(self, lines):
+        self.file.writelines(line + "\n" for line in lines)
+
+    def text(self):  # Everything written so far.
+        self.file.flush()
+        with open(self.path, 'r') as tracef:
+            return tracef.read()
+
+    def close(self):
+        self.file.close()
+
+
+class LoopTrace(object):
+    # Resolved trace of the trips LoopForwarder ran at once, kept as one entry of Core.resolvedCode. The lines
+    # are only formatted when the trace is written: str() gives all of them.
+    def __init__(self, steps, trips, veclen, resolve):
+        self.steps = steps  # Per instruction of a trip: its text, or (text, base, step, stride) of an LV/LVWS.
+        self.trips = trips
+        self.veclen = veclen
+        self.resolve = resolve  # Instructionref.resolveStrided
+
+    def lines(self):
+        for trip in range(self.trips):
+            for step in self.steps:
+                if isinstance(step, str):
+                    yield step
+                else:
+                    text, base, delta, stride = step
+                    yield self.resolve(text, base + trip * delta, stride, self.veclen)
+
+    def __str__(self):
+        return "\n".join(self.lines())
+
+
+class DumpWriter(object):
+    # Runs end-of-run dumps on a thread pool. Every dump works on a snapshot taken when it is submitted,
+    # so the caller can go on, e.g. with the next simulation, while the files are being written. The dumps
+    # print their status lines from the pool threads, which can interleave, as in batchrun.py workers whose
+    # console output is discarded.
+    def __init__(self, workers=4):
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self.pending = []
+
+    def submit(self, dump, *args):
+        self.pending.append(self.pool.submit(dump, *args))
+
+    def dumpCore(self, vcore, iodir, fmt="txt"):
+        for rf in vcore.RFs.values():
+            self.submit(rf.snapshot().dump, iodir, fmt)
+        # The trace is handed over rather than copied: the core starts a new one.
+        trace = copy.copy(vcore)
+        vcore.resolvedCode, vcore.traceWriter = [], None
+        self.submit(trace.dumpResolvedCode, iodir)
+
+    def dumpDMEM(self, dmem, fmt="txt"):
+        self.submit(dmem.snapshot().dump, fmt)
+
+    def wait(self):  # Blocks until every submitted dump is written, re-raising the first failure.
+        pending, self.pending = self.pending, []
+        for future in pending:
+            future.result()
+
+    def close(self):
+        self.wait()
+        self.pool.shutdown()
+
+
+class Workload(object):
+    # Dynamic statistics of a run for sizing hardware, collected by Instructionref: the instruction mix in the
+    # classes of the Timing Simulator's Decode.INS, effective vector length and mask density per vector op,
+    # the LVWS/SVWS stride histogram, the LVI/SVI spread and the bytes moved.
+    DATA = ("LV", "SV", "LVWS", "SVWS", "LVI", "SVI")
+    COMPUTE = ("ADDVV", "SUBVV", "MULVV", "DIVVV", "ADDVS", "SUBVS", "MULVS", "DIVVS", "SEQVV", "SNEVV", "SGTVV",
+               "SLTVV", "SGEVV", "SLEVV", "SEQVS", "SNEVS", "SGTVS", "SLTVS", "SGEVS", "SLEVS")
+    WORD = 4  # Bytes per element.
+
+    def __init__(self, core):
+        self.core = core
+        self.counts = []  # Dispatches per PC, counted by Core.run.
+        self.spans = {}  # PC -> instructions run by one dispatch there: fused instructions and compiled blocks.
+        self.vectors = {}  # Opcode -> [executions, lanes, enabled lanes, {VL: executions}].
+        self.strides = {}  # LVWS/SVWS -> {stride: executions}.
+        self.spreads = {}  # LVI/SVI -> {spread rounded up to a power of two: executions}.
+        self.vdmemBytes = [0, 0]  # Read, written.
+        self.restored = []  # Executions per PC before the checkpoint the run was restored from.
+
+    def dispatches(self, program):  # The counters Core.run bumps for each PC of program.
+        if len(self.counts) != len(program):
+            self.counts = [0] * len(program)
+        for pc, (handler, args) in enumerate(program):
+            if handler.__name__ in ("MULADDVV", "SCALARBRANCH"):
+                self.spans[pc] = args[0].count("\n") + 1
+        return self.counts
+
+    def vector(self, name, veclen, masked=True):  # Returns the number of lanes the VMR enables.
+        stats = self.vectors.get(name)
+        if stats is None:
+            stats = self.vectors[name] = [0, 0, 0, {}]
+        enabled = self.core.RFs.get("VMR").Count(veclen) if masked else veclen
+        stats[0] += 1
+        stats[1] += veclen
+        stats[2] += enabled
+        stats[3][veclen] = stats[3].get(veclen, 0) + 1
+        return enabled
+
+    def access(self, name, veclen, stride=None, offsets=None):  # A vector load or store.
+        enabled = self.vector(name, veclen)
+        self.vdmemBytes[name[0] == "S"] += enabled * self.WORD
+        if stride is not None:
+            strides = self.strides.setdefault(name, {})
+            strides[stride] = strides.get(stride, 0) + 1
+        elif offsets is not None and veclen > 0:
+            if isinstance(offsets, np.ndarray):
+                spread = int(offsets.max()) - int(offsets.min()) + 1
+            else:
+                spread = max(offsets) - min(offsets) + 1
+            spreads = self.spreads.setdefault(name, {})
+            bucket = 1 << (spread - 1).bit_length()
+            spreads[bucket] = spreads.get(bucket, 0) + 1
+
+    def repeat(self, name, veclen, trips, stride=None):  # trips executions of an LV/LVWS or vector op, full VMR.
+        stats = self.vectors.get(name)
+        if stats is None:
+            stats = self.vectors[name] = [0, 0, 0, {}]
+        stats[0] += trips
+        stats[1] += veclen * trips
+        stats[2] += veclen * trips
+        stats[3][veclen] = stats[3].get(veclen, 0) + trips
+        if name in self.DATA:
+            self.vdmemBytes[name[0] == "S"] += veclen * trips * self.WORD
+        if stride is not None:
+            strides = self.strides.setdefault(name, {})
+            strides[stride] = strides.get(stride, 0) + trips
+
+    def executed(self):  # Executions per PC, with fused instructions and blocks spread over the PCs they ran.
+        executed = list(self.restored) if len(self.restored) == len(self.counts) else [0] * len(self.counts)
+        for pc, count in enumerate(self.counts):
+            for idx in range(pc, min(pc + self.spans.get(pc, 1), len(executed))):
+                executed[idx] += count
+        return executed
+
+    def state(self):  # JSON-safe copy of the statistics so far, for Core.checkpoint().
+        return {"executed": self.executed(), "vdmemBytes": self.vdmemBytes,
+                "vectors": {name: stats[:3] + [sorted(stats[3].items())] for name, stats in self.vectors.items()},
+                "strides": {name: sorted(strides.items()) for name, strides in self.strides.items()},
+                "spreads": {name: sorted(spreads.items()) for name, spreads in self.spreads.items()}}
+
+    def setState(self, state, length):
+        # Continue from a state() of a program of length instructions. Raises KeyError, TypeError or ValueError
+        # on a malformed state, before anything is changed.
+        executed = [int(count) for count in state["executed"]]
+        if executed and len(executed) != length:  # Empty if the checkpoint was taken before running.
+            raise ValueError("workload of %d instructions for a program of %d" % (len(executed), length))
+        vdmemBytes = [int(count) for count in state["vdmemBytes"]]
+        vectors = {name: [int(count), int(lanes), int(enabled), {int(vl): int(n) for vl, n in vls}]
+                   for name, (count, lanes, enabled, vls) in state["vectors"].items()}
+        strides = {name: {int(stride): int(n) for stride, n in strides} for name, strides in state["strides"].items()}
+        spreads = {name: {int(spread): int(n) for spread, n in spreads} for name, spreads in state["spreads"].items()}
+        if len(vdmemBytes) != 2:
+            raise ValueError("bad VDMEM byte counts")
+        self.restored, self.vdmemBytes = executed, vdmemBytes
+        self.vectors, self.strides, self.spreads = vectors, strides, spreads
+        self.counts, self.spans = [0] * length, {}
+
+    def report(self):
+        opcodes = {}
+        for pc, count in enumerate(self.executed()):
+            if count:
+                tokens = self.core.imem.instructions[pc].split()
+                opcode = tokens[0] if tokens else ""
+                opcodes[opcode] = opcodes.get(opcode, 0) + count
+        mix = {"scalar": 0, "data": 0, "compute": 0}
+        for opcode, count in opcodes.items():
+            mix["data" if opcode in self.DATA else "compute" if opcode in self.COMPUTE else "scalar"] += count
+        vectors = {name: {"count": count, "meanVL": lanes / count if count else 0.0,
+                          "maskDensity": enabled / lanes if lanes else 1.0,
+                          "VL": {str(vl): n for vl, n in sorted(vls.items())}}
+                   for name, (count, lanes, enabled, vls) in sorted(self.vectors.items())}
+        lanes = sum(stats[1] for stats in self.vectors.values())
+        enabled = sum(stats[2] for stats in self.vectors.values())
+        return {"instructions": sum(opcodes.values()), "mix": mix, "opcodes": dict(sorted(opcodes.items())),
+                "vector": vectors, "maskDensity": enabled / lanes if lanes else 1.0,
+                "strides": {name: {str(stride): n for stride, n in sorted(strides.items())}
+                            for name, strides in sorted(self.strides.items())},
+                "spreads": {name: {str(spread): n for spread, n in sorted(spreads.items())}
+                            for name, spreads in sorted(self.spreads.items())},
+                "bytes": {"VDMEM": {"read": self.vdmemBytes[0], "written": self.vdmemBytes[1]},
+                          "SDMEM": {"read": opcodes.get("LS", 0) * self.WORD,
+                                    "written": opcodes.get("SS", 0) * self.WORD}}}
+
+
+class Core:
+    TRACE_FORMATS = ("full", "compact")
+    ENGINES = ("interp", "compiled")
+
+    def __init__(self, imem, sdmem, vdmem, backend="list", traceFormat="full", engine="interp", fuse=False,
+                 addressOnly=False, profile=False, fastForward=False, verbose=False):
+        self.imem = imem
+        self.sdmem = sdmem
+        self.vdmem = vdmem
+        self.backend = backend  # "list" keeps Python ints per element, "numpy" runs vector ops on int32 arrays.
+        self.traceFormat = traceFormat  # "compact" traces LV/SV/LVWS/SVWS addresses as [base,stride,count].
+        self.engine = engine  # "compiled" runs basic blocks compiled by BlockCompiler instead of interpreting.
+        self.fuse = fuse  # Run recognized instruction sequences as superinstructions, see Instructionref.fuse.
+        self.addressOnly = addressOnly  # Skip vector data work that cannot reach control flow or an address.
+        self.profile = profile  # Count executions and wall time per PC, see runProfiled().
+        self.hits = {}  # PC -> [executions, seconds] of the instructions run by runProfiled().
+        self.fastForward = fastForward and backend == "numpy"  # Batch counted loops, see runFastForward().
+        self.verbose = verbose  # Print a progress message for every instruction executed.
+        self.forwarder = None
+        self.blocks = None
+        self.ins = NumpyInstructionref(self) if backend == "numpy" else Instructionref(self)
+        # Scalar registers stay Python ints in both backends; only the vector state moves to NumPy.
+        self.RFs = {"SRF": RegisterFile("SRF", 8),
+                    "VRF": RegisterFile("VRF", 8, 64, backend=backend),
+                    "VMR": MaskRegister("VMR", 64, backend=backend),
+                    "VLG": RegisterFile("VLG", 1, 1)}
+        self.pc = 0
+        self.mvl = 64
+        self.RFs.get("VLG").Write(0, self.mvl)
+        self.RFs.get("VMR").WriteBits(self.RFs.get("VMR").full)
+        self.resolvedCode = []  # Resolved trace kept in memory unless streamResolvedCode() set up a writer.
+        self.traceWriter = None
+        print("Core Initialized")
+
+    def run(self, steps=None):
+        # Returns 0 at the end of the program and None on HALT. With steps, pauses after that many dispatches
+        # (a fused instruction is one) and returns 1, so the run can be checkpointed and resumed later.
+        if self.profile:
+            return self.runProfiled(steps)
+        if self.engine == "compiled" and steps is None:
+            return self.runCompiled()
+        if self.fastForward and steps is None:
+            return self.runFastForward()
+        print("Simulation started")
+        program = self.imem.decode(self.ins, self.fuse, self.addressOnly)
+        emit = self.resolvedCode.append if self.traceWriter is None else self.traceWriter.write
+        verbose = self.verbose
+        counts = self.ins.workload.dispatches(program)
+        for _ in itertools.repeat(None) if steps is None else range(steps):
+            pc = self.pc
+            try:
+                handler, args = program[pc]
+                counts[pc] += 1
+                ret, resolvedCode = handler(*args)
+            except IndexError:
+                return 0
+
+            if ret == 1:
+                emit(resolvedCode)
+                if verbose:
+                    print("Instruction being executed...")
+            elif ret == 0:
+                break
+        else:
+            return 1
+
+    def runProfiled(self, steps=None):
+        # run() through the interpreter, timing every dispatch. A fused instruction counts for the PC it starts
+        # at. Each trace line ends in a "#pc N" comment naming its Code.asm instruction, so the Timing Simulator
+        # can attribute its cycles to the same PCs.
+        print("Simulation started")
+        program = self.imem.decode(self.ins, self.fuse, self.addressOnly)
+        emit = self.resolvedCode.append if self.traceWriter is None else self.traceWriter.write
+        verbose = self.verbose
+        hits = self.hits
+        counts = self.ins.workload.dispatches(program)
+        clock = time.perf_counter
+        for _ in itertools.repeat(None) if steps is None else range(steps):
+            pc = self.pc
+            try:
+                handler, args = program[pc]
+                counts[pc] += 1
+                start = clock()
+                ret, resolvedCode = handler(*args)
+                elapsed = clock() - start
+            except IndexError:
+                return 0
+            hit = hits.get(pc)
+            if hit is None:
+                hit = hits[pc] = [0, 0.0]
+            hit[0] += 1
+            hit[1] += elapsed
+
+            if ret == 1:
+                emit("\n".join("%s #pc %d" % (line, pc + idx) for idx, line in enumerate(resolvedCode.split("\n"))))
+                if verbose:
+                    print("Instruction being executed...")
+            elif ret == 0:
+                break
+        else:
+            return 1
+
+    def runFastForward(self):
+        # run() handing every arrival at a loop head (the target of a backward branch) to a LoopForwarder, which
+        # runs the trips of the loop that follow the same path at once. Their trace lines are kept as a LoopTrace
+        # and formatted when written.
+        print("Simulation started")
+        program = self.imem.decode(self.ins, self.fuse, self.addressOnly)
+        emit = self.resolvedCode.append if self.traceWriter is None else self.traceWriter.write
+        verbose = self.verbose
+        counts = self.ins.workload.dispatches(program)
+        if self.forwarder is None:
+            self.forwarder = LoopForwarder(self)
+        forward, heads = self.forwarder.forward, self.forwarder.heads
+        while True:
+            pc = self.pc
+            try:
+                handler, args = program[pc]
+                counts[pc] += 1
+                ret, resolvedCode = handler(*args)
+            except IndexError:
+                return 0
+
+            if ret == 1:
+                emit(resolvedCode)
+                if verbose:
+                    print("Instruction being executed...")
+                if self.pc in heads:  # Entering a loop or taking its backward branch.
+                    forward()
+            elif ret == 0:
+                return None
+
+    def runCompiled(self):
+        # Same architectural state and trace as run(). Never prints per-instruction progress, even if verbose.
+        print("Simulation started")
+        program = self.imem.decode(self.ins, addressOnly=self.addressOnly)
+        if self.blocks is None or self.blocks[0] is not program:
+            self.blocks = (program, BlockCompiler(self).compile(program))
+        blocks = self.blocks[1]
+        emit = self.resolvedCode.append if self.traceWriter is None else self.traceWriter.write
+        counts = self.ins.workload.counts
+        try:
+            while True:
+                block = blocks.get(self.pc)
+                if block is not None:
+                    pc = block(emit)
+                    if pc is None:
+                        return None
+                    self.pc = pc
+                else:  # Not a block entry, e.g. a PC outside the program: interpret a single instruction.
+                    handler, args = program[self.pc]
+                    counts[self.pc] += 1
+                    ret, resolvedCode = handler(*args)
+                    if ret != 1:
+                        return None
+                    emit(resolvedCode)
+        except IndexError:
+            return 0
+
+    def checkpoint(self, path):
+        # Saves the PC, every register file, the DMEM pages written since the images were loaded, the workload
+        # statistics and the trace so far. The images themselves are not copied, restore() overlays the pages
+        # onto DMEMs loaded from the same inputs. Registers are kept as JSON, as the list backend's Python ints
+        # can outgrow int64.
+        state = {"program": self.imem.digest(), "pc": self.pc, "mvl": self.mvl,
+                 "workload": json.dumps(self.ins.workload.state()), "trace": self.resolvedText()}
+        for name, rf in self.RFs.items():
+            registers = rf.registers
+            state["RF_" + name] = json.dumps(registers.tolist() if isinstance(registers, np.ndarray) else registers)
+        for dmem in (self.sdmem, self.vdmem):
+            state[dmem.name + "_pages"], state[dmem.name + "_data"] = dmem.dirtyPages()
+            state[dmem.name + "_pageBits"] = dmem.pageBits
+        try:
+            np.savez_compressed(path, **state)
+            print("Core - Checkpoint saved to file:", path)
+        except:
+            print("Core - ERROR: Couldn't open checkpoint file in path:", path)
+
+    def restore(self, path):
+        # Resume from a checkpoint() of a run over the same Code.asm and input images. Returns False, leaving
+        # the core untouched, if the file cannot be read or does not belong to this program.
+        try:
+            with np.load(path) as state:
+                if str(state["program"]) != self.imem.digest():
+                    print("Core - ERROR: Checkpoint is of a different Code.asm:", path)
+                    return False
+                pc, mvl = int(state["pc"]), int(state["mvl"])
+                registers = {}
+                for name, rf in self.RFs.items():
+                    registers[name] = json.loads(str(state["RF_" + name]))
+                    if len(registers[name]) != rf.reg_count or any(len(register) != rf.vec_length
+                                                                   for register in registers[name]):
+                        raise ValueError("bad shape of " + name)
+                    if rf.backend == "numpy":  # Wrap the list backend's wider values into int32 rows.
+                        registers[name] = [[int32(int(value)) for value in register] for register in registers[name]]
+                pages = [(dmem, state[dmem.name + "_pages"], state[dmem.name + "_data"],
+                          int(state[dmem.name + "_pageBits"])) for dmem in (self.sdmem, self.vdmem)]
+                if any(data.shape != (len(dirty), 1 << pageBits) for dmem, dirty, data, pageBits in pages):
+                    raise ValueError("bad shape of the memory pages")
+                trace = str(state["trace"])
+                self.ins.workload.setState(json.loads(str(state["workload"])), len(self.imem.instructions))
+        except IOError:
+            print("Core - ERROR: Couldn't open checkpoint file in path:", path)
+            return False
+        except (KeyError, TypeError, ValueError, zipfile.BadZipFile) as error:
+            print("Core - ERROR: Bad checkpoint file in path:", path, "-", error)
+            return False
+        self.pc, self.mvl = pc, mvl
+        for name, rf in self.RFs.items():
+            for idx, register in enumerate(registers[name]):
+                rf.Write(idx, register if rf.vec_length != 1 else register[0])
+        for dmem, dirty, data, pageBits in pages:
+            dmem.applyPages(dirty, data, pageBits)
+        self.resolvedCode = trace.splitlines()
+        print("Core - Restored from checkpoint:", path)
+        return True
+
+    def dumpProfile(self, iodir, name="profile"):
+        # Executions and seconds of runProfiled() for every PC of Code.asm, hottest first. Instructions inside
+        # a fused sequence show 0. profilereport.py ranks them together with the cycles the Timing Simulator
+        # attributes to the same PCs.
+        path = os.path.abspath(os.path.join(iodir, name + ".json"))
+        instructions = [{"pc": pc, "code": code, "count": self.hits.get(pc, (0, 0.0))[0],
+                         "seconds": self.hits.get(pc, (0, 0.0))[1]} for pc, code in enumerate(self.imem.instructions)]
+        instructions.sort(key=lambda entry: -entry["seconds"])
+        try:
+            with open(path, 'w') as opf:
+                json.dump({"simulator": "functional", "seconds": sum(hit[1] for hit in self.hits.values()),
+                           "instructions": instructions}, opf, indent=1)
+            print(name, "- Profile dumped into ", path)
+        except:
+            print(name, "- ERROR: Couldn't open output file ", path)
+
+    def dumpWorkload(self, iodir, name="workload"):  # The Workload statistics of the run, see Workload.report.
+        path = os.path.abspath(os.path.join(iodir, name + ".json"))
+        try:
+            with open(path, 'w') as opf:
+                json.dump(self.ins.workload.report(), opf, indent=1)
+            print(name, "- Workload statistics dumped into ", path)
+        except:
+            print(name, "- ERROR: Couldn't open output file ", path)
+
+    def dumpRegs(self, iodir, fmt="txt"):
+        for rf in self.RFs.values():
+            rf.dump(iodir, fmt)
+
+    def streamResolvedCode(self, iodir, name="resolvedCode"):  # Write the trace incrementally during run().
+        path = os.path.abspath(os.path.join(iodir, name + ".txt"))
+        try:
+            self.traceWriter = TraceWriter(path)
+        except:
+            print(name, "- ERROR: Couldn't open output file ", path)
+            return
+        self.traceWriter.writeLines(str(data) for data in self.resolvedCode)  # E.g. restored from a checkpoint.
+        self.resolvedCode = []
+
+    def resolvedText(self):  # The trace so far, whether streamed or kept in memory.
+        if self.traceWriter is not None:
+            return self.traceWriter.text()
+        return "".join(str(data) + "\n" for data in self.resolvedCode)
+
+    def dumpResolvedCode(self, iodir, name="resolvedCode"):
+        path = os.path.abspath(os.path.join(iodir, name + ".txt"))
+        if self.traceWriter is not None and self.traceWriter.path == path:  # Already streamed, just flush it.
+            self.traceWriter.close()
+            self.traceWriter = None
+            print(name, "- Resolved Code dumped into ", path)
+            return
+        try:
+            with open(path, 'w') as opf:
+                lines = [str(data) + '\n' for data in self.resolvedCode]
+                opf.writelines(lines)
+            print(name, "- Resolved Code dumped into ", path)
+        except:
+            print(name, "- ERROR: Couldn't open output file ", path)
+
+
+class Instructionref:
+    def __init__(self, core):
+        self.core = core
+        self.workload = Workload(core)
+        self.ins = {
+            "ADDVV": self.ADDVV,
+            "SUBVV": self.SUBVV,
+            "MULVV": self.MULVV,
+            "DIVVV": self.DIVVV,
+            "SEQVV": self.SEQVV,
+            "SNEVV": self.SNEVV,
+            "SGTVV": self.SGTVV,
+            "SLTVV": self.SLTVV,
+            "SGEVV": self.SGEVV,
+            "SLEVV": self.SLEVV,
+            "ADDVS": self.ADDVS,
+            "SUBVS": self.SUBVS,
+            "MULVS": self.MULVS,
+            "DIVVS": self.DIVVS,
+            "SEQVS": self.SEQVS,
+            "SNEVS": self.SNEVS,
+            "SGTVS": self.SGTVS,
+            "SLTVS": self.SLTVS,
+            "SGEVS": self.SGEVS,
+            "SLEVS": self.SLEVS,
+            "POP": self.POP,
+            "MTCL": self.MTCL,
+            "MFCL": self.MFCL,
+            "LV": self.LV,
+            "SV": self.SV,
+            "LS": self.LS,
+            "SS": self.SS,
+            "LVWS": self.LVWS,
+            "SVWS": self.SVWS,
+            "LVI": self.LVI,
+            "SVI": self.SVI,
+            "ADD": self.ADD,
+            "SUB": self.SUB,
+            "SRA": self.SRA,
+            "SRL": self.SRL,
+            "SLL": self.SLL,
+            "AND": self.AND,
+            "OR": self.OR,
+            "XOR": self.XOR,
+            "BEQ": self.BEQ,
+            "BNE": self.BNE,
+            "BGT": self.BGT,
+            "BLT": self.BLT,
+            "BGE": self.BGE,
+            "BLE": self.BLE,
+            "CVM": self.CVM,
+            "HALT": self.HALT,
+        }
+
+    # Operand kinds per opcode: R is a register index (SRn/VRn), I is an immediate.
+    formats = dict.fromkeys(["ADDVV", "SUBVV", "MULVV", "DIVVV", "ADDVS", "SUBVS", "MULVS", "DIVVS",
+                             "LVWS", "SVWS", "LVI", "SVI", "ADD", "SUB", "SRA", "SRL", "SLL", "AND", "OR",
+                             "XOR"], "RRR")
+    formats.update(dict.fromkeys(["SEQVV", "SNEVV", "SGTVV", "SLTVV", "SGEVV", "SLEVV", "SEQVS", "SNEVS", "SGTVS",
+                                  "SLTVS", "SGEVS", "SLEVS", "LV", "SV"], "RR"))
+    formats.update(dict.fromkeys(["LS", "SS", "BEQ", "BNE", "BGT", "BLT", "BGE", "BLE"], "RRI"))
+    formats.update(dict.fromkeys(["POP", "MTCL", "MFCL"], "R"))
+
+    def decode(self, instruction):
+        # Resolves the opcode to its bound handler and the operands to ints once, so running an
+        # instruction is a single call handler(*args) with args = (text, operand, ...).
+        tokens = instruction.split()
+        handler = self.ins.get(tokens[0], self.Default)
+        operands = [int(token[2:]) if kind == "R" else int(token) for kind, token in
+                    zip(self.formats.get(tokens[0], ""), tokens[1:])]
+        return handler, (" ".join(tokens),) + tuple(operands)
+
+    def execute(self, instruction):
+        handler, args = self.decode(instruction)
+        return handler(*args)
+
+    SCALAR_OPS = {"ADD": operator.add, "SUB": operator.sub, "AND": operator.and_, "OR": operator.or_,
+                  "XOR": operator.xor}
+    BRANCHES = {"BEQ": operator.eq, "BNE": operator.ne, "BGT": operator.gt, "BLT": operator.lt,
+                "BGE": operator.ge, "BLE": operator.le}
+
+    def fuse(self, program):
+        # Replaces the first instruction of each recognized sequence with a superinstruction that runs the
+        # whole sequence. The other instructions keep their entries, so a branch into the middle of a
+        # sequence still runs them one at a time. A superinstruction returns the resolved lines of all its
+        # instructions joined by newlines, so the trace is unchanged.
+        fused = list(program)
+        pc = 0
+        while pc < len(program):
+            length = self.fuseMulAdd(program, fused, pc) or self.fuseScalarBranch(program, fused, pc)
+            pc += max(length, 1)
+        return fused
+
+    VECTOR_OPS = ("ADDVV", "SUBVV", "MULVV", "DIVVV", "ADDVS", "SUBVS", "MULVS", "DIVVS")
+    COMPARES = ("SEQVV", "SNEVV", "SGTVV", "SLTVV", "SGEVV", "SLEVV", "SEQVS", "SNEVS", "SGTVS", "SLTVS",
+                "SGEVS", "SLEVS")
+
+    def neededState(self, program):
+        # Flow-insensitive dependence analysis over the program. Returns the vector registers, and whether
+        # the VMR and the VDMEM contents, that can reach an LVI/SVI index or (through POP) a scalar register.
+        # Scalar registers, VLG and SDMEM are always needed.
+        program = [(handler.__name__, args[1:]) for handler, args in program]
+        vrs = {operands[2] for name, operands in program if name in ("LVI", "SVI")}
+        vmr = any(name == "POP" for name, operands in program)
+        vdmem = False
+        while True:
+            state = (len(vrs), vmr, vdmem)
+            for name, operands in program:
+                if name in self.VECTOR_OPS and operands[0] in vrs:
+                    vrs.update(operands[1:3] if name.endswith("VV") else operands[1:2])
+                    vmr = True  # The write is masked.
+                elif name in ("LV", "LVWS", "LVI") and operands[0] in vrs:
+                    vmr = vdmem = True
+                elif name in ("SV", "SVWS", "SVI") and vdmem:
+                    vrs.add(operands[0])
+                    vmr = True
+                elif name in self.COMPARES and vmr:
+                    vrs.update(operands[0:2] if name.endswith("VV") else operands[0:1])
+            if state == (len(vrs), vmr, vdmem):
+                return vrs, vmr, vdmem
+
+    def addressOnly(self, program):
+        # Replaces the instructions whose results are not needed (see neededState) with STRIDED, which only
+        # resolves the addresses of an LV/SV/LVWS/SVWS, or SKIP. The trace, scalar registers, VLG and SDMEM
+        # come out as in a full run; the VRF, VMR and VDMEM do not.
+        vrs, vmr, vdmem = self.neededState(program)
+        trimmed = list(program)
+        for pc, (handler, args) in enumerate(program):
+            name = handler.__name__
+            # The opcode goes last in args, so the handlers do not have to parse it out of the text.
+            if name in ("LV", "LVWS") and args[1] not in vrs or name in ("SV", "SVWS") and not vdmem:
+                trimmed[pc] = (self.STRIDED, args + (None,) * (4 - len(args)) + (name,))
+            elif name in self.VECTOR_OPS and args[1] not in vrs or name in self.COMPARES and not vmr:
+                trimmed[pc] = (self.SKIP, args + (name,))
+        return trimmed
+
+    def fuseMulAdd(self, program, fused, pc):  # MULVV VRt ... then ADDVV accumulating VRt.
+        if pc + 1 >= len(program):
+            return 0
+        (mul, mulArgs), (add, addArgs) = program[pc], program[pc + 1]
+        if mul.__name__ != "MULVV" or add.__name__ != "ADDVV" or mulArgs[1] not in addArgs[2:] or \
+                max(mulArgs[1:] + addArgs[1:]) >= self.core.RFs.get("VRF").reg_count:
+            return 0
+        fused[pc] = (self.MULADDVV, (mulArgs[0] + "\n" + addArgs[0], mulArgs[1:], addArgs[1:]))
+        return 2
+
+    def fuseScalarBranch(self, program, fused, pc):  # ADD/SUB/AND/OR/XOR ... then a branch, e.g. a loop tail.
+        end = pc
+        while end < len(program) and program[end][0].__name__ in self.SCALAR_OPS:
+            end += 1
+        if end == pc or end == len(program) or program[end][0].__name__ not in self.BRANCHES:
+            return 0
+        registers = [reg for handler, args in program[pc:end] for reg in args[1:]] + list(program[end][1][1:3])
+        if max(registers) >= self.core.RFs.get("SRF").reg_count:
+            return 0
+        ops = tuple((self.SCALAR_OPS[handler.__name__],) + args[1:] for handler, args in program[pc:end])
+        branch = (self.BRANCHES[program[end][0].__name__],) + program[end][1][1:]
+        fused[pc] = (self.SCALARBRANCH, ("\n".join(args[0] for handler, args in program[pc:end + 1]), ops, branch))
+        return end - pc + 1
+
+    @staticmethod
+    def resolve(text, addresses):  # Resolved trace line of a vector memory access: text (a0,a1,...).
+        return text + " (" + ",".join(map(str, addresses)) + ")"
+
+    def resolveStrided(self, text, base, stride, count):
+        # Unit and constant stride accesses are traced as text [base,stride,count] in the compact format,
+        # instead of listing every address.
+        if self.core.traceFormat == "compact":
+            return "%s [%d,%d,%d]" % (text, base, stride, count)
+        return self.resolve(text, (base + i * stride for i in range(count)))
+
+    # region Memory Access Instructions
+
+    def LV(self, text, op1, op2):
+        op2_val = self.core.RFs.get("SRF").Read(op2)
+        veclen = self.core.RFs.get("VLG").Read()
+        self.workload.access("LV", veclen)
+        op1_val_final = [self.core.vdmem.Read(op2_val + i) for i in range(veclen)]
+        self.core.RFs.get("VRF").Write(op1, self.mask(op1, op1_val_final, veclen))
+        self.core.pc += 1
+        return 1, self.resolveStrided(text, op2_val, 1, veclen)
+
+    def SV(self, text, op1, op2):
+        op2_val = self.core.RFs.get("SRF").Read(op2)
+        op1_val = self.core.RFs.get("VRF").Read(op1)
+        veclen = self.core.RFs.get("VLG").Read()
+        self.workload.access("SV", veclen)
+        mask_bits = self.core.RFs.get("VMR").ReadBits()
+        for i in range(op2_val, op2_val + veclen):
+            if mask_bits >> (i - op2_val) & 1:
+                self.core.vdmem.Write(i, op1_val[i - op2_val])
+        self.core.pc += 1
+        return 1, self.resolveStrided(text, op2_val, 1, veclen)
+
+    def LS(self, text, op1, op2, imm):
+        op2_val = self.core.RFs.get("SRF").Read(op2)
+        op1_val = self.core.sdmem.Read(op2_val + imm)
+        self.core.RFs.get("SRF").Write(op1, op1_val)
+        self.core.pc += 1
+        return 1, text
+
+    def SS(self, text, op1, op2, imm):
+        op1_val = self.core.RFs.get("SRF").Read(op1)
+        op2_val = self.core.RFs.get("SRF").Read(op2)
+        self.core.sdmem.Write(op2_val + imm, op1_val)
+        self.core.pc += 1
+        return 1, text
+
+    def LVWS(self, text, op1, op2, op3):
+        op2_val = self.core.RFs.get("SRF").Read(op2)
+        op3_val = self.core.RFs.get("SRF").Read(op3)
+        veclen = self.core.RFs.get("VLG").Read()
+        self.workload.access("LVWS", veclen, stride=op3_val)
+        op1_val_final = [self.core.vdmem.Read(op2_val + i * op3_val) for i in range(veclen)]
+        self.core.RFs.get("VRF").Write(op1, self.mask(op1, op1_val_final, veclen))
+        self.core.pc += 1
+        return 1, self.resolveStrided(text, op2_val, op3_val, veclen)
+
+    def SVWS(self, text, op1, op2, op3):
+        op2_val = self.core.RFs.get("SRF").Read(op2)
+        op3_val = self.core.RFs.get("SRF").Read(op3)
+        op1_val = self.core.RFs.get("VRF").Read(op1)
+        veclen = self.core.RFs.get("VLG").Read()
+        self.workload.access("SVWS", veclen, stride=op3_val)
+        mask_bits = self.core.RFs.get("VMR").ReadBits()
+        for i in range(veclen):
+            if mask_bits >> i & 1:
+                self.core.vdmem.Write(op2_val + i * op3_val, op1_val[i])
+        self.core.pc += 1
+        return 1, self.resolveStrided(text, op2_val, op3_val, veclen)
+
+    def LVI(self, text, op1, op2, op3):
+        op2_val = self.core.RFs.get("SRF").Read(op2)
+        op3_val = self.core.RFs.get("VRF").Read(op3)
+        veclen = self.core.RFs.get("VLG").Read()
+        self.workload.access("LVI", veclen, offsets=op3_val[0:veclen])
+        op1_val_final = [self.core.vdmem.Read(op2_val + i) for i in op3_val[0:veclen]]
+        self.core.RFs.get("VRF").Write(op1, self.mask(op1, op1_val_final, veclen))
+        self.core.pc += 1
+        return 1, self.resolve(text, (op2_val + i for i in op3_val[0:veclen]))
+
+    def SVI(self, text, op1, op2, op3):
+        op2_val = self.core.RFs.get("SRF").Read(op2)
+        op3_val = self.core.RFs.get("VRF").Read(op3)
+        op1_val = self.core.RFs.get("VRF").Read(op1)
+        veclen = self.core.RFs.get("VLG").Read()
+        self.workload.access("SVI", veclen, offsets=op3_val[0:veclen])
+        mask_bits = self.core.RFs.get("VMR").ReadBits()
+        for i in range(veclen):
+            if mask_bits >> i & 1:
+                self.core.vdmem.Write(op2_val + op3_val[i], op1_val[i])
+        self.core.pc += 1
+        return 1, self.resolve(text, (op2_val + i for i in op3_val[0:veclen]))
+
+    # endregion
+
+    # region Vector Instructions
+    def ADDVV(self, text, op3, op1, op2):
+        op1_val = self.core.RFs.get("VRF").Read(op1)
+        op2_val = self.core.RFs.get("VRF").Read(op2)
+        veclen = self.core.RFs.get("VLG").Read()
+        self.workload.vector("ADDVV", veclen)
+        op3_val_final = [op1_val[i] + op2_val[i] for i in range(0, veclen)]
+        self.core.RFs.get("VRF").Write(op3, self.mask(op3, op3_val_final, veclen))
+        self.core.pc += 1
+        return 1, text
+
+    def SUBVV(self, text, op3, op1, op2):
+        op1_val = self.core.RFs.get("VRF").Read(op1)
+        op2_val = self.core.RFs.get("VRF").Read(op2)
+        veclen = self.core.RFs.get("VLG").Read()
+        self.workload.vector("SUBVV", veclen)
+        op3_val_final = [op1_val[i] - op2_val[i] for i in range(0, veclen)]
+        self.core.RFs.get("VRF").Write(op3, self.mask(op3, op3_val_final, veclen))
+        self.core.pc += 1
+        return 1, text
+
+    def MULVV(self, text, op3, op1, op2):
+        op1_val = self.core.RFs.get("VRF").Read(op1)
+        op2_val = self.core.RFs.get("VRF").Read(op2)
+        veclen = self.core.RFs.get("VLG").Read()
+        self.workload.vector("MULVV", veclen)
+        op3_val_final = [op1_val[i] * op2_val[i] for i in range(0, veclen)]
+        self.core.RFs.get("VRF").Write(op3, self.mask(op3, op3_val_final, veclen))
+        self.core.pc += 1
+        return 1, text
+
+    def DIVVV(self, text, op3, op1, op2):
+        op1_val = self.core.RFs.get("VRF").Read(op1)
+        op2_val = self.core.RFs.get("VRF").Read(op2)
+        vl = self.core.RFs.get("VLG").Read()
+        self.workload.vector("DIVVV", vl)
+        op3_val_final = [truncdiv(op1_val[i], op2_val[i]) for i in range(0, vl)]
+        self.core.RFs.get("VRF").Write(op3, self.mask(op3, op3_val_final))
+        self.core.pc += 1
+        return 1, text
+
+    def ADDVS(self, text, op3, op1, op2):
+        op1_val = self.core.RFs.get("VRF").Read(op1)
+        op2_val = self.core.RFs.get("SRF").Read(op2)
+        vl = self.core.RFs.get("VLG").Read()
+        self.workload.vector("ADDVS", vl)
+        op3_val_final = [op1_val[i] + op2_val for i in range(0, vl)]
+        self.core.RFs.get("VRF").Write(op3, self.mask(op3, op3_val_final))
+        self.core.pc += 1
+        return 1, text
+
+    def SUBVS(self, text, op3, op1, op2):
+        op1_val = self.core.RFs.get("VRF").Read(op1)
+        op2_val = self.core.RFs.get("SRF").Read(op2)
+        vl = self.core.RFs.get("VLG").Read()
+        self.workload.vector("SUBVS", vl)
+        op3_val_final = [op1_val[i] - op2_val for i in range(0, vl)]
+        self.core.RFs.get("VRF").Write(op3, self.mask(op3, op3_val_final))
+        self.core.pc += 1
+        return 1, text
+
+    def MULVS(self, text, op3, op1, op2):
+        op1_val = self.core.RFs.get("VRF").Read(op1)
+        op2_val = self.core.RFs.get("SRF").Read(op2)
+        vl = self.core.RFs.get("VLG").Read()
+        self.workload.vector("MULVS", vl)
+        op3_val_final = [op1_val[i] * op2_val for i in range(0, vl)]
+        self.core.RFs.get("VRF").Write(op3, self.mask(op3, op3_val_final))
+        self.core.pc += 1
+        return 1, text
+
+    def DIVVS(self, text, op3, op1, op2):
+        op1_val = self.core.RFs.get("VRF").Read(op1)
+        op2_val = self.core.RFs.get("SRF").Read(op2)
+        vl = self.core.RFs.get("VLG").Read()
+        self.workload.vector("DIVVS", vl)
+        op3_val_final = [truncdiv(op1_val[i], op2_val) for i in range(0, vl)]
+        self.core.RFs.get("VRF").Write(op3, self.mask(op3, op3_val_final))
+        self.core.pc += 1
+        return 1, text
+
+    # endregion
+
+    # region Mask Instructions
+    # vector
+    def SEQVV(self, text, op1, op2):
+        return self.comparevector("SEQVV", text, op1, op2, operator.eq)
+
+    def SNEVV(self, text, op1, op2):
+        return self.comparevector("SNEVV", text, op1, op2, operator.ne)
+
+    def SGTVV(self, text, op1, op2):
+        return self.comparevector("SGTVV", text, op1, op2, operator.gt)
+
+    def SLTVV(self, text, op1, op2):
+        return self.comparevector("SLTVV", text, op1, op2, operator.lt)
+
+    def SGEVV(self, text, op1, op2):
+        return self.comparevector("SGEVV", text, op1, op2, operator.ge)
+
+    def SLEVV(self, text, op1, op2):
+        return self.comparevector("SLEVV", text, op1, op2, operator.le)
+
+    # scalar
+    def SEQVS(self, text, op1, op2):
+        return self.comparescalar("SEQVS", text, op1, op2, operator.eq)
+
+    def SNEVS(self, text, op1, op2):
+        return self.comparescalar("SNEVS", text, op1, op2, operator.ne)
+
+    def SGTVS(self, text, op1, op2):
+        return self.comparescalar("SGTVS", text, op1, op2, operator.gt)
+
+    def SLTVS(self, text, op1, op2):
+        return self.comparescalar("SLTVS", text, op1, op2, operator.lt)
+
+    def SGEVS(self, text, op1, op2):
+        return self.comparescalar("SGEVS", text, op1, op2, operator.ge)
+
+    def SLEVS(self, text, op1, op2):
+        return self.comparescalar("SLEVS", text, op1, op2, operator.le)
+
+    def comparevector(self, name, text, op1, op2, func):  # Lanes at and above VLG clear the mask.
+        op1_val = self.core.RFs.get("VRF").Read(op1)
+        op2_val = self.core.RFs.get("VRF").Read(op2)
+        vl = self.core.RFs.get("VLG").Read()
+        self.workload.vector(name, vl, masked=False)
+        self.core.RFs.get("VMR").WriteBits(sum(1 << i for i in range(vl) if func(op1_val[i], op2_val[i])))
+        self.core.pc += 1
+        return 1, text
+
+    def comparescalar(self, name, text, op1, op2, func):
+        op1_val = self.core.RFs.get("VRF").Read(op1)
+        op2_val = self.core.RFs.get("SRF").Read(op2)
+        vl = self.core.RFs.get("VLG").Read()
+        self.workload.vector(name, vl, masked=False)
+        self.core.RFs.get("VMR").WriteBits(sum(1 << i for i in range(vl) if func(op1_val[i], op2_val)))
+        self.core.pc += 1
+        return 1, text
+
+    # other
+    def POP(self, text, op2):
+        self.core.RFs.get("SRF").Write(op2, self.core.RFs.get("VMR").Count())
+        self.core.pc += 1
+        return 1, text
+
+    def CVM(self, text):
+        vmr = self.core.RFs.get("VMR")
+        vmr.WriteBits(vmr.full)
+        self.core.pc += 1
+        return 1, text
+
+    # endregion
+
+    # region VLG Instructions
+    def MTCL(self, text, op2):
+        op2_val = self.core.RFs.get("SRF").Read(op2)
+        self.core.RFs.get("VLG").Write(0, op2_val)
+        self.core.pc += 1
+        return 1, text + " " + str(op2_val)
+
+    def MFCL(self, text, op2):
+        veclen = self.core.RFs.get("VLG").Read()
+        self.core.RFs.get("SRF").Write(op2, veclen)
+        self.core.pc += 1
+        return 1, text
+
+    # endregion
+
+    # region Scalar Instructions
+    def ADD(self, text, op3, op1, op2):
+        op2_val = self.core.RFs.get("SRF").Read(op2)
+        op1_val = self.core.RFs.get("SRF").Read(op1)
+        self.core.RFs.get("SRF").Write(op3, op1_val + op2_val)
+        self.core.pc += 1
+        return 1, text
+
+    def SUB(self, text, op3, op1, op2):
+        op2_val = self.core.RFs.get("SRF").Read(op2)
+        op1_val = self.core.RFs.get("SRF").Read(op1)
+        self.core.RFs.get("SRF").Write(op3, op1_val - op2_val)
+        self.core.pc += 1
+        return 1, text
+
+    def SRA(self, text, op3, op1, op2):
+        op2_val = self.core.RFs.get("SRF").Read(op2)
+        op1_val = self.core.RFs.get("SRF").Read(op1)
+        self.core.RFs.get("SRF").Write(op3, self.arithrightshift(op1_val, op2_val))
+        self.core.pc += 1
+        return 1, text
+
+    def SRL(self, text, op3, op1, op2):
+        op2_val = self.core.RFs.get("SRF").Read(op2)
+        op1_val = self.core.RFs.get("SRF").Read(op1)
+        self.core.RFs.get("SRF").Write(op3, self.logicalrightshift(op1_val, op2_val))
+        self.core.pc += 1
+        return 1, text
+
+    def SLL(self, text, op3, op1, op2):
+        op2_val = self.core.RFs.get("SRF").Read(op2)
+        op1_val = self.core.RFs.get("SRF").Read(op1)
+        self.core.RFs.get("SRF").Write(op3, self.logicalleftshift(op1_val, op2_val))
+        self.core.pc += 1
+        return 1, text
+
+    def AND(self, text, op3, op1, op2):
+        op2_val = self.core.RFs.get("SRF").Read(op2)
+        op1_val = self.core.RFs.get("SRF").Read(op1)
+        self.core.RFs.get("SRF").Write(op3, op1_val & op2_val)
+        self.core.pc += 1
+        return 1, text
+
+    def OR(self, text, op3, op1, op2):
+        op2_val = self.core.RFs.get("SRF").Read(op2)
+        op1_val = self.core.RFs.get("SRF").Read(op1)
+        self.core.RFs.get("SRF").Write(op3, op1_val | op2_val)
+        self.core.pc += 1
+        return 1, text
+
+    def XOR(self, text, op3, op1, op2):
+        op2_val = self.core.RFs.get("SRF").Read(op2)
+        op1_val = self.core.RFs.get("SRF").Read(op1)
+        self.core.RFs.get("SRF").Write(op3, op1_val ^ op2_val)
+        self.core.pc += 1
+        return 1, text
+
+    def logicalleftshift(self, n, shift):
+        return (n << shift) & 0xffffffff
+
+    def logicalrightshift(self, n, shift):
+        n_unsigned = n & 0xffffffff
+        result_unsigned = n_unsigned >> shift
+
+        if n < 0:
+            if result_unsigned & 0x80000000:
+                result_signed = -((~result_unsigned + 1) & 0xffffffff)
+            else:
+                result_signed = result_unsigned
+        else:
+            result_signed = result_unsigned
+        return result_signed
+
+    def arithrightshift(self, n, shift):
+        if n < 0:
+            n = (n >> 1) & ~(1 << 31)
+            for i in range(shift - 1):
+                n = (n >> 1) | (1 << 31)
+        else:
+            n = n >> shift
+        return n
+
+    # endregion
+
+    # region Control Instructions
+    def BEQ(self, text, op1, op2, imm):
+        op2_val = self.core.RFs.get("SRF").Read(op2)
+        op1_val = self.core.RFs.get("SRF").Read(op1)
+        if op2_val == op1_val:
+            self.core.pc += imm
+        else:
+            self.core.pc += 1
+        return 1, text
+
+    def BNE(self, text, op1, op2, imm):
+        op2_val = self.core.RFs.get("SRF").Read(op2)
+        op1_val = self.core.RFs.get("SRF").Read(op1)
+        if op2_val != op1_val:
+            self.core.pc += imm
+        else:
+            self.core.pc += 1
+        return 1, text
+
+    def BGT(self, text, op1, op2, imm):
+        op2_val = self.core.RFs.get("SRF").Read(op2)
+        op1_val = self.core.RFs.get("SRF").Read(op1)
+        if op2_val < op1_val:
+            self.core.pc += imm
+        else:
+            self.core.pc += 1
+        return 1, text
+
+    def BLT(self, text, op1, op2, imm):
+        op2_val = self.core.RFs.get("SRF").Read(op2)
+        op1_val = self.core.RFs.get("SRF").Read(op1)
+        if op2_val > op1_val:
+            self.core.pc += imm
+        else:
+            self.core.pc += 1
+        return 1, text
+
+    def BGE(self, text, op1, op2, imm):
+        op2_val = self.core.RFs.get("SRF").Read(op2)
+        op1_val = self.core.RFs.get("SRF").Read(op1)
+        if op2_val <= op1_val:
+            self.core.pc += imm
+        else:
+            self.core.pc += 1
+        return 1, text
+
+    def BLE(self, text, op1, op2, imm):
+        op2_val = self.core.RFs.get("SRF").Read(op2)
+        op1_val = self.core.RFs.get("SRF").Read(op1)
+        if op2_val >= op1_val:
+            self.core.pc += imm
+        else:
+            self.core.pc += 1
+        return 1, text
+
+    # endregion
+
+    # region Fused Instructions
+    def MULADDVV(self, text, mul, add):
+        self.MULVV(text, *mul)
+        self.ADDVV(text, *add)
+        return 1, text
+
+    def SCALARBRANCH(self, text, ops, branch):
+        registers = self.core.RFs.get("SRF").registers
+        for func, op3, op1, op2 in ops:
+            registers[op3] = [func(registers[op1][0], registers[op2][0])]
+        func, op1, op2, imm = branch
+        self.core.pc += len(ops) + (imm if func(registers[op1][0], registers[op2][0]) else 1)
+        return 1, text
+
+    # endregion
+
+    # region Address-only Instructions
+    def STRIDED(self, text, op1, op2, op3, name):  # LV/SV/LVWS/SVWS without the data transfer; op3 None if unit.
+        op2_val = self.core.RFs.get("SRF").Read(op2)
+        op3_val = 1 if op3 is None else self.core.RFs.get("SRF").Read(op3)
+        veclen = self.core.RFs.get("VLG").Read()
+        self.workload.access(name, veclen, stride=None if op3 is None else op3_val)
+        self.core.pc += 1
+        return 1, self.resolveStrided(text, op2_val, op3_val, veclen)
+
+    def SKIP(self, text, *operands):  # A vector op or compare whose result is not needed, its opcode last.
+        name = operands[-1]
+        self.workload.vector(name, self.core.RFs.get("VLG").Read(), masked=name not in self.COMPARES)
+        self.core.pc += 1
+        return 1, text
+
+    # endregion
+
+    # region Other
+    def HALT(self, text):
+        return 0, text
+
+    def mask(self, index, value, vector_length=-1):
+        present_val = self.core.RFs.get("VRF").Read(index)
+        vmr = self.core.RFs.get("VMR")
+        if vector_length == -1:
+            vector_length = self.core.RFs.get("VLG").Read()
+        if vmr.isFull(vector_length):
+            present_val[:vector_length] = value[:vector_length]
+        elif not vmr.isEmpty(vector_length):
+            mask_bits = vmr.ReadBits()
+            for i in range(vector_length):
+                if mask_bits >> i & 1:
+                    present_val[i] = value[i]
+        return present_val
+
+    # endregion
+
+    # region Default
+    def Default(self, text, *operands):
+        print("Wrong Instruction")
+        return 0, text
+    # endregion
+
+
+class NumpyInstructionref(Instructionref):
+    # Whole-array versions of the vector memory, vector, mask and masked-write paths for the "numpy"
+    # backend. Scalar and control handlers are inherited unchanged.
+
+    # region Memory Access Instructions
+    def LV(self, text, op1, op2):
+        op2_val = self.core.RFs.get("SRF").Read(op2)
+        veclen = self.core.RFs.get("VLG").Read()
+        self.workload.access("LV", veclen)
+        addresses = np.arange(op2_val, op2_val + veclen, dtype=np.int64)
+        self.core.RFs.get("VRF").Write(op1, self.mask(op1, self.core.vdmem.ReadVector(addresses), veclen))
+        self.core.pc += 1
+        return 1, self.resolveStrided(text, op2_val, 1, veclen)
+
+    def SV(self, text, op1, op2):
+        op2_val = self.core.RFs.get("SRF").Read(op2)
+        veclen = self.core.RFs.get("VLG").Read()
+        self.workload.access("SV", veclen)
+        addresses = np.arange(op2_val, op2_val + veclen, dtype=np.int64)
+        self.store(op1, addresses, veclen)
+        self.core.pc += 1
+        return 1, self.resolveStrided(text, op2_val, 1, veclen)
+
+    def SVWS(self, text, op1, op2, op3):
+        op2_val = self.core.RFs.get("SRF").Read(op2)
+        op3_val = self.core.RFs.get("SRF").Read(op3)
+        veclen = self.core.RFs.get("VLG").Read()
+        self.workload.access("SVWS", veclen, stride=op3_val)
+        addresses = op2_val + np.arange(veclen, dtype=np.int64) * op3_val
+        self.store(op1, addresses, veclen)
+        self.core.pc += 1
+        return 1, self.resolveStrided(text, op2_val, op3_val, veclen)
+
+    def LVWS(self, text, op1, op2, op3):
+        op2_val = self.core.RFs.get("SRF").Read(op2)
+        op3_val = self.core.RFs.get("SRF").Read(op3)
+        veclen = self.core.RFs.get("VLG").Read()
+        self.workload.access("LVWS", veclen, stride=op3_val)
+        addresses = op2_val + np.arange(veclen, dtype=np.int64) * op3_val
+        self.core.RFs.get("VRF").Write(op1, self.mask(op1, self.core.vdmem.ReadVector(addresses), veclen))
+        self.core.pc += 1
+        return 1, self.resolveStrided(text, op2_val, op3_val, veclen)
+
+    def LVI(self, text, op1, op2, op3):
+        op2_val = self.core.RFs.get("SRF").Read(op2)
+        veclen = self.core.RFs.get("VLG").Read()
+        offsets = self.core.RFs.get("VRF").Read(op3)[0:veclen].astype(np.int64)
+        self.workload.access("LVI", veclen, offsets=offsets)
+        addresses = op2_val + offsets
+        self.core.RFs.get("VRF").Write(op1, self.mask(op1, self.core.vdmem.ReadVector(addresses), veclen))
+        self.core.pc += 1
+        return 1, self.resolve(text, addresses.tolist())
+
+    def SVI(self, text, op1, op2, op3):
+        op2_val = self.core.RFs.get("SRF").Read(op2)
+        veclen = self.core.RFs.get("VLG").Read()
+        offsets = self.core.RFs.get("VRF").Read(op3)[0:veclen].astype(np.int64)
+        self.workload.access("SVI", veclen, offsets=offsets)
+        addresses = op2_val + offsets
+        self.store(op1, addresses, veclen)
+        self.core.pc += 1
+        return 1, self.resolve(text, addresses.tolist())
+
+    def store(self, index, addresses, vector_length):  # Masked store of the first vector_length elements.
+        vmr = self.core.RFs.get("VMR")
+        values = self.core.RFs.get("VRF").Read(index)[:vector_length]
+        if vmr.isFull(vector_length):
+            self.core.vdmem.WriteVector(addresses, values)
+        elif not vmr.isEmpty(vector_length):
+            enabled = vmr.Elements(vector_length)
+            self.core.vdmem.WriteVector(addresses[enabled], values[enabled])
+
+    # endregion
+
+    # region Vector Instructions
+    def ADDVV(self, text, op3, op1, op2):
+        return self.vectorvector("ADDVV", text, op3, op1, op2, np.add)
+
+    def SUBVV(self, text, op3, op1, op2):
+        return self.vectorvector("SUBVV", text, op3, op1, op2, np.subtract)
+
+    def MULVV(self, text, op3, op1, op2):
+        return self.vectorvector("MULVV", text, op3, op1, op2, np.multiply)
+
+    def DIVVV(self, text, op3, op1, op2):
+        return self.vectorvector("DIVVV", text, op3, op1, op2, self.divide)
+
+    def ADDVS(self, text, op3, op1, op2):
+        return self.vectorscalar("ADDVS", text, op3, op1, op2, np.add)
+
+    def SUBVS(self, text, op3, op1, op2):
+        return self.vectorscalar("SUBVS", text, op3, op1, op2, np.subtract)
+
+    def MULVS(self, text, op3, op1, op2):
+        return self.vectorscalar("MULVS", text, op3, op1, op2, np.multiply)
+
+    def DIVVS(self, text, op3, op1, op2):
+        return self.vectorscalar("DIVVS", text, op3, op1, op2, self.divide)
+
+    def MULADDVV(self, text, mul, add):  # Both steps on one VRF/VLG lookup.
+        vrf = self.core.RFs.get("VRF")
+        veclen = self.core.RFs.get("VLG").Read()
+        self.workload.vector("MULVV", veclen)
+        self.workload.vector("ADDVV", veclen)
+        for (op3, op1, op2), func in ((mul, np.multiply), (add, np.add)):
+            vrf.Write(op3, self.mask(op3, func(vrf.Read(op1)[:veclen], vrf.Read(op2)[:veclen]), veclen))
+        self.core.pc += 2
+        return 1, text
+
+    def vectorvector(self, name, text, op3, op1, op2, func):
+        vrf = self.core.RFs.get("VRF")
+        veclen = self.core.RFs.get("VLG").Read()
+        self.workload.vector(name, veclen)
+        op3_val_final = func(vrf.Read(op1)[:veclen], vrf.Read(op2)[:veclen])
+        vrf.Write(op3, self.mask(op3, op3_val_final, veclen))
+        self.core.pc += 1
+        return 1, text
+
+    def vectorscalar(self, name, text, op3, op1, op2, func):
+        vrf = self.core.RFs.get("VRF")
+        op2_val = np.int32(int32(self.core.RFs.get("SRF").Read(op2)))
+        veclen = self.core.RFs.get("VLG").Read()
+        self.workload.vector(name, veclen)
+        op3_val_final = func(vrf.Read(op1)[:veclen], op2_val)
+        vrf.Write(op3, self.mask(op3, op3_val_final, veclen))
+        self.core.pc += 1
+        return 1, text
+
+    @staticmethod
+    def divide(a, b):  # Elementwise truncdiv on int32 operands, computed in int64 to survive INT_MIN / -1.
+        a = np.asarray(a, dtype=np.int64)
+        b = np.asarray(b, dtype=np.int64)
+        if np.any(b == 0):
+            raise ZeroDivisionError("division by zero")
+        quotient = np.abs(a) // np.abs(b)
+        return np.where((a < 0) != (b < 0), -quotient, quotient).astype(np.int32)
+
+    # endregion
+
+    # region Mask Instructions
+    def SEQVV(self, text, op1, op2):
+        return self.comparevector("SEQVV", text, op1, op2, np.equal)
+
+    def SNEVV(self, text, op1, op2):
+        return self.comparevector("SNEVV", text, op1, op2, np.not_equal)
+
+    def SGTVV(self, text, op1, op2):
+        return self.comparevector("SGTVV", text, op1, op2, np.greater)
+
+    def SLTVV(self, text, op1, op2):
+        return self.comparevector("SLTVV", text, op1, op2, np.less)
+
+    def SGEVV(self, text, op1, op2):
+        return self.comparevector("SGEVV", text, op1, op2, np.greater_equal)
+
+    def SLEVV(self, text, op1, op2):
+        return self.comparevector("SLEVV", text, op1, op2, np.less_equal)
+
+    def SEQVS(self, text, op1, op2):
+        return self.comparescalar("SEQVS", text, op1, op2, np.equal)
+
+    def SNEVS(self, text, op1, op2):
+        return self.comparescalar("SNEVS", text, op1, op2, np.not_equal)
+
+    def SGTVS(self, text, op1, op2):
+        return self.comparescalar("SGTVS", text, op1, op2, np.greater)
+
+    def SLTVS(self, text, op1, op2):
+        return self.comparescalar("SLTVS", text, op1, op2, np.less)
+
+    def SGEVS(self, text, op1, op2):
+        return self.comparescalar("SGEVS", text, op1, op2, np.greater_equal)
+
+    def SLEVS(self, text, op1, op2):
+        return self.comparescalar("SLEVS", text, op1, op2, np.less_equal)
+
+    def comparevector(self, name, text, op1, op2, func):  # Lanes at and above VLG clear the mask.
+        vrf = self.core.RFs.get("VRF")
+        vl = self.core.RFs.get("VLG").Read()
+        self.workload.vector(name, vl, masked=False)
+        self.core.RFs.get("VMR").WriteElements(func(vrf.Read(op1)[:vl], vrf.Read(op2)[:vl]))
+        self.core.pc += 1
+        return 1, text
+
+    def comparescalar(self, name, text, op1, op2, func):
+        op2_val = self.core.RFs.get("SRF").Read(op2)
+        vl = self.core.RFs.get("VLG").Read()
+        self.workload.vector(name, vl, masked=False)
+        self.core.RFs.get("VMR").WriteElements(func(self.core.RFs.get("VRF").Read(op1)[:vl], op2_val))
+        self.core.pc += 1
+        return 1, text
+
+    # endregion
+
+    # region Other
+    def mask(self, index, value, vector_length=-1):
+        present_val = self.core.RFs.get("VRF").Read(index)
+        vmr = self.core.RFs.get("VMR")
+        if vector_length == -1:
+            vector_length = self.core.RFs.get("VLG").Read()
+        if vmr.isFull(vector_length):
+            present_val[:vector_length] = value[:vector_length]
+        elif not vmr.isEmpty(vector_length):
+            present_val[:vector_length] = np.where(vmr.Elements(vector_length), value[:vector_length],
+                                                   present_val[:vector_length])
+        return present_val
+
+    # endregion
+
+
+class BlockCompiler(object):
+    # Compiles the decoded program into one generated Python function per basic block. Scalar, VLG and
+    # control instructions are inlined and work on local copies of the scalar registers; every other
+    # instruction calls its interpreter handler. A block function emits the resolved lines of its
+    # instructions and returns the PC of the next block, or None once the program has stopped.
+    BRANCHES = {"BEQ": "==", "BNE": "!=", "BGT": ">", "BLT": "<", "BGE": ">=", "BLE": "<="}
+    SCALAR_OPS = {"ADD": "{0} + {1}", "SUB": "{0} - {1}", "AND": "{0} & {1}", "OR": "{0} | {1}",
+                  "XOR": "{0} ^ {1}", "SRA": "sra({0}, {1})", "SRL": "srl({0}, {1})", "SLL": "sll({0}, {1})"}
+    WRITES_SRF = ("LS", "MFCL", "POP", "ADD", "SUB", "AND", "OR", "XOR", "SRA", "SRL", "SLL")
+
+    def __init__(self, core):
+        self.core = core
+        self.srfCount = core.RFs.get("SRF").reg_count
+
+    def leaders(self, program):
+        leaders = {0}
+        for pc, (handler, args) in enumerate(program):
+            if handler.__name__ in self.BRANCHES:
+                leaders.update((pc + 1, pc + args[3]))
+            elif handler.__name__ in ("HALT", "Default"):
+                leaders.add(pc + 1)
+        return sorted(pc for pc in leaders if 0 <= pc < len(program))
+
+    def compile(self, program):
+        workload = self.core.ins.workload
+        workload.dispatches(program)
+        env = {"core": self.core, "C": workload.counts, "S": self.core.RFs.get("SRF").registers,
+               "L": self.core.RFs.get("VLG").registers,
+               "sdmem": self.core.sdmem, "sra": self.core.ins.arithrightshift,
+               "srl": self.core.ins.logicalrightshift, "sll": self.core.ins.logicalleftshift}
+        leaders = self.leaders(program)
+        fused = self.core.ins.fuse(program)
+        source = []
+        for start, end in zip(leaders, leaders[1:] + [len(program)]):
+            source += self.compileBlock(program, fused, start, end, env)
+            workload.spans[start] = end - start
+        exec(compile("\n".join(source), "<compiled Code.asm>", "exec"), env)
+        return {start: env["block_%d" % start] for start in leaders}
+
+    def compileBlock(self, program, fused, start, end, env):
+        code = ["def block_%d(emit):" % start, "    C[%d] += 1" % start]
+        live, dirty = set(), set()  # Scalar registers held in locals, and those not yet written back.
+
+        def read(reg):
+            if reg not in live:
+                code.append("    s%d = S[%d][0]" % (reg, reg))
+                live.add(reg)
+            return "s%d" % reg
+
+        def write(reg, expr):
+            code.append("    s%d = %s" % (reg, expr))
+            live.add(reg)
+            dirty.add(reg)
+
+        def flush():
+            for reg in sorted(dirty):
+                code.append("    S[%d] = [s%d]" % (reg, reg))
+            dirty.clear()
+
+        pc = start
+        while pc < end:
+            handler, args = program[pc]
+            if fused[pc][0].__name__ == "MULADDVV" and pc + 1 < end:
+                handler, args = fused[pc]  # A MULVV/ADDVV pair in the block calls the MULADDVV superinstruction.
+            name, text, operands = handler.__name__, args[0], args[1:]
+            sources = operands[:3 if name in self.SCALAR_OPS else 2]
+            inline = name != "MULADDVV" and all(reg < self.srfCount for reg in sources)
+            if name in self.SCALAR_OPS and inline:
+                write(operands[0], self.SCALAR_OPS[name].format(read(operands[1]), read(operands[2])))
+                code.append("    emit(%r)" % text)
+            elif name == "LS" and inline:
+                write(operands[0], "sdmem.Read(%s + %d)" % (read(operands[1]), operands[2]))
+                code.append("    emit(%r)" % text)
+            elif name == "SS" and inline:
+                code.append("    sdmem.Write(%s + %d, %s)" % (read(operands[1]), operands[2], read(operands[0])))
+                code.append("    emit(%r)" % text)
+            elif name == "MTCL" and operands[0] < self.srfCount:
+                value = read(operands[0])
+                code.append("    L[0] = [%s]" % value)
+                code.append("    emit(%r + str(%s))" % (text + " ", value))
+            elif name == "MFCL" and operands[0] < self.srfCount:
+                write(operands[0], "L[0][0]")
+                code.append("    emit(%r)" % text)
+            elif name in self.BRANCHES and inline:
+                condition = "%s %s %s" % (read(operands[0]), self.BRANCHES[name], read(operands[1]))
+                flush()
+                code.append("    emit(%r)" % text)
+                code.append("    if %s:" % condition)
+                code.append("        return %d" % (pc + operands[2]))
+                code.append("    return %d" % (pc + 1))
+                return code
+            elif name in ("HALT", "Default"):
+                flush()
+                if name == "Default":
+                    env["h%d" % pc], env["a%d" % pc] = handler, args
+                    code.append("    h%d(*a%d)" % (pc, pc))
+                code.append("    core.pc = %d" % pc)
+                code.append("    return None")
+                return code
+            else:  # Interpreter fallback, with the scalar registers it may read or write synced around it.
+                flush()
+                env["h%d" % pc], env["a%d" % pc] = handler, args
+                code.append("    core.pc = %d" % pc)
+                if name in self.BRANCHES:
+                    code.append("    emit(h%d(*a%d)[1])" % (pc, pc))
+                    code.append("    return core.pc")
+                    return code
+                code.append("    emit(h%d(*a%d)[1])" % (pc, pc))
+                if name in self.WRITES_SRF:
+                    live.clear()
+            pc += 2 if name == "MULADDVV" else 1
+        flush()
+        code.append("    return %d" % end)
+        return code
+
+
+class LoopForwarder(object):
+    # Runs counted loops many trips at a time, for Core.runFastForward (numpy backend). At a taken backward
+    # branch to T, the path of the next trip from T is predicted from the scalar registers. If along it the
+    # scalar registers only move by loop-invariant amounts (ADD/SUB), vectors are loaded by LV/LVWS and combined
+    # by ADD/SUB/MUL ops, VL stays put and the VMR enables every lane, then each branch on the path compares two
+    # linear functions of the trip number, and so does each load address. The trips that take the same path run
+    # as NumPy operations on one (trips, VL) array per vector register, accumulators (ADDVV/SUBVV VRa VRa X)
+    # being summed over the trips. When only the backward branch changes, the trip that falls out of the loop
+    # joins the batch. The core is left as if they had been interpreted; anything else stays with the
+    # interpreter.
+    MAXPATH = 64  # Instructions per trip.
+    MAXTRIPS = 4096  # Trips per batch, bounding the (trips, VL) arrays.
+    MAXBACKOFF = 64
+    INDUCTIONS = {"ADD": operator.add, "SUB": operator.sub}
+    BRANCHES = Instructionref.BRANCHES
+    VECTOR_OPS = {"ADDVV": np.add, "SUBVV": np.subtract, "MULVV": np.multiply, "ADDVS": np.add,
+                  "SUBVS": np.subtract, "MULVS": np.multiply}
+    # Operand kinds of the instructions a batched trip may hold: S scalar register, V vector register.
+    ROLES = dict(dict.fromkeys(BRANCHES, "SS"), ADD="SSS", SUB="SSS", MTCL="S", LV="VS", LVWS="VSS",
+                 ADDVV="VVV", SUBVV="VVV", MULVV="VVV", ADDVS="VVS", SUBVS="VVS", MULVS="VVS")
+
+    def __init__(self, core):
+        self.core = core
+        self.program = [(handler.__name__, args) for handler, args in core.imem.decode(core.ins)]
+        self.counts = {"S": core.RFs.get("SRF").reg_count, "V": core.RFs.get("VRF").reg_count}
+        self.heads = {pc + args[3] for pc, (name, args) in enumerate(self.program)
+                      if name in self.BRANCHES and args[3] <= 0}
+        self.backoff = {}  # Loop head -> [backward branches to it still let through, next backoff].
+
+    def forward(self):  # At a loop head, on entry or after a backward branch to it.
+        head = self.core.pc
+        backoff = self.backoff.get(head)
+        if backoff is not None and backoff[0] > 0:
+            backoff[0] -= 1
+            return
+        forwarded = False
+        while True:
+            plan = self.plan(head)
+            trips, exits = (0, False) if plan is None else self.trips(plan)
+            if trips < 2:
+                break
+            self.run(plan, trips, exits)
+            forwarded = True
+            if exits:
+                break
+        if forwarded:
+            self.backoff.pop(head, None)
+        else:  # Not a counted loop, or not on this path: look again less and less often.
+            backoff = self.backoff.setdefault(head, [0, 1])
+            backoff[0], backoff[1] = backoff[1], min(backoff[1] * 2, self.MAXBACKOFF)
+
+    def plan(self, head):
+        # Predicts the next trip from head as (pc, name, args, scalar registers before it) per instruction and
+        # returns it through check(), or None if it is not a trip that can be batched.
+        scalars = [register[0] for register in self.core.RFs.get("SRF").registers]
+        path, pc = [], head
+        while len(path) < self.MAXPATH and 0 <= pc < len(self.program):
+            name, args = self.program[pc]
+            roles = self.ROLES.get(name)
+            if roles is None or any(args[1 + idx] >= self.counts[role] for idx, role in enumerate(roles)):
+                return None
+            path.append((pc, name, args, list(scalars)))
+            if name in self.INDUCTIONS:
+                scalars[args[1]] = self.INDUCTIONS[name](scalars[args[2]], scalars[args[3]])
+            elif name in self.BRANCHES and self.BRANCHES[name](scalars[args[1]], scalars[args[2]]):
+                if pc + args[3] == head:
+                    return self.check(path, scalars)
+                if args[3] <= 0:  # Some other loop.
+                    return None
+                pc += args[3]
+                continue
+            pc += 1
+        return None
+
+    def check(self, path, scalars):
+        # A trip can be batched if every scalar register it writes is an induction register, r = r +/- x once
+        # per trip with x not written, and every vector register it writes is either set before it is read
+        # (a temporary) or only touched by one ADDVV/SUBVV adding to it (an accumulator). Returns the plan:
+        # the path, the per trip step of each scalar register, VL and the accumulators.
+        inductions = [(name,) + args[1:4] for pc, name, args, before in path if name in self.INDUCTIONS]
+        written = [dest for name, dest, op1, op2 in inductions]
+        if len(set(written)) != len(written):
+            return None
+        for name, dest, op1, op2 in inductions:
+            invariant = op2 if op1 == dest else op1 if name == "ADD" and op2 == dest else None
+            if invariant is None or invariant in written:
+                return None
+        veclen = self.core.RFs.get("VLG").Read()
+        for pc, name, args, before in path:
+            if name == "LVWS" and args[3] in written or name.endswith("VS") and args[3] in written or \
+                    name == "MTCL" and (args[1] in written or before[args[1]] != veclen):
+                return None
+        if not 0 <= veclen <= self.core.RFs.get("VRF").vec_length or not self.core.RFs.get("VMR").isFull(veclen):
+            return None
+        accumulators, first, touches = set(), {}, {}
+        for pc, name, args, before in path:
+            if name in self.BRANCHES or name in self.INDUCTIONS or name == "MTCL":
+                continue
+            reads = () if name in ("LV", "LVWS") else args[2:4] if name.endswith("VV") else args[2:3]
+            for vr in reads:
+                first.setdefault(vr, "read")
+                touches[vr] = touches.get(vr, 0) + 1
+            first.setdefault(args[1], "write")
+            touches[args[1]] = touches.get(args[1], 0) + (args[1] not in reads)
+            if name in ("ADDVV", "SUBVV") and args[1] == args[2] != args[3] or \
+                    name == "ADDVV" and args[1] == args[3] != args[2]:
+                accumulators.add(args[1])
+        for pc, name, args, before in path:
+            dest = args[1] if name in self.VECTOR_OPS or name in ("LV", "LVWS") else None
+            if dest is not None and first[dest] == "read" and (dest not in accumulators or touches[dest] != 1):
+                return None
+        accumulators = {vr for vr in accumulators if first[vr] == "read" and touches[vr] == 1}
+        steps = {reg: scalars[reg] - path[0][3][reg] for reg in written}
+        return path, steps, veclen, accumulators
+
+    def trips(self, plan):
+        # (trips, exits): how many trips from now take the same path, up to MAXTRIPS, with every load address in
+        # the VDMEM. exits if the last of them is the one leaving the loop, its backward branch falling through.
+        path, steps, veclen, accumulators = plan
+        flips = [self.flip(self.BRANCHES[name], before[args[1]] - before[args[2]],
+                           steps.get(args[1], 0) - steps.get(args[2], 0), name in ("BEQ", "BNE"))
+                 for pc, name, args, before in path if name in self.BRANCHES]
+        trips = min(flips)
+        exits = trips == flips[-1] < self.MAXTRIPS and trips not in flips[:-1]  # The path ends in the loop branch.
+        trips += exits
+        for pc, name, args, before in path:
+            if name in ("LV", "LVWS"):
+                base, step = before[args[2]], steps.get(args[2], 0)
+                stride = before[args[3]] if name == "LVWS" else 1
+                low = base + min(0, (trips - 1) * step) + min(0, (veclen - 1) * stride)
+                high = base + max(0, (trips - 1) * step) + max(0, (veclen - 1) * stride)
+                if veclen and (low < 0 or high >= self.core.vdmem.size):
+                    return 0, False
+        return trips, exits
+
+    def flip(self, func, difference, step, equality):
+        # First trip t >= 1 at which func(a, b) changes, for a - b = difference + t * step; MAXTRIPS if none.
+        if step == 0:
+            return self.MAXTRIPS
+        if equality:  # Changes where a - b becomes, or stops being, 0.
+            if difference == 0:
+                return 1
+            return -difference // step if -difference % step == 0 and -difference // step > 0 else self.MAXTRIPS
+        taken = func(difference, 0)  # Orderings of a linear function change at most once.
+        if func(difference + self.MAXTRIPS * step, 0) == taken:
+            return self.MAXTRIPS
+        low, high = 0, self.MAXTRIPS
+        while high - low > 1:
+            middle = (low + high) // 2
+            if func(difference + middle * step, 0) == taken:
+                low = middle
+            else:
+                high = middle
+        return high
+
+    def run(self, plan, trips, exits=False):
+        path, steps, veclen, accumulators = plan
+        core, workload = self.core, self.core.ins.workload
+        vrf, srf = core.RFs.get("VRF"), core.RFs.get("SRF")
+        trip = np.arange(trips, dtype=np.int64)[:, None]
+        lanes = np.arange(veclen, dtype=np.int64)
+        values, sums, trace = {}, {}, []
+        for pc, name, args, before in path:
+            text = args[0]
+            if name in ("LV", "LVWS"):
+                base, step = before[args[2]], steps.get(args[2], 0)
+                stride = before[args[3]] if name == "LVWS" else 1
+                addresses = base + trip * step + lanes * stride
+                values[args[1]] = core.vdmem.ReadVector(addresses.ravel()).reshape(trips, veclen)
+                workload.repeat(name, veclen, trips, stride if name == "LVWS" else None)
+                trace.append((text, base, step, stride))
+                continue
+            trace.append(text + " " + str(before[args[1]]) if name == "MTCL" else text)
+            if name in self.VECTOR_OPS:
+                workload.repeat(name, veclen, trips)
+                if args[1] in accumulators:
+                    added = args[3] if args[2] == args[1] else args[2]
+                    sums[args[1]] = (name == "ADDVV", values.get(added, vrf.Read(added)[:veclen]))
+                elif name.endswith("VV"):
+                    values[args[1]] = self.VECTOR_OPS[name](values.get(args[2], vrf.Read(args[2])[:veclen]),
+                                                            values.get(args[3], vrf.Read(args[3])[:veclen]))
+                else:
+                    values[args[1]] = self.VECTOR_OPS[name](values.get(args[2], vrf.Read(args[2])[:veclen]),
+                                                            np.int32(int32(before[args[3]])))
+        for vr, value in values.items():  # Temporaries end with their value in the last trip.
+            register = vrf.Read(vr)
+            register[:veclen] = value[-1] if value.ndim == 2 else value
+            vrf.Write(vr, register)
+        for vr, (add, value) in sums.items():  # Int32 sums wrap like the trip by trip additions.
+            total = value.sum(axis=0, dtype=np.int32) if value.ndim == 2 else \
+                (value.astype(np.int64) * trips).astype(np.int32)
+            register = vrf.Read(vr)
+            register[:veclen] = register[:veclen] + total if add else register[:veclen] - total
+            vrf.Write(vr, register)
+        for reg, step in steps.items():
+            srf.Write(reg, srf.Read(reg) + trips * step)
+        if exits:
+            core.pc = path[-1][0] + 1
+        counts, spans, idx = workload.counts, workload.spans, 0
+        while idx < len(path):  # A fused instruction is one dispatch for the PCs it covers.
+            counts[path[idx][0]] += trips
+            idx += spans.get(path[idx][0], 1)
+        trace = LoopTrace(trace, trips, veclen, core.ins.resolveStrided)
+        if core.traceWriter is None:
+            core.resolvedCode.append(trace)
+        else:
+            core.traceWriter.writeLines(trace.lines())
+
+
+def addSimulationArguments(parser):  # Per-run options, shared by the command line below and batchrun.py.
+    parser.add_argument('--backend', default="list", choices=RegisterFile.BACKENDS,
+                        help='Vector register file backend: Python lists (default) or int32 NumPy arrays.')
+    parser.add_argument('--tracefmt', default="compact", choices=Core.TRACE_FORMATS,
+                        help='Resolved trace format: compact (default) writes strided accesses as '
+                             '[base,stride,count], full lists every address.')
+    parser.add_argument('--engine', default="interp", choices=Core.ENGINES,
+                        help='interp (default) runs one instruction at a time, compiled turns each basic block '
+                             'of Code.asm into a generated Python function.')
+    parser.add_argument('--fuse', action='store_true',
+                        help='Run MULVV/ADDVV accumulates and scalar ALU op runs ending in a branch (loop tails) '
+                             'as single fused instructions.')
+    parser.add_argument('--addressonly', action='store_true',
+                        help='Only compute what control flow and addresses depend on. The trace, SRF, VLG and '
+                             'SDMEMOP are exact; VRF, VMR and VDMEMOP are not.')
+    parser.add_argument('--memory', default="dense", choices=("dense", "sparse"),
+                        help='dense (default) allocates SDMEM and VDMEM in full, sparse only holds the input '
+                             'images and the pages written, for wide address lengths.')
+    parser.add_argument('--vdmembits', default=17, type=int,
+                        help='VDMEM address length in words, 17 (512 KB) by default. Use --memory sparse for '
+                             'much wider memories.')
+    parser.add_argument('--dumpfmt', default="txt", choices=DMEM.DUMP_FORMATS,
+                        help='Format of the register and memory dumps: text (default), binary npy/npz, or delta '
+                             '(only the memory pages written by the run). Binary dumps can be rendered as text '
+                             'later with dump2txt.py, deltas merged back into full images with deltamerge.py.')
+    parser.add_argument('--profile', action='store_true',
+                        help='Write per-instruction execution counts and wall time to profile.json and tag each '
+                             'trace line with its Code.asm PC, for profilereport.py. Runs the interp engine.')
+    parser.add_argument('--verbose', action='store_true',
+                        help='Print a progress message for every instruction executed, as older versions did.')
+    parser.add_argument('--fastforward', action='store_true',
+                        help='Run the trips of counted loops (induction ADD/SUB, LV/LVWS, ADD/SUB/MUL vector ops, '
+                             'full mask) as whole-array operations. Interp engine with the numpy backend only.')
+    return parser
+
+
+def simulationOptions(args):  # Keyword arguments of simulate() from the options of addSimulationArguments.
+    return dict(backend=args.backend, traceFormat=args.tracefmt, engine=args.engine, fuse=args.fuse,
+                addressOnly=args.addressonly, memory=args.memory, vdmemBits=args.vdmembits, dumpfmt=args.dumpfmt,
+                profile=args.profile, fastForward=args.fastforward, verbose=args.verbose)
+
+
+def simulate(iodir, backend="list", traceFormat="compact", engine="interp", fuse=False, addressOnly=False,
+             memory="dense", vdmemBits=17, dumpfmt="txt", profile=False, fastForward=False, verbose=False,
+             restore=None, steps=None, checkpoint=None, images=None, writer=None):
+    # One complete run over iodir: load the inputs, run, then write the dumps and the trace next to them.
+    # images maps "SDMEM"/"VDMEM" to an image (e.g. a SharedImage) used instead of the file in iodir.
+    # With a DumpWriter the dumps are only submitted to it, and may still be in progress on return.
+    # Returns the result of Core.run, or None when the options or the checkpoint are rejected.
+    iodir = os.path.abspath(iodir)
+    images = {} if images is None else images
+    print("IO Directory:", iodir)
+    if steps is not None and (engine == "compiled" or fastForward):  # They only run whole programs.
+        print("ERROR: --steps needs the interp engine and cannot be combined with --fastforward")
+        return None
+    # Parse IMEM
+    imem = IMEM(iodir)
+    dmem = SparseDMEM if memory == "sparse" else DMEM
+    # Parse SMEM
+    sdmem = dmem("SDMEM", iodir, 13, image=images.get("SDMEM"))  # 32 KB is 2^15 bytes = 2^13 K 32-bit words.
+    # Parse VMEM
+    vdmem = dmem("VDMEM", iodir, vdmemBits, image=images.get("VDMEM"))  # 512 KB is 2^19 bytes = 2^17 K words.
+
+    # Create Vector Core
+    vcore = Core(imem, sdmem, vdmem, backend=backend, traceFormat=traceFormat, engine=engine, fuse=fuse,
+                 addressOnly=addressOnly, profile=profile, fastForward=fastForward, verbose=verbose)
+    if restore is not None and not vcore.restore(restore):
+        return None
+    if not vcore.fastForward:  # Otherwise the trace stays in memory, fast-forwarded trips unformatted until the dump.
+        vcore.streamResolvedCode(iodir)
+    result = vcore.run(steps)
+    if result == 0:
+        print("Simulation Completed!")
+    elif result == 1:
+        print("Simulation paused at PC:", vcore.pc)
+    if checkpoint is not None:
+        vcore.checkpoint(checkpoint)
+    vcore.dumpWorkload(iodir)
+    if profile:
+        vcore.dumpProfile(iodir)
+    if writer is not None:
+        writer.dumpCore(vcore, iodir, dumpfmt)
+        writer.dumpDMEM(sdmem, dumpfmt)
+        writer.dumpDMEM(vdmem, dumpfmt)
+        return result
+    vcore.dumpRegs(iodir, dumpfmt)
+    vcore.dumpResolvedCode(iodir)
+    sdmem.dump(dumpfmt)
+    vdmem.dump(dumpfmt)
+    return result
+
+
+if __name__ == "__main__":
+    # parse arguments for input file location
+    parser = argparse.ArgumentParser(
+        description='Vector Core Performance Model')
+    parser.add_argument('--iodir', default="", type=str,
+                        help='Path to the folder containing the input files - instructions and data.')
+    addSimulationArguments(parser)
+    parser.add_argument('--restore', default=None, type=str,
+                        help='Resume from a checkpoint written by --checkpoint for the same inputs.')
+    parser.add_argument('--steps', default=None, type=int,
+                        help='Pause after this many instructions instead of running to HALT.')
+    parser.add_argument('--checkpoint', default=None, type=str,
+                        help='Save the core and memory state to this .npz file when the run stops.')
+    args = parser.parse_args()
+
+    # Dumps are written synchronously here: the status lines of DumpWriter threads would interleave.
+    simulate(args.iodir, restore=None if args.restore is None else os.path.abspath(args.restore), steps=args.steps,
+             checkpoint=None if args.checkpoint is None else os.path.abspath(args.checkpoint),
+             **simulationOptions(args))
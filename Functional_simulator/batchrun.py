@@ -0,0 +1,91 @@
+import os
+import sys
+import glob
+import time
+import argparse
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+import ak9327_am12553_funcsimulator as vp
+
+
+writer = None  # Background dump writer of a worker process, see runOne.
+
+
+def quiet():  # Pool initializer: the console output of the runs is discarded.
+    sys.stdout = open(os.devnull, 'w')
+
+
+def runOne(iodir, options, background=False):
+    # Runs in a pool worker, which imports the simulator once and is reused for many iodirs. Returns
+    # (iodir, status, wall time in seconds, error). With background, the dumps are left to a writer thread
+    # of the worker, which starts the next run while they are written, and are not part of the wall time.
+    global writer
+    start = time.time()
+    if background and writer is None:
+        writer = vp.DumpWriter()
+    try:
+        result = vp.simulate(iodir, writer=writer if background else None, **options)
+        status, error = "completed" if result == 0 else "halted", None
+    except Exception:
+        status, error = "failed", traceback.format_exc()
+    return iodir, status, time.time() - start, error
+
+
+def runBatch(iodirs, workers=None, background=False, **options):
+    # Simulates every iodir on a pool of worker processes; options are the keyword arguments of vp.simulate.
+    # Prints one line per run as it finishes, in input order, and returns the list of runOne results.
+    # Background dumps are all written by the time the pool has shut down.
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=quiet) as pool:
+        for iodir, status, seconds, error in pool.map(runOne, iodirs, [options] * len(iodirs),
+                                                      [background] * len(iodirs)):
+            print("%-9s %8.2fs  %s" % (status, seconds, iodir))
+            results.append((iodir, status, seconds, error))
+    return results
+
+
+def publishImages(imagedir):
+    # Loads SDMEM and VDMEM from imagedir once and publishes them in shared memory for every run.
+    return {name: vp.SharedImage(vp.DMEM(name, imagedir, addressLen).data)
+            for name, addressLen in (("SDMEM", 13), ("VDMEM", 17))}
+
+
+def expand(patterns):  # Folders named directly or through glob patterns, each once and in order.
+    iodirs = []
+    for pattern in patterns:
+        for path in sorted(glob.glob(pattern)) or [pattern]:
+            path = os.path.abspath(path)
+            if os.path.isdir(path) and path not in iodirs:
+                iodirs.append(path)
+    return iodirs
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description='Run the functional simulator over many iodirs in parallel.')
+    parser.add_argument('iodirs', nargs='+',
+                        help='Folders holding Code.asm, SDMEM and VDMEM, or glob patterns matching them.')
+    parser.add_argument('--workers', default=None, type=int,
+                        help='Number of worker processes. Defaults to the number of CPUs.')
+    parser.add_argument('--asyncdumps', action='store_true',
+                        help='Write the dumps of a run on a background thread while the worker goes on with '
+                             'its next run.')
+    parser.add_argument('--imagedir', default=None, type=str,
+                        help='Start every run from the SDMEM/VDMEM images in this folder, shared between the '
+                             'workers, instead of the images in each iodir.')
+    vp.addSimulationArguments(parser)
+    args = parser.parse_args()
+
+    iodirs = expand(args.iodirs)
+    start = time.time()
+    images = None if args.imagedir is None else publishImages(os.path.abspath(args.imagedir))
+    try:
+        results = runBatch(iodirs, args.workers, args.asyncdumps, images=images, **vp.simulationOptions(args))
+    finally:
+        for image in (images or {}).values():
+            image.close()
+    failures = [result for result in results if result[1] == "failed"]
+    for iodir, status, seconds, error in failures:
+        print("\n" + iodir + ":\n" + error.rstrip())
+    print("\n%d runs, %d failed, %.2fs" % (len(results), len(failures), time.time() - start))
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,32 @@
+import os
+import glob
+import argparse
+import numpy as np
+import ak9327_am12553_funcsimulator as vp
+
+
+def merge(path, imagedir, outdir, fmt="txt"):
+    # Rebuild the full NAMEOP dump from the input image NAME.* in imagedir and the delta at path.
+    with np.load(path) as delta:
+        name, addressLen = str(delta["name"]), int(delta["addressLen"])
+    image = vp.DMEM(name, imagedir, addressLen).data
+    dmem = vp.DMEM(name, outdir, addressLen, image=image)
+    dmem.applyDelta(path)
+    dmem.dump(fmt)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description='Merge delta memory dumps (--dumpfmt delta) back into full VDMEMOP/SDMEMOP images.')
+    parser.add_argument('--iodir', default="", type=str,
+                        help='Path to the folder containing the NAMEOP.delta.npz dumps.')
+    parser.add_argument('--imagedir', default=None, type=str,
+                        help='Folder holding the input images the run started from. Defaults to the iodir.')
+    parser.add_argument('--dumpfmt', default="txt", choices=("txt", "npy"),
+                        help='Format of the merged dumps, as for the functional simulator.')
+    args = parser.parse_args()
+
+    iodir = os.path.abspath(args.iodir)
+    imagedir = iodir if args.imagedir is None else os.path.abspath(args.imagedir)
+    for deltapath in sorted(glob.glob(os.path.join(iodir, "*OP.delta.npz"))):
+        merge(deltapath, imagedir, iodir, args.dumpfmt)
@@ -0,0 +1,311 @@
+import os
+import sys
+import time
+import random
+import argparse
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import ak9327_am12553_funcsimulator as vp
+import batchrun
+
+# Randomized differential tester. Like ins-verification.py it pastes programs into imem.instructions, but the
+# programs are generated and every engine is checked against the reference, the list backend interpreter.
+
+REFERENCE = dict(backend="list")
+ENGINES = {
+    "numpy": dict(backend="numpy"),
+    "compiled": dict(backend="numpy", engine="compiled"),
+    "compiled-list": dict(backend="list", engine="compiled"),
+    "fuse": dict(backend="numpy", fuse=True),
+    "fuse-list": dict(backend="list", fuse=True),
+    "sparse": dict(backend="numpy", memory="sparse"),
+    "fastforward": dict(backend="numpy", fastForward=True),
+}
+
+MEMBITS = 13  # Both memories are 8K words, plenty for the addresses generated below.
+
+# Register roles, so that every address stays in memory and every loop terminates:
+#   SR0 = 0, SR1/SR2 = base addresses, SR3 = stride, SR4 = vector length, SR5 = loop counter, SR6 = 1,
+#   SR7 = scratch, the only scalar register written by the random instructions.
+#   VR7 = gather/scatter offsets, never written; VR0-VR6 are free.
+# SDMEM: 0-4 the initial SR1-SR4 and SR6, 5-11 the bases the VRs are loaded from, 12-19 vector lengths for
+# MTCL, 20-22 loop trip counts, 23 the trip count of the vector loops, 24-63 scalars (SS writes 32-63).
+VV = ("ADDVV", "SUBVV", "MULVV", "DIVVV")
+VS = ("ADDVS", "SUBVS", "MULVS", "DIVVS")
+CMPVV = ("SEQVV", "SNEVV", "SGTVV", "SLTVV", "SGEVV", "SLEVV")
+CMPVS = ("SEQVS", "SNEVS", "SGTVS", "SLTVS", "SGEVS", "SLEVS")
+ALU = ("ADD", "SUB", "AND", "OR", "XOR")
+SHIFTS = ("SLL", "SRL", "SRA")
+BRANCHES = ("BEQ", "BNE", "BGT", "BLT", "BGE", "BLE")
+MULS = 4  # At most this many MULVV/MULVS per program, outside loops, so list backend values stay small.
+
+
+def images(rng):
+    sdmem = [rng.randint(256, 2048), rng.randint(256, 2048), rng.randint(-3, 4), rng.randint(1, 64), 1]
+    sdmem += [rng.randint(256, 4096) for _ in range(7)]
+    sdmem += [rng.choice((1, 2, 3, 7, 8, 31, 32, 33, 63, 64)) for _ in range(8)]
+    sdmem += [rng.randint(1, 4) for _ in range(3)] + [rng.randint(1, 24)]
+    sdmem += [rng.randint(-50, 50) if rng.random() < 0.95 else rng.randint(-2 ** 31, 2 ** 31 - 1)
+              for _ in range(40)]
+    words = np.random.RandomState(rng.randint(0, 2 ** 31 - 1))
+    vdmem = words.randint(-9, 10, 1 << MEMBITS).astype(np.int32)
+    large = words.random_sample(len(vdmem)) < 0.005  # A few values that overflow after a multiply or two.
+    vdmem[large] = words.randint(-2 ** 30, 2 ** 30, int(large.sum()))
+    vdmem[:64] = words.randint(0, 128, 64)  # The offsets VR7 is loaded with.
+    return np.array(sdmem, dtype=np.int32), vdmem
+
+
+class Generator(object):
+    def __init__(self, rng):
+        self.rng = rng
+        self.muls = 0
+
+    def vr(self):
+        return "VR%d" % self.rng.randint(0, 6)
+
+    def sr(self):
+        return "SR%d" % self.rng.randint(0, 7)
+
+    def base(self):
+        return "SR%d" % self.rng.randint(1, 2)
+
+    def instruction(self, loop=False):
+        rng, vr, sr = self.rng, self.vr, self.sr
+        kind = rng.random()
+        if kind < 0.22:
+            name = rng.choice(VV + VS)
+            if name.startswith("MUL"):
+                if loop or self.muls == MULS:
+                    name = "ADD" + name[3:]
+                else:
+                    self.muls += 1
+            if name.startswith("DIV") and rng.random() < 0.7:
+                name = "SUB" + name[3:]
+            if name.endswith("VV"):
+                return ["%s %s %s %s" % (name, vr(), vr(), rng.choice((vr(), "VR7")))]
+            return ["%s %s %s %s" % (name, vr(), vr(), sr())]
+        if kind < 0.27 and not loop and self.muls < MULS:  # MULVV/ADDVV accumulate, fused by --fuse.
+            self.muls += 1
+            acc, product = vr(), vr()
+            return ["MULVV %s %s %s" % (product, vr(), vr()), "ADDVV %s %s %s" % (acc, acc, product)]
+        if kind < 0.4:
+            return ["%s %s %s" % (rng.choice(CMPVV), vr(), vr()) if rng.random() < 0.5 else
+                    "%s %s %s" % (rng.choice(CMPVS), vr(), sr())]
+        if kind < 0.45:
+            return [rng.choice(("CVM", "POP SR7", "MFCL SR7"))]
+        if kind < 0.52:
+            return [rng.choice(("MTCL SR4", "LS SR4 SR0 %d" % rng.randint(12, 19)))]
+        if kind < 0.72:
+            name = rng.choice(("LV", "SV", "LVWS", "SVWS", "LVI", "SVI"))
+            if name in ("LV", "SV"):
+                return ["%s %s %s" % (name, vr(), self.base())]
+            if name in ("LVWS", "SVWS"):
+                return ["%s %s %s SR3" % (name, vr(), self.base())]
+            return ["%s %s %s VR7" % (name, vr(), self.base())]
+        if kind < 0.8:
+            return [rng.choice(("LS SR7 SR0 %d" % rng.randint(24, 63), "SS SR7 SR0 %d" % rng.randint(32, 63)))]
+        if kind < 0.84:
+            return ["%s SR7 %s %s" % (rng.choice(SHIFTS), sr(), rng.choice(("SR4", "SR6")))]
+        return ["%s SR7 %s %s" % (rng.choice(ALU), sr(), sr())]
+
+    def straight(self, count, loop=False):
+        lines = []
+        while len(lines) < count:
+            lines += self.instruction(loop)
+        return lines
+
+    def vectorLoop(self):
+        # A counted loop of loads, ADD/SUB vector ops and accumulators, with one base stepping by SR6, the
+        # kind of loop --fastforward batches. A random instruction now and then keeps it from being batched.
+        rng, vr, base = self.rng, self.vr, self.base
+        body = []
+        for _ in range(rng.randint(2, 7)):
+            kind = rng.random()
+            if kind < 0.3:
+                body.append("LV %s %s" % (vr(), base()) if rng.random() < 0.6 else "LVWS %s %s SR3" % (vr(), base()))
+            elif kind < 0.5:
+                acc = vr()
+                body.append("%s %s %s %s" % (rng.choice(("ADDVV", "SUBVV")), acc, acc, vr()))
+            elif kind < 0.75:
+                body.append("%s %s %s %s" % (rng.choice(("ADDVV", "SUBVV")), vr(), vr(), rng.choice((vr(), "VR7"))))
+            elif kind < 0.9:
+                body.append("%s %s %s SR%d" % (rng.choice(("ADDVS", "SUBVS")), vr(), vr(), rng.choice((3, 4, 6))))
+            else:
+                body += self.instruction(loop=True)
+        stepped = base()
+        body.append("%s %s %s SR6" % (rng.choice(("ADD", "SUB")), stepped, stepped))
+        return ["LS SR5 SR0 23"] + body + ["SUB SR5 SR5 SR6", "BNE SR5 SR0 %d" % -(len(body) + 1)]
+
+    def program(self):
+        rng = self.rng
+        lines = ["LS SR1 SR0 0", "LS SR2 SR0 1", "LS SR3 SR0 2", "LS SR6 SR0 4", "LV VR7 SR0"]
+        for idx in range(7):
+            lines += ["LS SR7 SR0 %d" % (5 + idx), "LV VR%d SR7" % idx]
+        lines += ["LS SR4 SR0 3", "MTCL SR4"]
+        for _ in range(rng.randint(1, 4)):
+            kind = rng.random()
+            if kind < 0.2:
+                lines += self.vectorLoop()
+            elif kind < 0.5:  # A counted loop, SUB/BNE at the bottom, fused by --fuse.
+                body = self.straight(rng.randint(2, 8), loop=True)
+                lines += ["LS SR5 SR0 %d" % rng.randint(20, 23)] + body
+                lines += ["SUB SR5 SR5 SR6", "BNE SR5 SR0 %d" % -(len(body) + 1)]
+            else:  # Straight code with forward branches that stay inside it.
+                segment = self.straight(rng.randint(3, 14))
+                for _ in range(rng.randint(0, 2)):
+                    at = rng.randint(0, len(segment))
+                    segment.insert(at, "%s %s %s %d" % (rng.choice(BRANCHES), self.sr(), self.sr(),
+                                                        rng.randint(1, len(segment) - at + 1)))
+                lines += segment
+        return lines + ["HALT"]
+
+
+class State(object):
+    # Architectural state at the end of a run, with the vector registers wrapped to int32 as the hardware
+    # (and the numpy backend) holds them. overflow is set when the list backend had left the int32 range.
+    COMPONENTS = ("status", "pc", "trace", "SRF", "VRF", "VMR", "VLG", "SDMEM", "VDMEM")
+
+    def __init__(self, core, status):
+        self.status = status
+        self.pc = core.pc
+        self.trace = "\n".join(map(str, core.resolvedCode))
+        self.SRF = [row[0] for row in core.RFs.get("SRF").registers]
+        self.VRF, overflow = self.wrap(core.RFs.get("VRF").registers)
+        self.VMR = core.RFs.get("VMR").ReadBits()
+        self.VLG = core.RFs.get("VLG").Read()
+        self.SDMEM, self.VDMEM = self.words(core.sdmem), self.words(core.vdmem)
+        self.overflow = overflow or any(vp.int32(value) != value for value in self.SRF)
+
+    @staticmethod
+    def wrap(registers):  # int32 view of the registers, and whether any value was outside int32.
+        try:
+            values = np.array(registers, dtype=np.int64)
+        except OverflowError:  # Python ints of the list backend beyond int64.
+            values = np.array([[vp.int32(value) for value in row] for row in registers], dtype=np.int64)
+            return values.astype(np.int32), True
+        wrapped = values.astype(np.int32)
+        return wrapped, bool((wrapped != values).any())
+
+    @staticmethod
+    def words(dmem):  # The whole address space; a SparseDMEM only holds up to its last touched page.
+        words = np.zeros(1 << MEMBITS, dtype=np.int32)
+        data = dmem.data[:len(words)]
+        words[:len(data)] = data
+        return words
+
+    def diff(self, other):  # Names of the components that differ.
+        return [name for name in self.COMPONENTS if
+                not (np.array_equal(getattr(self, name), getattr(other, name)) if name in ("VRF", "SDMEM", "VDMEM")
+                     else getattr(self, name) == getattr(other, name))]
+
+
+def run(lines, sdmem, vdmem, options, program=None):
+    # One run of lines on fresh memories from the images. program is lines already assembled, if at hand.
+    options = dict(options)
+    dmem = vp.SparseDMEM if options.pop("memory", "dense") == "sparse" else vp.DMEM
+    imem = vp.IMEM(os.devnull, cache=False)
+    imem.instructions = lines
+    imem.program = program
+    core = vp.Core(imem, dmem("SDMEM", os.devnull, MEMBITS, image=sdmem.copy()),
+                   dmem("VDMEM", os.devnull, MEMBITS, image=vdmem.copy()), traceFormat="full", **options)
+    try:
+        status = core.run()
+    except Exception as error:  # E.g. ZeroDivisionError, which every engine must raise alike.
+        status = type(error).__name__
+    return State(core, status)
+
+
+def firstDivergence(lines, sdmem, vdmem, options):
+    # Runs growing prefixes of the program on both sides; the instruction that first makes them differ is
+    # returned with the differing components and the reference state before it.
+    before = run(["HALT"], sdmem, vdmem, REFERENCE)
+    for pc in range(len(lines)):
+        prefix = lines[:pc + 1] + ["HALT"]
+        reference = run(prefix, sdmem, vdmem, REFERENCE)
+        components = reference.diff(run(prefix, sdmem, vdmem, options))
+        if components:
+            return pc, components, before
+        before = reference
+    return None, [], before
+
+
+def check(seed, engines):
+    # Generates program seed and runs it on the reference and each engine. Returns one result per engine:
+    # (engine, "ok" | "overflow" | "fail", report). A divergence that reads a value the list backend holds
+    # beyond int32 is an overflow, not a failure: the engines wrap those values and the reference does not.
+    rng = random.Random(seed)
+    sdmem, vdmem = images(rng)
+    lines = Generator(rng).program()
+    program = vp.Assembler().assemble(lines)
+    reference = run(lines, sdmem, vdmem, REFERENCE, program)
+    results = []
+    for engine in engines:
+        components = reference.diff(run(lines, sdmem, vdmem, ENGINES[engine], program))
+        if not components:
+            results.append((engine, "ok", None))
+            continue
+        pc, components, before = firstDivergence(lines, sdmem, vdmem, ENGINES[engine])
+        if before.overflow or reference.overflow and pc is None:
+            results.append((engine, "overflow", None))
+            continue
+        report = ["%s: seed %d diverges from the list interpreter" % (engine, seed)]
+        if pc is not None:
+            report.append("  first diverging instruction: PC %d '%s' (%s)" % (pc, lines[pc], ", ".join(components)))
+        report += ["  %3d  %s" % (idx, line) for idx, line in enumerate(lines)]
+        results.append((engine, "fail", "\n".join(report)))
+    return results
+
+
+def checkBatch(seeds, engines):
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        return [(seed, check(seed, engines)) for seed in seeds]
+
+
+def runTests(count, seed=0, engines=tuple(ENGINES), workers=None, batch=50, maxfail=5):
+    # Checks programs seed .. seed + count - 1 in batches on a pool of worker processes. Prints a summary
+    # per engine and the reports of the first maxfail failures, and returns the number of failures.
+    batches = [range(start, min(start + batch, seed + count)) for start in range(seed, seed + count, batch)]
+    totals = {engine: {"ok": 0, "overflow": 0, "fail": 0} for engine in engines}
+    reports = []
+    start = time.time()
+    with ProcessPoolExecutor(max_workers=workers, initializer=batchrun.quiet) as pool:
+        for results in pool.map(checkBatch, batches, [engines] * len(batches)):
+            for _, checks in results:
+                for engine, outcome, report in checks:
+                    totals[engine][outcome] += 1
+                    if report is not None and len(reports) < maxfail:
+                        reports.append(report)
+    seconds = time.time() - start
+    for report in reports:
+        print(report)
+    for engine in engines:
+        print("%-14s %7d ok %7d overflow %7d failed" % (engine, totals[engine]["ok"], totals[engine]["overflow"],
+                                                       totals[engine]["fail"]))
+    print("%d programs in %.1fs, %.0f programs/s" % (count, seconds, count / seconds if seconds else 0.0))
+    return sum(total["fail"] for total in totals.values())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description='Randomized differential test of the simulator engines against the list interpreter.')
+    parser.add_argument('--count', default=1000, type=int,
+                        help='Number of random programs to check.')
+    parser.add_argument('--seed', default=0, type=int,
+                        help='Seed of the first program; program N is the same on every run.')
+    parser.add_argument('--engines', default=",".join(ENGINES), type=str,
+                        help='Comma separated engines to check, from: ' + ", ".join(ENGINES) + '.')
+    parser.add_argument('--workers', default=None, type=int,
+                        help='Number of worker processes. Defaults to the number of CPUs.')
+    parser.add_argument('--batch', default=50, type=int,
+                        help='Programs per task handed to a worker.')
+    parser.add_argument('--maxfail', default=5, type=int,
+                        help='Number of failure reports to print.')
+    args = parser.parse_args()
+
+    engines = [engine for engine in args.engines.split(",") if engine]
+    for engine in engines:
+        if engine not in ENGINES:
+            parser.error("unknown engine %s" % engine)
+    failures = runTests(args.count, args.seed, engines, args.workers, args.batch, args.maxfail)
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,45 @@
+import os
+import glob
+import argparse
+import numpy as np
+import ak9327_am12553_funcsimulator as vp
+
+
+def convertDMEM(path, outdir):
+    # NAMEOP.npy -> NAMEOP.txt, one word per line like DMEM.dump.
+    name = os.path.basename(path)[:-len("OP.npy")]
+    data = np.load(path, mmap_mode='r')
+    dmem = vp.DMEM(name, outdir, max(len(data) - 1, 0).bit_length(), image=data)
+    dmem.dump()
+
+
+def convertRegisterFile(path, outdir):
+    # NAME.npz -> NAME.txt in the column layout of RegisterFile.dump.
+    with np.load(path) as npz:
+        rf = vp.RegisterFile(str(npz["name"]), int(npz["count"]), int(npz["length"]), int(npz["size"]),
+                             backend="numpy")
+        rf.registers[:] = npz["registers"]
+    rf.dump(outdir)
+
+
+def convert(iodir, outdir=None):
+    outdir = iodir if outdir is None else outdir
+    for path in sorted(glob.glob(os.path.join(iodir, "*OP.npy"))):
+        convertDMEM(path, outdir)
+    for path in sorted(glob.glob(os.path.join(iodir, "*.npz"))):
+        with np.load(path) as npz:
+            if "registers" not in npz.files:
+                continue
+        convertRegisterFile(path, outdir)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description='Render binary dumps (--dumpfmt npy) in the text layout of VDMEMOP.txt, VRF.txt, ...')
+    parser.add_argument('--iodir', default="", type=str,
+                        help='Path to the folder containing the binary dumps.')
+    parser.add_argument('--outdir', default=None, type=str,
+                        help='Where to write the text files. Defaults to the iodir.')
+    args = parser.parse_args()
+
+    convert(os.path.abspath(args.iodir), None if args.outdir is None else os.path.abspath(args.outdir))
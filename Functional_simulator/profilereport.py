@@ -0,0 +1,63 @@
+import os
+import json
+import argparse
+
+
+def load(iodir, name="profile"):
+    # profile.json written by a --profile run, keyed by PC.
+    path = os.path.abspath(os.path.join(iodir, name + ".json"))
+    try:
+        with open(path, 'r') as ipf:
+            profile = json.load(ipf)
+    except IOError:
+        print(name, "- ERROR: Couldn't open profile in path:", path)
+        return None, {}
+    return profile, {entry["pc"]: entry for entry in profile["instructions"]}
+
+
+def rank(funcdir, timingdir=None, sort="cycles"):
+    # One row per PC: Code.asm text, executions and seconds in the Functional Simulator, trace lines and
+    # busy/stall cycles in the Timing Simulator. Rows are ranked by busy + stall cycles, or by seconds.
+    func, funcPCs = load(funcdir)
+    timing, timingPCs = (None, {}) if timingdir is None else load(timingdir)
+    rows = []
+    for pc in set(funcPCs) | set(timingPCs):
+        entry, cycles = funcPCs.get(pc, {}), timingPCs.get(pc, {})
+        rows.append({"pc": pc, "code": entry.get("code", ""), "count": entry.get("count", 0),
+                     "seconds": entry.get("seconds", 0.0), "lines": cycles.get("count", 0),
+                     "busy": cycles.get("busy", 0), "stall": cycles.get("stall", 0)})
+    if sort == "time" or timing is None:
+        rows.sort(key=lambda row: -row["seconds"])
+    else:
+        rows.sort(key=lambda row: -(row["busy"] + row["stall"]))
+    seconds = func["seconds"] if func is not None else 0.0
+    cycles = timing["cycles"] if timing is not None else 0
+    return rows, seconds, cycles
+
+
+def report(rows, seconds, cycles, top=None):
+    print("%5s  %-28s %9s %10s %6s %10s %10s %6s" % ("PC", "Instruction", "Count", "Func ms", "%Func",
+                                                     "Busy", "Stall", "%Clk"))
+    for row in rows[:top]:
+        print("%5s  %-28s %9d %10.3f %6.1f %10d %10d %6.1f" % (
+            "-" if row["pc"] is None else row["pc"], row["code"][:28], row["count"], row["seconds"] * 1000,
+            100.0 * row["seconds"] / seconds if seconds else 0.0, row["busy"], row["stall"],
+            100.0 * (row["busy"] + row["stall"]) / cycles if cycles else 0.0))
+    print("Functional time: %.3f ms, Clock Cycles: %d" % (seconds * 1000, cycles))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description='Rank the hot instructions of Code.asm from the profiles of both simulators.')
+    parser.add_argument('--iodir', default="", type=str,
+                        help='Folder of a Functional Simulator run with --profile.')
+    parser.add_argument('--timingdir', default=None, type=str,
+                        help='Folder of a Timing Simulator run with --profile over the resolvedCode.txt of that run.')
+    parser.add_argument('--sort', default="cycles", choices=("cycles", "time"),
+                        help='Rank by busy + stall cycles (default, needs --timingdir) or by functional wall time.')
+    parser.add_argument('--top', default=20, type=int,
+                        help='Number of instructions to list.')
+    args = parser.parse_args()
+
+    rows, seconds, cycles = rank(args.iodir, args.timingdir, args.sort)
+    report(rows, seconds, cycles, args.top)
@@ -0,0 +1,17 @@
+import os
+import shutil
+import subprocess
+import sys
+
+FUNCSIM = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_ins_verification_decodes_every_case(tmp_path):
+    # ins-verification.py sets each case as one "OP ...\nHALT" element of IMEM.instructions. Every case must
+    # assemble, or it runs as "Wrong Instruction" and its "Verified" line means nothing.
+    shutil.copytree(os.path.join(FUNCSIM, "instructiontest"), str(tmp_path / "instructiontest"))
+    result = subprocess.run([sys.executable, os.path.join(FUNCSIM, "ins-verification.py")], cwd=str(tmp_path),
+                            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True)
+    assert result.returncode == 0, result.stdout
+    assert "Wrong Instruction" not in result.stdout
+    assert "ADDVV Verified" in result.stdout
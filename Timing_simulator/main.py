@@ -1,5 +1,12 @@
+import re
+import math
+import heapq
+from itertools import chain
 import time
 import os
+import json
+import argparse
+from array import array
 
 
 class Config(object):
@@ -14,6 +21,7 @@ class Config(object):
         self.computeQueueDepth = None
         self.numberOfBanks = None
         self.vlsPipelineDepth = None
+        self.instructionWindowSize = None
         try:
             with open(self.filepath, 'r') as conf:
                 self.parameters = {line.split('=')[0].strip(): int(line.split('=')[1].split('#')[0].strip()) for line in
@@ -39,36 +47,208 @@ class Config(object):
         self.addPipelineDepth = self.parameters["pipelineDepthAdd"]
         self.mulPipelineDepth = self.parameters["pipelineDepthMul"]
         self.divPipelineDepth = self.parameters["pipelineDepthDiv"]
+        # Optional: instructions Decode holds back before Fetch stalls. Unbounded if not given.
+        self.instructionWindowSize = self.parameters.get("instructionWindowSize")
 
 
 class IMEM(object):
     def __init__(self, iodir):
         self.size = pow(2, 16)  # Can hold a maximum of 2^16 instructions.
         self.filepath = os.path.abspath(os.path.join(iodir, "code.txt"))
-        self.instructions = []
+        self.trace = None
+        self.pcs = []  # Code.asm PC of each trace line from its "#pc N" comment (functional --profile), else None.
 
         try:
             with open(self.filepath, 'r') as insf:
-                self.instructions = [ins.split('#')[0].strip() for ins in insf.readlines() if
-                                     not (ins.startswith('#') or ins.strip() == '')]
+                lines = [(ins.split('#')[0].strip(), ins) for ins in insf.readlines()]
+            lines = [(text, ins) for text, ins in lines if text != '']
+            self.trace = Trace([text for text, ins in lines])
+            self.pcs = [self.parsePC(ins) for text, ins in lines]
             print("IMEM - Instructions loaded from file:", self.filepath)
             # print("IMEM - Instructions:", self.instructions)
         except:
             print("IMEM - ERROR: Couldn't open file in path:", self.filepath)
             raise
 
+    @staticmethod
+    def parsePC(ins):
+        match = re.search(r'#pc\s+(\d+)', ins)
+        return int(match.group(1)) if match is not None else None
+
+
+class Trace:
+    # The trace parsed once at load into parallel arrays, one entry per line: opcode id, register operands (-1 for
+    # none, two source slots per line) and the addresses of data instructions as a slice of one flat int32 array.
+    # The pipeline stages pass line numbers around. Unit and compute pipeline are tables indexed by opcode id.
+    # Lines that don't parse or name a register past the busy boards keep their text in malformed: Decode parses
+    # it again when its scan reaches them, and fails the way it did when every line was parsed there.
+    def __init__(self, lines, registerCount=8):
+        # Busy board position of each register number, negative ones counting from the end as list indices do.
+        self.registerIndex = {i: i % registerCount for i in range(-registerCount, registerCount)}
+        self.ids = {name: opcode for opcode, name in enumerate(Decode.INS)}  # Unknown names get ids as they come.
+        self.lengths = {}  # The vector length operand of each MTCL, converted when Fetch takes it.
+        self.malformed = {}
+        rows, flat, decoded = [], [], {}
+        for line, text in enumerate(lines):
+            entry = decoded.get(text)
+            if entry is None:  # Loops repeat lines verbatim: decode each text once, sharing its addresses.
+                entry = decoded[text] = self.decode(text, flat)
+            row, length, malformed = entry
+            rows.append(row)
+            if length is not None:
+                self.lengths[line] = length
+            if malformed:
+                self.malformed[line] = text
+
+        columns = list(zip(*rows)) if len(rows) > 0 else [()] * 10
+        self.opcodes = array('H', columns[0])
+        self.sdest = array('b', columns[1])  # Registers are -1 for none.
+        self.vdest = array('b', columns[2])
+        self.ssrc = array('b', chain.from_iterable(zip(columns[3], columns[4])))  # Two per line.
+        self.vsrc = array('b', chain.from_iterable(zip(columns[5], columns[6])))
+        self.offsets = array('q', columns[7])  # Where the addresses of each line start in flat.
+        self.counts = array('q', columns[8])
+        self.strides = array('q', columns[9])  # 0 for an explicit list, else flat holds the base of the access.
+        try:
+            self.flat = array('i', flat)
+        except OverflowError:  # Addresses past int32.
+            self.flat = array('q', flat)
+        self.units = [Decode.INS.get(name, Decode.INSTR_EMPTY) for name in self.ids]
+        self.pipelines = [ComputeExec.pipelineOf(name) for name in self.ids]
+
+    def __len__(self):
+        return len(self.opcodes)
+
+    def decode(self, text, flat):
+        # The row of one line: opcode, sdest, vdest, ssrc pair, vsrc pair, address offset, count and stride. Its
+        # addresses go to the end of flat. Returns it with the MTCL length and whether the line is malformed.
+        args = text.split()
+        opcode = self.ids.setdefault(args[0], len(self.ids))
+        length = args[-1] if args[0] == 'MTCL' else None
+        index = self.registerIndex
+        try:
+            instr = self.parseInstruction(args)
+            sdest, vdest = instr.get(Decode.INSTR_SDEST), instr.get(Decode.INSTR_VDEST)
+            ssrc = [index[i] for i in instr.get(Decode.INSTR_SSRC, ())] + [-1, -1]
+            vsrc = [index[i] for i in instr.get(Decode.INSTR_VSRC, ())] + [-1, -1]
+            sdest, vdest = -1 if sdest is None else index[sdest], -1 if vdest is None else index[vdest]
+        except (ValueError, IndexError, KeyError):
+            return (opcode, -1, -1, -1, -1, -1, -1, 0, 0, 0), length, True
+
+        addresses, offset = instr.get(Decode.INSTR_ADDRESS, ()), len(flat)
+        if isinstance(addresses, range):
+            flat.append(addresses.start)
+            stride = addresses.step
+        else:
+            flat.extend(addresses)
+            stride = 0
+        return (opcode, sdest, vdest, ssrc[0], ssrc[1], vsrc[0], vsrc[1], offset, len(addresses), stride), length, False
+
+    def addresses(self, line):
+        offset, count, stride = self.offsets[line], self.counts[line], self.strides[line]
+        if stride == 0:
+            return self.flat[offset:offset + count]
+        base = self.flat[offset]
+        return range(base, base + stride * count, stride)
+
+    def unit(self, line):
+        return self.units[self.opcodes[line]]
+
+    def pipeline(self, line):
+        return self.pipelines[self.opcodes[line]]
+
+    @staticmethod
+    def parseInstruction(args):
+        # Operand fields of one line, as Decode read them off the text.
+        instr = {}
+        name = args[0]
+        type = Decode.INS.get(name)
+
+        if type == Decode.INSTR_COMPUTE:
+            if name in ['ADDVV', 'SUBVV', 'MULVV', 'DIVVV']:
+                instr[Decode.INSTR_VDEST] = int(args[1][2:])
+                instr[Decode.INSTR_VSRC] = [int(args[2][2:]), int(args[3][2:])]
+            elif name in ['ADDVS', 'SUBVS', 'MULVS', 'DIVVS']:
+                instr[Decode.INSTR_VDEST] = int(args[1][2:])
+                instr[Decode.INSTR_VSRC] = [int(args[2][2:])]
+                instr[Decode.INSTR_SSRC] = [int(args[3][2:])]
+            elif name in ['SEQVV', 'SNEVV', 'SGTVV', 'SLTVV', 'SGEVV', 'SLEVV']:
+                instr[Decode.INSTR_VSRC] = [int(args[1][2:]), int(args[2][2:])]
+            elif name in ['SEQVS', 'SNEVS', 'SGTVS', 'SLTVS', 'SGEVS', 'SLVES']:
+                instr[Decode.INSTR_VSRC] = [int(args[1][2:])]
+                instr[Decode.INSTR_SSRC] = [int(args[2][2:])]
+        elif type == Decode.INSTR_SCALAR:
+            if name == 'SS':
+                instr[Decode.INSTR_SSRC] = [int(args[1][2:]), int(args[2][2:])]
+            elif name == 'LS':
+                instr[Decode.INSTR_SDEST] = int(args[1][2:])
+                instr[Decode.INSTR_SSRC] = [int(args[2][2:])]
+            elif name in ['ADD', 'SUB', 'AND', 'OR', 'XOR', 'SLL', 'SRL', 'SRA']:
+                instr[Decode.INSTR_SDEST] = int(args[1][2:])
+                instr[Decode.INSTR_SSRC] = [int(args[2][2:]), int(args[3][2:])]
+            elif name in ['BEQ', 'BNE', 'BGT', 'BLT', 'BGE', 'BLE']:
+                instr[Decode.INSTR_SSRC] = [int(args[1][2:]), int(args[2][2:])]
+            elif name in ['MFCL', 'POP']:
+                instr[Decode.INSTR_SDEST] = int(args[1][2:])
+            elif name == 'MTCL':
+                instr[Decode.INSTR_SSRC] = [int(args[1][2:])]
+        else:
+            instr[Decode.INSTR_ADDRESS] = Trace.parseAddresses(args[-1])
+            if name == 'LV':
+                instr[Decode.INSTR_VDEST] = int(args[1][2:])
+                instr[Decode.INSTR_SSRC] = [int(args[2][2:])]
+            elif name == 'LVI':
+                instr[Decode.INSTR_VDEST] = int(args[1][2:])
+                instr[Decode.INSTR_SSRC] = [int(args[2][2:])]
+                instr[Decode.INSTR_VSRC] = [int(args[3][2:])]
+            elif name == 'LVWS':
+                instr[Decode.INSTR_VDEST] = int(args[1][2:])
+                instr[Decode.INSTR_SSRC] = [int(args[2][2:])]
+                instr[Decode.INSTR_SSRC] = [int(args[3][2:])]
+            elif name == 'SV':
+                instr[Decode.INSTR_VDEST] = int(args[1][2:])
+                instr[Decode.INSTR_SSRC] = [int(args[2][2:])]
+            elif name == 'SVI':
+                instr[Decode.INSTR_SSRC] = [int(args[2][2:])]
+                instr[Decode.INSTR_VSRC] = [int(args[1][2:]), int(args[3][2:])]
+            elif name == 'SVWS':
+                instr[Decode.INSTR_VSRC] = [int(args[1][2:])]
+                instr[Decode.INSTR_SSRC] = [int(args[2][2:]), int(args[3][2:])]
+        return instr
+
+    @staticmethod
+    def parseAddresses(token):
+        # Explicit lists are written (a0,a1,...). Strided accesses may be written compactly as
+        # [base,stride,count] and are kept as a lazy sequence until DataExec issues them.
+        if token.startswith('['):
+            base, stride, count = [int(num) for num in token.strip('[]').split(',')]
+            return range(base, base + stride * count, stride) if stride != 0 else [base] * count
+        return [int(num) for num in token.strip('()').split(',')]
+
+    @staticmethod
+    def registers(instr):  # (board, register) of each operand, 0 scalar, 1 vector, in Decode's check order.
+        sdest, vdest = instr.get(Decode.INSTR_SDEST), instr.get(Decode.INSTR_VDEST)
+        return [(0, i) for i in instr.get(Decode.INSTR_SSRC) or ()] + \
+            [(1, i) for i in instr.get(Decode.INSTR_VSRC) or ()] + \
+            ([(0, sdest)] if sdest is not None else []) + ([(1, vdest)] if vdest is not None else [])
+
 
 class Core:
-    def __init__(self, config, imem):
+    def __init__(self, config, imem, profile=False, stepped=False):
         self.config = config
         self.imem = imem
-        self.compute = ComputeExec(self.config.addPipelineDepth, self.config.mulPipelineDepth,
+        self.trace = imem.trace
+        self.compute = ComputeExec(self.trace, self.config.addPipelineDepth, self.config.mulPipelineDepth,
                                    self.config.divPipelineDepth, self.config.numberOfLanes)
-        self.data = DataExec(6, self.config.numberOfBanks, self.config.vlsPipelineDepth)
-        self.decode = Decode(self.config.computeQueueDepth, self.config.dataQueueDepth, 8, 8, self.compute, self.data)
-        self.fetch = Fetch(self.imem.instructions, self.decode)
+        self.data = DataExec(self.trace, 6, self.config.numberOfBanks, self.config.vlsPipelineDepth, stepped)
+        self.decode = Decode(self.trace, self.config.computeQueueDepth, self.config.dataQueueDepth, 8, 8, self.compute,
+                             self.data, self.config.instructionWindowSize, stepped)
+        self.fetch = Fetch(self.trace, self.decode)
         self.compute.setFreeBusyBoard(self.decode.freeBusyBoard)
         self.data.setFreeBusyBoard(self.decode.freeBusyBoard)
+        self.profile = Profile(imem) if profile else None
+        # Reference mode: run every clock cycle, DataExec one address per cycle, Decode rescanning its window.
+        self.stepped = stepped
         self.clk = 1
         self.startTime = None
         self.endTime = None
@@ -77,15 +257,41 @@ class Core:
         print("Timing Simulation Started")
         self.startTime = time.time()
         while not (self.fetch.getStatus() == Status.COMPLETED and self.decode.isClear()):
-            status1, instr = self.fetch.run()
-            status2, computeInstr, dataInstr, scalarInstr = self.decode.run(instr)
+            if not self.stepped:
+                idle = self.idleCycles()
+                if idle > 0:
+                    self.skipCycles(idle)
+                    continue
+            status1, line = self.fetch.run()
+            status2, computeInstr, dataInstr, scalarInstr = self.decode.run(line)
             self.compute.run(computeInstr, self.fetch.getCurrentVectorLength())
             self.data.run(dataInstr)
+            if self.profile is not None:
+                self.profile.cycle(self, line, scalarInstr)
             self.clk += 1
 
         self.endTime = time.time()
         print("Timing Simulation Completed")
 
+    def idleCycles(self):
+        # Cycles from now in which no unit changes state: Fetch is done or holds an MTCL, Decode has nothing to
+        # pop, and the busy pipelines and memory banks only count down. The cycle a countdown ends in is not idle.
+        if not (self.fetch.isStalled() and self.decode.isIdle()):
+            return 0
+        if self.decode.isFull() and self.data.getStatus() == Status.FREE and self.decode.isBusy(self.data.instr):
+            # A full window retries issue before DataExec frees these registers again. Never true without a window
+            # bound: there a queue that filled up stays BUSY (see Decode.run) and nothing is retried.
+            return 0
+        cycles = [cycle for cycle in (self.compute.idleCycles(), self.data.idleCycles()) if cycle is not None]
+        return min(cycles) if cycles else 0
+
+    def skipCycles(self, cycles):  # Same effect as running that many idle cycles one by one.
+        self.compute.skipCycles(cycles)
+        self.data.skipCycles(cycles)
+        if self.profile is not None:
+            self.profile.cycle(self, None, None, cycles)
+        self.clk += cycles
+
     def printResult(self):
         time_difference = self.endTime - self.startTime
         minutes = str(int(time_difference // 60))
@@ -96,8 +302,58 @@ class Core:
         print("Time Elapsed: ", minutes + "m", seconds + "s")
         print("--------------------------------------------------")
 
-    def dumpResult(self):
-        pass
+    def dumpResult(self, iodir=None):
+        if self.profile is not None and iodir is not None:
+            self.profile.dump(iodir, self.clk - 1)
+
+
+class Profile:
+    # Attributes every cycle to the trace lines occupying the core: busy while a line is in a compute pipeline,
+    # the load/store unit or issuing as a scalar, stalled while it waits in Fetch (MTCL), the decode window or a
+    # compute/data queue. dump() folds the lines into the Code.asm PCs of their "#pc N" comments.
+    def __init__(self, imem):
+        self.pcs = imem.pcs
+        self.busy = [0] * len(imem.trace)
+        self.stall = [0] * len(imem.trace)
+
+    def cycle(self, core, line, scalarInstr, cycles=1):  # cycles > 1 for a run of idle cycles.
+        busy, stall = self.busy, self.stall
+        compute, data, decode, fetch = core.compute, core.data, core.decode, core.fetch
+        addStatus, mulStatus, divStatus = compute.getPipelineStatus()
+        if addStatus == Status.BUSY:
+            busy[compute.currentAddInstr] += cycles
+        if mulStatus == Status.BUSY:
+            busy[compute.currentMulInstr] += cycles
+        if divStatus == Status.BUSY:
+            busy[compute.currentDivInstr] += cycles
+        if data.getStatus() == Status.BUSY:
+            busy[data.instr] += cycles
+        if scalarInstr is not None:
+            busy[scalarInstr] += cycles
+        for queue in (decode.priorityQueue, decode.computeQueue, decode.dataQueue):
+            for waiting in queue:
+                stall[waiting] += cycles
+        if line is None and fetch.getStatus() != Status.COMPLETED:  # MTCL or a full decode window.
+            stall[fetch.addr] += cycles
+
+    def dump(self, iodir, cycles, name="profile"):
+        # Per-PC trace lines, busy and stall cycles, hottest first. Lines without a "#pc" go under pc null.
+        totals = {}
+        for pc, busy, stall in zip(self.pcs, self.busy, self.stall):
+            total = totals.setdefault(pc, [0, 0, 0])
+            total[0] += 1
+            total[1] += busy
+            total[2] += stall
+        instructions = [{"pc": pc, "count": count, "busy": busy, "stall": stall}
+                        for pc, (count, busy, stall) in totals.items()]
+        instructions.sort(key=lambda entry: -(entry["busy"] + entry["stall"]))
+        path = os.path.abspath(os.path.join(iodir, name + ".json"))
+        try:
+            with open(path, 'w') as opf:
+                json.dump({"simulator": "timing", "cycles": cycles, "instructions": instructions}, opf, indent=1)
+            print(name, "- Profile dumped into ", path)
+        except:
+            print(name, "- ERROR: Couldn't open output file ", path)
 
 
 class Status:
@@ -109,32 +365,40 @@ class Status:
 
 
 class Fetch:
-    def __init__(self, imem, decode):
-        self.imem = imem
+    def __init__(self, trace, decode):
+        self.trace = trace
         self.addr = 0
         self.decode = decode
         self.currentVectorLength = 64
+        self.mtcl = trace.ids['MTCL']
         self.__status = Status.FREE
 
-    def run(self):
+    def run(self):  # Returns the trace line fetched this cycle, or None.
 
         # instr = self.imem.Read(self.addr)  # Reading the instruction
-        if len(self.imem) == self.addr or self.__status == Status.COMPLETED:
+        if len(self.trace) == self.addr or self.__status == Status.COMPLETED:
             self.__status = Status.COMPLETED
             return Status.SUCCESS, None
 
-        instr = self.imem[self.addr]
+        if self.decode.isFull():  # Back-pressure: hold the line until an instruction issues.
+            return Status.BUSY, None
+
+        line = self.addr
 
-        if instr.split()[0] == 'MTCL':
+        if self.trace.opcodes[line] == self.mtcl:
             if self.decode.isClear():
-                self.currentVectorLength = int(instr.split()[-1])
+                self.currentVectorLength = int(self.trace.lengths[line])
                 self.addr = self.addr + 1
-                return Status.SUCCESS, instr
+                return Status.SUCCESS, line
             else:
                 return Status.SUCCESS, None
         else:
             self.addr = self.addr + 1
-            return Status.SUCCESS, instr
+            return Status.SUCCESS, line
+
+    def isStalled(self):  # Will run() return no instruction without changing state?
+        return self.__status == Status.COMPLETED or self.addr < len(self.trace) and \
+            (self.decode.isFull() or self.trace.opcodes[self.addr] == self.mtcl and not self.decode.isClear())
 
     def getCurrentVectorLength(self):
         return self.currentVectorLength
@@ -148,14 +412,11 @@ class Decode:
     INSTR_COMPUTE = 1
     INSTR_DATA = 2
     INSTR_SCALAR = 3
-    INSTR_TYPE = "Type"
     INSTR_SDEST = "SDest"
     INSTR_VDEST = "VDest"
     INSTR_VSRC = "VSrc"
     INSTR_SSRC = "SSrc"
-    INSTR_NAME = "Name"
     INSTR_ADDRESS = "Address"
-    INSTR_ARGS = "Args"
 
     INS = dict.fromkeys(['LS', 'SS', 'ADD', 'SUB', 'SRA', 'SRL', 'SLL', 'AND', 'OR',
                          'XOR', 'BEQ', 'BNE', 'BGT', 'BLT', 'BGE', 'BLE', 'MFCL', 'MTCL', 'CVM', 'POP', 'HALT'],
@@ -165,24 +426,30 @@ class Decode:
                               'ADDVS', 'SUBVS', 'MULVS', 'DIVVS', 'SEQVS', 'SNEVS', 'SGTVS', 'SLTVS', 'SGEVS', 'SLVES'],
                              INSTR_COMPUTE))
 
-    def __init__(self, computeQueueDepth, dataQueueDepth, vectorRegisterLength, scalarRegisterLength, computeExec,
-                 dataExec):
+    def __init__(self, trace, computeQueueDepth, dataQueueDepth, vectorRegisterLength, scalarRegisterLength,
+                 computeExec, dataExec, windowSize=None, stepped=False):
+        self.trace = trace
         self.computeQueueDepth = computeQueueDepth
         self.dataQueueDepth = dataQueueDepth
         self.computeExec = computeExec
         self.dataExec = dataExec
-        self.computeQueue = []
+        self.computeQueue = []  # The queues and the window hold trace line numbers.
         self.dataQueue = []
         self.scalarQueue = []
-        self.args = 0
         self.__computeStatus = Status.FREE
         self.__dataStatus = Status.FREE
-        self.instr = None
         self.vectorBusyBoard = [0] * vectorRegisterLength
         self.scalarBusyBoard = [0] * scalarRegisterLength
-        self.priorityQueue = []
+        self.priorityQueue = {}  # The instruction window: line -> unit, oldest first.
+        self.windowSize = windowSize  # None for a window as long as the trace.
+        self.stepped = stepped  # Rescan the window for each issue (reference) instead of using the ready lists.
+        # Window entries whose registers were all free when last checked, as heaps of lines per unit. The others
+        # are parked on one busy register, (0, scalar) or (1, vector), until freeBusyBoard clears it.
+        self.ready = {Decode.INSTR_COMPUTE: [], Decode.INSTR_DATA: [], Decode.INSTR_SCALAR: []}
+        self.parked = {}
+        self.malformed = []  # Window entries on malformed trace lines, oldest first.
 
-    def run(self, instr):
+    def run(self, line):
 
         # region Popping out of the queue
         if self.shouldPopCompute():
@@ -199,54 +466,130 @@ class Decode:
         self.freeBusyBoard(scalarInstr)
         # endregion
 
+        # The original simulator set the queue status only on issue, so without a window bound a queue that filled
+        # up stays BUSY and its later instructions never leave the window; the run still ends as isClear ignores
+        # the window. This is kept on purpose, the default clocks match the original ones. A bounded window would
+        # fill up with those instructions for good, so there the queues take instructions again once they have room.
+        if self.windowSize is not None:
+            self.__computeStatus = Status.BUSY if len(self.computeQueue) >= self.computeQueueDepth else Status.FREE
+            self.__dataStatus = Status.BUSY if len(self.dataQueue) >= self.dataQueueDepth else Status.FREE
+
         # Adding to Queue
-        if instr is not None:
-            self.args = instr.split()
-            self.instr = {Decode.INSTR_TYPE: self.INS.get(self.args[0], None),
-                          Decode.INSTR_NAME: self.args[0],
-                          Decode.INSTR_ARGS: instr.split()}
-            self.priorityQueue.append(self.instr)
-            if self.instr.get(Decode.INSTR_TYPE) is None:
+        if line is not None:
+            unit = self.trace.unit(line)
+            self.priorityQueue[line] = unit
+            if not self.stepped:
+                self.enqueue(line)
+            if unit == Decode.INSTR_EMPTY:
                 return Status.FAILED, None, None, None
-            toggle = False
-            for index, instr in enumerate(self.priorityQueue):
-                self.instr = instr
-                self.args = instr.get(Decode.INSTR_ARGS)
-                self.parseInstruction()
-                # Compute part
-                if self.__computeStatus == Status.FREE and instr.get(Decode.INSTR_TYPE) == Decode.INSTR_COMPUTE:
-                    if self.checkBusyBoard():
-                        self.updateBusyBoard()
-                        self.computeQueue.append(self.instr)
-                        toggle = True
-                        if len(self.computeQueue) == self.computeQueueDepth:
-                            self.__computeStatus = Status.BUSY
-                        else:
-                            self.__computeStatus = Status.FREE
-
-                # Data Part
-                elif self.__dataStatus == Status.FREE and instr.get(Decode.INSTR_TYPE) == Decode.INSTR_DATA:
-                    if self.checkBusyBoard():
-                        self.updateBusyBoard()
-                        self.dataQueue.append(self.instr)
-                        toggle = True
-                        if len(self.dataQueue) == self.dataQueueDepth:
-                            self.__dataStatus = Status.BUSY
-                        else:
-                            self.__dataStatus = Status.FREE
-
-                # Scalar Part
-                elif instr.get(Decode.INSTR_TYPE) == Decode.INSTR_SCALAR and self.checkBusyBoard():
-                    self.updateBusyBoard()
-                    toggle = True
-                    self.scalarQueue.append(self.instr)
-
-                if toggle:
-                    self.priorityQueue.pop(index)
-                    break
+        # Issue the oldest instruction that can go, when one arrives or while a full window holds Fetch back.
+        if line is not None or self.isFull():
+            if self.stepped:
+                self.scan()
+            else:
+                self.issueReady()
 
         return Status.SUCCESS, computeInstr, dataInstr, scalarInstr
 
+    def scan(self):
+        for line in self.priorityQueue:
+            if line in self.trace.malformed:
+                self.replay(line)
+            elif self.canTake(line) and self.busyRegister(line) is None:
+                del self.priorityQueue[line]
+                self.issue(line)
+                break
+
+    def enqueue(self, line):  # File a new window entry under the ready list of its unit or a busy register.
+        if line in self.trace.malformed:
+            self.malformed.append(line)
+        elif self.priorityQueue[line] in self.ready:
+            self.release(line)
+
+    def release(self, line):
+        register = self.busyRegister(line)
+        if register is None:
+            heapq.heappush(self.ready[self.priorityQueue[line]], line)
+        else:
+            self.parked.setdefault(register, []).append(line)
+
+    def nextReady(self, type):
+        # Oldest entry of the ready list that can issue, None if there is none. Issued entries are dropped and
+        # entries whose registers turned busy since are parked again.
+        heap = self.ready[type]
+        while len(heap) > 0:
+            if heap[0] in self.priorityQueue:
+                register = self.busyRegister(heap[0])
+                if register is None:
+                    return heap[0]
+                self.parked.setdefault(register, []).append(heap[0])
+            heapq.heappop(heap)
+        return None
+
+    def oldestIssuable(self):
+        # The entry scan() would issue: the oldest ready one whose unit takes instructions.
+        candidates = [self.nextReady(Decode.INSTR_SCALAR)]
+        if self.__computeStatus == Status.FREE:
+            candidates.append(self.nextReady(Decode.INSTR_COMPUTE))
+        if self.__dataStatus == Status.FREE:
+            candidates.append(self.nextReady(Decode.INSTR_DATA))
+        candidates = [line for line in candidates if line is not None]
+        return min(candidates) if candidates else None
+
+    def issueReady(self):
+        line = self.oldestIssuable()
+        for malformed in self.malformed:  # scan() visits these on its way to line, and may fail on them.
+            if line is not None and malformed > line:
+                break
+            self.replay(malformed)
+        if line is None:
+            return
+        heapq.heappop(self.ready[self.priorityQueue.pop(line)])
+        self.issue(line)
+
+    def issue(self, line):  # line leaves the window for the queue of its unit.
+        self.updateBusyBoard(line)
+        unit = self.trace.unit(line)
+        if unit == Decode.INSTR_COMPUTE:
+            self.computeQueue.append(line)
+            self.__computeStatus = Status.BUSY if len(self.computeQueue) == self.computeQueueDepth else Status.FREE
+        elif unit == Decode.INSTR_DATA:
+            self.dataQueue.append(line)
+            self.__dataStatus = Status.BUSY if len(self.dataQueue) == self.dataQueueDepth else Status.FREE
+        else:
+            self.scalarQueue.append(line)
+
+    def replay(self, line):
+        # A malformed line never issues. Parse its text and check the busy boards like the scan of the text did:
+        # that fails, unless a busy register ends the check first or the unit takes no instructions.
+        instr = Trace.parseInstruction(self.trace.malformed[line].split())
+        if self.canTake(line):
+            boards = (self.scalarBusyBoard, self.vectorBusyBoard)
+            for board, i in Trace.registers(instr):
+                if boards[board][i]:
+                    return
+
+    def canIssue(self):  # Would the scan of the window issue an instruction (or fail)?
+        if not self.stepped:
+            return self.oldestIssuable() is not None or len(self.malformed) > 0
+        for line in self.priorityQueue:
+            try:
+                if line in self.trace.malformed:
+                    self.replay(line)
+                elif self.canTake(line) and self.busyRegister(line) is None:
+                    return True
+            except (ValueError, IndexError):
+                return True
+        return False
+
+    def canTake(self, line):  # Does the queue of line's unit take instructions?
+        type = self.trace.unit(line)
+        return type == Decode.INSTR_SCALAR or type == Decode.INSTR_COMPUTE and self.__computeStatus == Status.FREE \
+            or type == Decode.INSTR_DATA and self.__dataStatus == Status.FREE
+
+    def isFull(self):
+        return self.windowSize is not None and len(self.priorityQueue) >= self.windowSize
+
     def getComputeStatus(self):
         return self.__computeStatus
 
@@ -266,113 +609,62 @@ class Decode:
             return False
 
     def shouldPopCompute(self):
-        return len(self.computeQueue) > 0 and ((self.computeQueue[0].get(
-            Decode.INSTR_NAME) in ComputeExec.addPipelineInstr and self.computeExec.getAddPipelineStatus() == Status.FREE)
-                                               or (self.computeQueue[0].get(
-                    Decode.INSTR_NAME) in ComputeExec.mulPipelineInstr and self.computeExec.getMulPipelineStatus() == Status.FREE)
-                                               or (self.computeQueue[0].get(
-                    Decode.INSTR_NAME) in ComputeExec.divPipelineInstr and self.computeExec.getDivPipelineStatus() == Status.FREE))
+        if len(self.computeQueue) == 0:
+            return False
+        pipeline = self.trace.pipeline(self.computeQueue[0])
+        return pipeline is not None and self.computeExec.getPipelineStatus()[pipeline] == Status.FREE
 
     def shouldPopData(self):
         return self.dataExec.getStatus() == Status.FREE
 
-    def freeBusyBoard(self, instr):
-        if instr is not None:
-            sdest = instr.get(Decode.INSTR_SDEST)
-            if sdest is not None:
+    def isIdle(self):  # Will run(None) leave the queues as they are?
+        return len(self.scalarQueue) == 0 and not self.shouldPopCompute() and \
+            not (self.shouldPopData() and len(self.dataQueue) > 0) and not (self.isFull() and self.canIssue())
+
+    def isBusy(self, line):  # Is a destination register of line marked busy?
+        if line is None:
+            return False
+        sdest, vdest = self.trace.sdest[line], self.trace.vdest[line]
+        return sdest >= 0 and self.scalarBusyBoard[sdest] == 1 or vdest >= 0 and self.vectorBusyBoard[vdest] == 1
+
+    def freeBusyBoard(self, line):
+        if line is not None:
+            sdest = self.trace.sdest[line]
+            if sdest >= 0:
+                busy = self.scalarBusyBoard[sdest]
                 self.scalarBusyBoard[sdest] = 0
+                if busy:
+                    self.unpark((0, sdest))
 
-            vdest = instr.get(Decode.INSTR_VDEST)
-            if vdest is not None:
+            vdest = self.trace.vdest[line]
+            if vdest >= 0:
+                busy = self.vectorBusyBoard[vdest]
                 self.vectorBusyBoard[vdest] = 0
-
-    def parseInstruction(self):
-        name = self.instr[Decode.INSTR_NAME]
-        type = self.instr[Decode.INSTR_TYPE]
-
-        if type == Decode.INSTR_COMPUTE:
-            if name in ['ADDVV', 'SUBVV', 'MULVV', 'DIVVV']:
-                self.instr[Decode.INSTR_VDEST] = int(self.args[1][2:])
-                self.instr[Decode.INSTR_VSRC] = [int(self.args[2][2:]), int(self.args[3][2:])]
-            elif name in ['ADDVS', 'SUBVS', 'MULVS', 'DIVVS']:
-                self.instr[Decode.INSTR_VDEST] = int(self.args[1][2:])
-                self.instr[Decode.INSTR_VSRC] = [int(self.args[2][2:])]
-                self.instr[Decode.INSTR_SSRC] = [int(self.args[3][2:])]
-            elif name in ['SEQVV', 'SNEVV', 'SGTVV', 'SLTVV', 'SGEVV', 'SLEVV']:
-                self.instr[Decode.INSTR_VSRC] = [int(self.args[1][2:]), int(self.args[2][2:])]
-            elif name in ['SEQVS', 'SNEVS', 'SGTVS', 'SLTVS', 'SGEVS', 'SLVES']:
-                self.instr[Decode.INSTR_VSRC] = [int(self.args[1][2:])]
-                self.instr[Decode.INSTR_SSRC] = [int(self.args[2][2:])]
-        elif type == Decode.INSTR_SCALAR:
-            if name == 'SS':
-                self.instr[Decode.INSTR_SSRC] = [int(self.args[1][2:]), int(self.args[2][2:])]
-            elif name == 'LS':
-                self.instr[Decode.INSTR_SDEST] = int(self.args[1][2:])
-                self.instr[Decode.INSTR_SSRC] = [int(self.args[2][2:])]
-            elif name in ['ADD', 'SUB', 'AND', 'OR', 'XOR', 'SLL', 'SRL', 'SRA']:
-                self.instr[Decode.INSTR_SDEST] = int(self.args[1][2:])
-                self.instr[Decode.INSTR_SSRC] = [int(self.args[2][2:]), int(self.args[3][2:])]
-            elif name in ['BEQ', 'BNE', 'BGT', 'BLT', 'BGE', 'BLE']:
-                self.instr[Decode.INSTR_SSRC] = [int(self.args[1][2:]), int(self.args[2][2:])]
-            elif name in ['MFCL', 'POP']:
-                self.instr[Decode.INSTR_SDEST] = int(self.args[1][2:])
-            elif name == 'MTCL':
-                self.instr[Decode.INSTR_SSRC] = [int(self.args[1][2:])]
-        else:
-            self.instr[Decode.INSTR_ADDRESS] = [int(num) for num in self.args[-1].strip('()').split(',')]
-            if name == 'LV':
-                self.instr[Decode.INSTR_VDEST] = int(self.args[1][2:])
-                self.instr[Decode.INSTR_SSRC] = [int(self.args[2][2:])]
-            elif name == 'LVI':
-                self.instr[Decode.INSTR_VDEST] = int(self.args[1][2:])
-                self.instr[Decode.INSTR_SSRC] = [int(self.args[2][2:])]
-                self.instr[Decode.INSTR_VSRC] = [int(self.args[3][2:])]
-            elif name == 'LVWS':
-                self.instr[Decode.INSTR_VDEST] = int(self.args[1][2:])
-                self.instr[Decode.INSTR_SSRC] = [int(self.args[2][2:])]
-                self.instr[Decode.INSTR_SSRC] = [int(self.args[3][2:])]
-            elif name == 'SV':
-                self.instr[Decode.INSTR_VDEST] = int(self.args[1][2:])
-                self.instr[Decode.INSTR_SSRC] = [int(self.args[2][2:])]
-            elif name == 'SVI':
-                self.instr[Decode.INSTR_SSRC] = [int(self.args[2][2:])]
-                self.instr[Decode.INSTR_VSRC] = [int(self.args[1][2:]), int(self.args[3][2:])]
-            elif name == 'SVWS':
-                self.instr[Decode.INSTR_VSRC] = [int(self.args[1][2:])]
-                self.instr[Decode.INSTR_SSRC] = [int(self.args[2][2:]), int(self.args[3][2:])]
-
-    def checkBusyBoard(self):
-        ssrc = self.instr.get(Decode.INSTR_SSRC)
-        if ssrc is not None:
-            for i in ssrc:
-                if self.scalarBusyBoard[i]:
-                    return False
-
-        vsrc = self.instr.get(Decode.INSTR_VSRC)
-        if vsrc is not None:
-            for i in vsrc:
-                if self.vectorBusyBoard[i]:
-                    return False
-
-        sdest = self.instr.get(Decode.INSTR_SDEST)
-        if sdest is not None:
-            if self.scalarBusyBoard[sdest]:
-                return False
-
-        vdest = self.instr.get(Decode.INSTR_VDEST)
-        if vdest is not None:
-            if self.vectorBusyBoard[vdest]:
-                return False
-
-        return True
-
-    def updateBusyBoard(self):
-        sdest = self.instr.get(Decode.INSTR_SDEST)
-        if sdest is not None:
+                if busy:
+                    self.unpark((1, vdest))
+
+    def unpark(self, register):  # register is free again: recheck the entries waiting on it.
+        for line in self.parked.pop(register, ()):
+            if line in self.priorityQueue:
+                self.release(line)
+
+    def busyRegister(self, line):  # A busy register of line's operands, None if all are free.
+        trace, scalar, vector = self.trace, self.scalarBusyBoard, self.vectorBusyBoard
+        for i in (trace.ssrc[2 * line], trace.ssrc[2 * line + 1], trace.sdest[line]):
+            if i >= 0 and scalar[i]:
+                return 0, i
+        for i in (trace.vsrc[2 * line], trace.vsrc[2 * line + 1], trace.vdest[line]):
+            if i >= 0 and vector[i]:
+                return 1, i
+        return None
+
+    def updateBusyBoard(self, line):
+        sdest = self.trace.sdest[line]
+        if sdest >= 0:
             self.scalarBusyBoard[sdest] = 1
 
-        vdest = self.instr.get(Decode.INSTR_VDEST)
-        if vdest is not None:
+        vdest = self.trace.vdest[line]
+        if vdest >= 0:
             self.vectorBusyBoard[vdest] = 1
 
 
@@ -381,8 +673,10 @@ class ComputeExec:
                         'SEQVS', 'SNEVS', 'SGTVS', 'SLTVS', 'SGEVS', 'SLEVS']
     mulPipelineInstr = ['MULVV', 'MULVS']
     divPipelineInstr = ['DIVVV', 'DIVVS']
+    ADD, MUL, DIV = 0, 1, 2  # Positions in getPipelineStatus().
 
-    def __init__(self, addPipelineDepth, mulPipelineDepth, divPipelineDepth, numberOfLanes):
+    def __init__(self, trace, addPipelineDepth, mulPipelineDepth, divPipelineDepth, numberOfLanes):
+        self.trace = trace
         self.addPipelineDepth = addPipelineDepth
         self.mulPipelineDepth = mulPipelineDepth
         self.divPipelineDepth = divPipelineDepth
@@ -404,15 +698,14 @@ class ComputeExec:
         self.divCycle = max(0, self.divCycle - 1)
 
         if computeInstr is not None:
-            if computeInstr.get(
-                    Decode.INSTR_NAME) in ComputeExec.addPipelineInstr and self.__addPipelineStatus == Status.FREE:
+            pipeline = self.trace.pipeline(computeInstr)
+            if pipeline == ComputeExec.ADD and self.__addPipelineStatus == Status.FREE:
                 self.__addPipelineStatus = Status.BUSY
                 self.currentAddInstr = computeInstr
                 self.addCycle = self.addPipelineDepth + (currentVectorLength / self.numberOfLanes) - 1
 
 
-            elif computeInstr.get(
-                    Decode.INSTR_NAME) in ComputeExec.mulPipelineInstr and self.__mulPipelineStatus == Status.FREE:
+            elif pipeline == ComputeExec.MUL and self.__mulPipelineStatus == Status.FREE:
                 self.__mulPipelineStatus = Status.BUSY
                 self.currentMulInstr = computeInstr
                 self.mulCycle = self.mulPipelineDepth + (currentVectorLength / self.numberOfLanes) - 1
@@ -431,6 +724,26 @@ class ComputeExec:
             self.freeBusyBoard(self.currentDivInstr)
             self.__divPipelineStatus = Status.FREE
 
+    @staticmethod
+    def pipelineOf(name):  # ADD, MUL or DIV for the opcode name, None for no pipeline.
+        if name in ComputeExec.addPipelineInstr:
+            return ComputeExec.ADD
+        if name in ComputeExec.mulPipelineInstr:
+            return ComputeExec.MUL
+        if name in ComputeExec.divPipelineInstr:
+            return ComputeExec.DIV
+        return None
+
+    def idleCycles(self):  # Cycles before the first busy pipeline frees up, None if none is busy.
+        cycles = [math.ceil(cycle) - 1 for status, cycle in
+                  zip(self.getPipelineStatus(), (self.addCycle, self.mulCycle, self.divCycle)) if status == Status.BUSY]
+        return min(cycles) if cycles else None
+
+    def skipCycles(self, cycles):
+        self.addCycle = max(0, self.addCycle - cycles)
+        self.mulCycle = max(0, self.mulCycle - cycles)
+        self.divCycle = max(0, self.divCycle - cycles)
+
     def getPipelineStatus(self):
         return self.__addPipelineStatus, self.__mulPipelineStatus, self.__divPipelineStatus
 
@@ -452,7 +765,8 @@ class ComputeExec:
 
 class DataExec:
 
-    def __init__(self, bankBusyTime, numberOfBanks, loadStorePipeline):
+    def __init__(self, trace, bankBusyTime, numberOfBanks, loadStorePipeline, stepped=False):
+        self.trace = trace
         self.bankBusyTime = bankBusyTime
         self.numberOfBanks = numberOfBanks
         self.loadStorePipeline = loadStorePipeline
@@ -463,16 +777,52 @@ class DataExec:
         self.element = None
         self.freeBusyBoard = None
         self.instr = None
-        pass
+        self.stepped = stepped  # Issue one address per cycle (reference) instead of scheduling whole instructions.
+        self.clock = 0  # Cycles run, the time base of bankReady and finish.
+        self.bankReady = [0] * numberOfBanks  # First cycle each bank takes an address again.
+        self.finish = None  # Cycle the current instruction completes in.
 
     def run(self, dataInstr):
+        if self.stepped:
+            return self.runStepped(dataInstr)
+        self.clock += 1
+        if dataInstr is not None and self.__status == Status.FREE:
+            self.instr = dataInstr
+            self.__status = Status.BUSY
+            self.finish = self.schedule(self.trace.addresses(dataInstr))
+        # As in runStepped, the registers of the last instruction are freed again every cycle the unit is free.
+        if self.__status == Status.FREE or self.clock >= self.finish:
+            self.freeBusyBoard(self.instr)
+            self.__status = Status.FREE
+
+    def schedule(self, addresses):
+        # The timing of runStepped in one pass over the addresses of an instruction arriving this cycle. The
+        # pipeline is a shift register: each cycle one address of the instruction enters it, taken from the end
+        # of the list, and the oldest one leaves for its bank, as soon as the bank is ready. Addresses left in
+        # the pipeline go out with the next instruction. Returns the cycle the instruction completes in: once
+        # its last address has entered and every bank is ready.
+        ready, bankBusyTime, numberOfBanks = self.bankReady, self.bankBusyTime, self.numberOfBanks
+        incoming = list(addresses)[::-1]
+        stream = self.pipeline[::-1] + incoming  # Oldest first.
+        cycle = self.clock - 1
+        for address in stream[:len(incoming)]:
+            cycle += 1
+            if address is not None:
+                bank = address % numberOfBanks
+                if ready[bank] > cycle:  # Bank conflict: wait for the bank.
+                    cycle = ready[bank]
+                ready[bank] = cycle + bankBusyTime
+        self.pipeline = stream[len(incoming):][::-1]
+        return max(cycle if incoming else self.clock, max(ready))
+
+    def runStepped(self, dataInstr):
         for i in range(self.numberOfBanks):
             self.bankBusyBoard[i] = max(0, self.bankBusyBoard[i] - 1)
 
         if dataInstr is not None and self.__status == Status.FREE:
             self.instr = dataInstr
             self.__status = Status.BUSY
-            self.addresses = dataInstr.get(Decode.INSTR_ADDRESS)
+            self.addresses = list(self.trace.addresses(dataInstr))
 
         if self.__status == Status.BUSY and len(self.addresses) > 0:
             address = self.pipeline[-1]
@@ -494,6 +844,25 @@ class DataExec:
     def getStatus(self):
         return self.__status
 
+    def idleCycles(self):
+        # Cycles the unit only waits: until the current instruction completes, or when stepped, on the bank of
+        # the next address to issue or on every bank once all are issued. None if the unit is free.
+        if self.__status == Status.FREE:
+            return None
+        if not self.stepped:
+            return self.finish - self.clock - 1
+        if len(self.addresses) > 0:
+            address = self.pipeline[-1]
+            return 0 if address is None else self.bankBusyBoard[address % self.numberOfBanks] - 1
+        return max(self.bankBusyBoard) - 1
+
+    def skipCycles(self, cycles):
+        self.clock += cycles
+        if self.stepped:
+            self.bankBusyBoard = [max(0, busy - cycles) for busy in self.bankBusyBoard]
+        if self.__status == Status.FREE:  # run() frees the last instruction's registers again every cycle.
+            self.freeBusyBoard(self.instr)
+
     def setFreeBusyBoard(self, freeBusyBoard):
         self.freeBusyBoard = freeBusyBoard
 
@@ -505,10 +874,22 @@ class DataExec:
 
 
 if __name__ == "__main__":
-    iodir = "IODir"
+    parser = argparse.ArgumentParser(
+        description='Vector Core Timing Model')
+    parser.add_argument('--iodir', default="IODir", type=str,
+                        help='Path to the folder containing code.txt and Config.txt.')
+    parser.add_argument('--profile', action='store_true',
+                        help='Write the busy and stall cycles of each Code.asm PC to profile.json. Needs a trace '
+                             'from the Functional Simulator run with --profile.')
+    parser.add_argument('--stepped', action='store_true',
+                        help='Run every clock cycle instead of jumping over idle ones, issue load/store addresses '
+                             'one per cycle and rescan the decode window for each issue. Reference mode, same result.')
+    args = parser.parse_args()
+
+    iodir = args.iodir
     imem = IMEM(iodir)
     config = Config(iodir)
-    core = Core(config, imem)
+    core = Core(config, imem, profile=args.profile, stepped=args.stepped)
     core.run()
     core.printResult()
-    core.dumpResult()
+    core.dumpResult(iodir)
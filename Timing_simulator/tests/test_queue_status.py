@@ -0,0 +1,44 @@
+import contextlib
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+
+CONFIG = """dataQueueDepth = 4
+computeQueueDepth = 2
+vdmNumBanks = 16
+vlsPipelineDepth = 11
+numLanes = 4
+pipelineDepthMul = 12
+pipelineDepthAdd = 2
+pipelineDepthDiv = 8
+"""
+
+
+def runCore(iodir, windowSize, stepped):
+    with contextlib.redirect_stdout(io.StringIO()):
+        config = main.Config(str(iodir))
+        config.instructionWindowSize = windowSize
+        core = main.Core(config, main.IMEM(str(iodir)), stepped=stepped)
+        core.run()
+    return core
+
+
+def test_unbounded_window_keeps_a_full_queue_busy(tmp_path):
+    # Eight independent multiplies into a compute queue of depth 2. The original simulator only set the queue
+    # status on issue, so once the queue filled up it stayed BUSY and lines 3-7 never left the window. The default
+    # (unbounded) window keeps that for clock compatibility; a bounded window refreshes the status every cycle.
+    (tmp_path / "Config.txt").write_text(CONFIG)
+    code = ["MULVV VR%d VR%d VR%d" % (i, i, i) for i in range(8)] + ["ADD SR1 SR1 SR2", "HALT"]
+    (tmp_path / "code.txt").write_text("\n".join(code) + "\n")
+
+    legacy = runCore(tmp_path, None, False)
+    assert sorted(legacy.decode.priorityQueue) == [3, 4, 5, 6, 7]
+    assert legacy.clk == runCore(tmp_path, None, True).clk
+
+    bounded = runCore(tmp_path, 2, False)
+    assert sorted(bounded.decode.priorityQueue) == [7]
+    assert bounded.clk == runCore(tmp_path, 2, True).clk